@@ -0,0 +1,88 @@
+"""
+Пропускная способность создания ссылок с кастомными алиасами при конкуренции.
+
+Несколько задач одновременно пытаются занять одни и те же алиасы двумя способами:
+`SELECT` для проверки уникальности, затем `INSERT` (прежний вариант) и один
+`INSERT ... ON CONFLICT DO NOTHING RETURNING` из `src.links.queries`.
+Для каждого способа выводятся занятые алиасы, отказы и ошибки IntegrityError.
+Нужен доступный Postgres с примененными миграциями (переменные DB_*),
+созданные ссылки удаляются по завершении.
+
+Запуск:
+    python -m benchmarks.bench_alias [--aliases 200] [--contenders 4]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from src.database import async_session_maker, engine
+from src.links.models import ShortLink
+from src.links.queries import insert_link
+
+
+async def select_then_insert(alias: str) -> str:
+    async with async_session_maker() as session:
+        result = await session.execute(select(ShortLink.id).where(ShortLink.short_code == alias))
+        if result.first() is not None:
+            return "taken"
+        try:
+            await session.execute(insert(ShortLink).values(
+                id=uuid.uuid4(), short_code=alias, original_url="https://example.com",
+            ))
+            await session.commit()
+        except IntegrityError:
+            return "error"
+    return "created"
+
+
+async def insert_on_conflict(alias: str) -> str:
+    async with async_session_maker() as session:
+        created = await insert_link(session, {
+            "id": uuid.uuid4(),
+            "short_code": alias,
+            "original_url": "https://example.com",
+            "user_id": None,
+            "expires_at": None,
+            "redirect_policy": "tracked",
+        })
+        await session.commit()
+    return "created" if created else "taken"
+
+
+async def measure(name: str, create, aliases: list, contenders: int):
+    # Каждый алиас одновременно запрашивают contenders задач
+    attempts = [alias for alias in aliases for _ in range(contenders)]
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(create(alias) for alias in attempts))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:20} {len(attempts) / elapsed:8.0f} attempts/s  "
+        f"created {outcomes.count('created'):5}  taken {outcomes.count('taken'):5}  "
+        f"IntegrityError {outcomes.count('error'):5}"
+    )
+
+
+async def main(aliases: int, contenders: int):
+    run_id = uuid.uuid4().hex[:8]
+    variants = {"select + insert": select_then_insert, "insert on conflict": insert_on_conflict}
+    try:
+        for index, (name, create) in enumerate(variants.items()):
+            names = [f"bench{run_id}v{index}a{i}" for i in range(aliases)]
+            await measure(name, create, names, contenders)
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(delete(ShortLink).where(ShortLink.short_code.startswith(f"bench{run_id}")))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--aliases", type=int, default=200)
+    parser.add_argument("--contenders", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.aliases, args.contenders))
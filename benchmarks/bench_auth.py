@@ -0,0 +1,71 @@
+"""
+Сравнение задержки авторизации запроса: JWT против токенов в Redis.
+
+Меряется только работа стратегии (`read_token`) - получение пользователя
+из БД подменяется заглушкой, так как оно одинаково для обеих стратегий.
+Для Redis-стратегии нужен доступный Redis (REDIS_HOST / REDIS_PORT).
+
+Запуск:
+    python -m benchmarks.bench_auth [--iterations 5000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+from fastapi_users.authentication.strategy import StrategyDestroyNotSupportedError
+
+from src.auth.manager import get_jwt_strategy, get_redis_strategy
+
+
+class StubUserManager:
+    """
+    Заглушка менеджера пользователей без обращения к БД.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def parse_id(self, value):
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+    async def get(self, _):
+        return self.user
+
+
+async def measure(strategy, user, iterations: int) -> float:
+    manager = StubUserManager(user)
+    token = await strategy.write_token(user)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert await strategy.read_token(token, manager) is user
+    elapsed = time.perf_counter() - start
+
+    try:
+        await strategy.destroy_token(token, user)
+    except StrategyDestroyNotSupportedError:
+        pass
+    return elapsed / iterations * 1_000_000
+
+
+async def main(iterations: int):
+    user = SimpleNamespace(id=uuid.uuid4(), is_active=True)
+
+    jwt_us = await measure(get_jwt_strategy(), user, iterations)
+    print(f"jwt:   {jwt_us:8.1f} us/request")
+
+    try:
+        redis_us = await measure(get_redis_strategy(), user, iterations)
+    except Exception as e:
+        print(f"redis: skipped ({e})")
+    else:
+        print(f"redis: {redis_us:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,101 @@
+"""
+Стоимость одного поиска ссылки по короткому коду на стороне Python.
+
+Сравниваются варианты запроса редиректа: ORM-объект (`select(ShortLink)`),
+выборка колонок с построением запроса на каждый вызов, `lambda_stmt`
+и готовый запрос с bound-параметром из `src.links.queries`.
+Запросы выполняются на SQLite в памяти, поэтому время почти целиком -
+построение запроса, поиск в кэше компиляции и разбор строк результата,
+без сетевых задержек.
+Для импорта моделей нужны переменные окружения БД (например, DB_PORT).
+
+Запуск:
+    python -m benchmarks.bench_queries [--links 1000] [--iterations 5000]
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from src.auth.models import User  # noqa: F401 - таблица users нужна для внешнего ключа
+from src.links.models import ShortLink
+from src.links.queries import REDIRECT_TARGET_STMT
+
+
+def orm_lookup(session: Session, short_code: str):
+    return session.execute(select(ShortLink).where(ShortLink.short_code == short_code)).scalars().first()
+
+
+def columns_lookup(session: Session, short_code: str):
+    stmt = select(
+        ShortLink.original_url,
+        ShortLink.expires_at,
+        ShortLink.clicks_count,
+        ShortLink.is_active,
+        ShortLink.redirect_policy,
+    ).where(ShortLink.short_code == short_code)
+    return session.execute(stmt).first()
+
+
+def lambda_lookup(session: Session, short_code: str):
+    stmt = lambda_stmt(
+        lambda: select(
+            ShortLink.original_url,
+            ShortLink.expires_at,
+            ShortLink.clicks_count,
+            ShortLink.is_active,
+            ShortLink.redirect_policy,
+        ).where(ShortLink.short_code == short_code)
+    )
+    return session.execute(stmt).first()
+
+
+def prepared_lookup(session: Session, short_code: str):
+    return session.execute(REDIRECT_TARGET_STMT, {"short_code": short_code}).first()
+
+
+LOOKUPS = {
+    "orm": orm_lookup,
+    "columns": columns_lookup,
+    "lambda_stmt": lambda_lookup,
+    "prepared": prepared_lookup,
+}
+
+
+def create_links(links: int):
+    engine = create_engine("sqlite://")
+    ShortLink.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(ShortLink), [
+            {"id": uuid.uuid4(), "short_code": f"code{i}", "original_url": f"https://example.com/{i}"}
+            for i in range(links)
+        ])
+    return engine
+
+
+def main(links: int, iterations: int):
+    engine = create_links(links)
+    codes = [f"code{i % links}" for i in range(iterations)]
+
+    for name, lookup in LOOKUPS.items():
+        # Прогрев кэша компиляции
+        with Session(engine) as session:
+            lookup(session, codes[0])
+
+        # Как в эндпоинте: новая сессия на каждый поиск
+        started = time.perf_counter()
+        for code in codes:
+            with Session(engine) as session:
+                lookup(session, code)
+        elapsed = time.perf_counter() - started
+        print(f"{name:12} {elapsed / iterations * 1e6:8.1f} us per lookup")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.links, args.iterations)
@@ -0,0 +1,62 @@
+"""
+Стоимость кодирования/декодирования значений кэша разными сериализаторами.
+
+Меряются типичные значения: список `LinkRead` (ответ `/links/search`)
+и `LinkStats` (ответ `/links/{short_code}/stats`).
+
+Запуск:
+    python -m benchmarks.bench_serialization [--items 100] [--iterations 2000]
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+
+from src.cache.redis_client import serializers
+from src.links.schemas import LinkRead, LinkStats
+
+
+def build_payloads(items: int) -> dict:
+    now = datetime.now(timezone.utc)
+    links = [
+        LinkRead(short_code=f"code{i}", original_url=f"https://example.com/page/{i}")
+        for i in range(items)
+    ]
+    stats = LinkStats(
+        short_code="code0",
+        original_url="https://example.com/page/0",
+        created_at=now,
+        clicks_count=42,
+        last_clicked_at=now,
+        expires_at=now,
+    )
+    return {f"LinkRead x{items}": links, "LinkStats": stats}
+
+
+def main(items: int, iterations: int):
+    payloads = build_payloads(items)
+
+    for name, cls in serializers.items():
+        try:
+            serializer = cls()
+        except ValueError as e:
+            print(f"{name:8} skipped ({e})")
+            continue
+
+        for payload_name, payload in payloads.items():
+            raw = serializer.dumps(payload)
+            encode = timeit.timeit(lambda: serializer.dumps(payload), number=iterations)
+            decode = timeit.timeit(lambda: serializer.loads(raw), number=iterations)
+            print(
+                f"{name:8} {payload_name:14} "
+                f"encode {encode / iterations * 1e6:8.1f} us  "
+                f"decode {decode / iterations * 1e6:8.1f} us  "
+                f"size {len(raw):6} B"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.items, args.iterations)
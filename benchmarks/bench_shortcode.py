@@ -0,0 +1,40 @@
+"""
+Стоимость генерации коротких кодов: прежний вариант (base62 от uuid4
+с отбрасыванием лишних символов) против пакетной генерации
+`ShortCodeGenerator.generate_many` для массового создания и импорта.
+
+Запуск:
+    python -m benchmarks.bench_shortcode [--count 100000] [--length 10]
+"""
+import argparse
+import time
+import uuid
+
+from src.utils.shortcode import BASE62, ShortCodeGenerator, encode_base62
+
+
+def uuid_codes(count: int, length: int) -> list:
+    return [encode_base62(uuid.uuid4().int)[:length] for _ in range(count)]
+
+
+def main(count: int, length: int):
+    generator = ShortCodeGenerator(BASE62, length)
+    variants = {
+        "uuid4 + base62": lambda: uuid_codes(count, length),
+        "generate (one by one)": lambda: [generator.generate() for _ in range(count)],
+        "generate_many": lambda: generator.generate_many(count),
+    }
+
+    for name, generate in variants.items():
+        started = time.perf_counter()
+        codes = generate()
+        elapsed = time.perf_counter() - started
+        print(f"{name:22} {elapsed / count * 1e9:8.0f} ns per code  ({len(set(codes))} unique of {count})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--length", type=int, default=10)
+    args = parser.parse_args()
+    main(args.count, args.length)
@@ -0,0 +1,78 @@
+"""
+Время импорта приложения и запуска lifespan с шедулером и без него.
+
+Импорт профилируется в отдельном процессе через `python -X importtime`:
+выводится суммарное время импорта `src.main` и самые тяжелые модули
+(cumulative, в миллисекундах). Затем в текущем процессе замеряется запуск
+и остановка lifespan при SCHEDULER_ENABLED=true и false (прогрев кэша отключен).
+Для импорта моделей нужны переменные окружения БД (например, DB_PORT).
+
+Запуск:
+    python -m benchmarks.bench_startup [--top 15] [--output importtime.txt]
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+
+def profile_imports(module: str) -> list:
+    """
+    Строки (cumulative_us, module) из вывода -X importtime для импорта module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return rows, result.stderr
+
+
+async def measure_lifespan(scheduler_enabled: bool, iterations: int) -> float:
+    from src.main import app, lifespan
+
+    with patch("src.main.SCHEDULER_ENABLED", scheduler_enabled), patch("src.main.CACHE_WARMUP_ENABLED", False):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            async with lifespan(app):
+                pass
+        return (time.perf_counter() - started) / iterations
+
+
+def main(top: int, output: str, iterations: int):
+    rows, raw = profile_imports("src.main")
+    if output:
+        with open(output, "w") as f:
+            f.write(raw)
+
+    total = next(cumulative for cumulative, name in rows if name == "src.main")
+    print(f"import src.main: {total / 1000:.1f} ms")
+    # Пакеты верхнего уровня (для src - его подпакеты), чтобы не повторять вложенные импорты
+    packages = {}
+    for cumulative, name in rows:
+        parts = name.split(".")
+        root = ".".join(parts[:2]) if parts[0] == "src" and len(parts) > 1 else parts[0]
+        packages[root] = max(packages.get(root, 0), cumulative)
+    for root, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {root:30} {cumulative / 1000:8.1f} ms")
+
+    for enabled in (True, False):
+        elapsed = asyncio.run(measure_lifespan(enabled, iterations))
+        # APScheduler и модули задач импортируются при первом запуске, дальше они уже в sys.modules
+        print(f"lifespan SCHEDULER_ENABLED={str(enabled).lower():5} {elapsed * 1000:8.2f} ms per start/stop")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    main(args.top, args.output, args.iterations)
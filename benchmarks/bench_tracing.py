@@ -0,0 +1,75 @@
+"""
+Накладные расходы трассировки и журнала медленных запросов.
+
+Замеряется стоимость одного спана (выключенная трассировка, трасса вне выборки
+и записываемая трасса с InMemorySpanExporter) и SQL-запроса к SQLite в памяти
+без инструментации движка, с обработчиками журнала медленных запросов
+и с трассировкой при разных TRACING_SAMPLE_RATIO.
+Для импорта модулей нужны переменные окружения БД (например, DB_PORT).
+
+Запуск:
+    python -m benchmarks.bench_tracing [--iterations 100000]
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+
+from src.monitoring.slow_log import install_slow_query_log
+from src.monitoring.tracing import InMemorySpanExporter, Tracer, instrument_engine, tracer
+
+
+def measure(iterations: int, func) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def span_cost(bench_tracer: Tracer):
+    def run():
+        with bench_tracer.span("request"):
+            with bench_tracer.span("child"):
+                pass
+    return run
+
+
+def main(iterations: int):
+    variants = {
+        "disabled": Tracer(enabled=False),
+        "enabled, ratio 0": Tracer(enabled=True, sample_ratio=0.0),
+        "enabled, ratio 1": Tracer(enabled=True, sample_ratio=1.0, exporter=InMemorySpanExporter(1000)),
+    }
+    for name, bench_tracer in variants.items():
+        print(f"span pair {name:20} {measure(iterations, span_cost(bench_tracer)):8.2f} us")
+
+    plain = create_engine("sqlite://")
+    slow_logged = create_engine("sqlite://")
+    install_slow_query_log(slow_logged)
+    instrumented = create_engine("sqlite://")
+    instrument_engine(instrumented)
+    tracer.exporter = InMemorySpanExporter(1000)
+    query = text("SELECT 1 WHERE 2 > 1")
+    sql_iterations = iterations // 10
+
+    with plain.connect() as connection:
+        print(f"SELECT {'plain engine':25} {measure(sql_iterations, lambda: connection.execute(query)):8.2f} us")
+    with slow_logged.connect() as connection:
+        print(f"SELECT {'slow query log':25} {measure(sql_iterations, lambda: connection.execute(query)):8.2f} us")
+    with instrumented.connect() as connection:
+        for enabled, ratio in ((False, 0.0), (True, 0.0), (True, 0.01), (True, 1.0)):
+            tracer.enabled, tracer.sample_ratio = enabled, ratio
+
+            def run():
+                with tracer.span("request"):
+                    connection.execute(query)
+
+            label = f"instrumented, {'ratio ' + str(ratio) if enabled else 'disabled'}"
+            print(f"SELECT {label:25} {measure(sql_iterations, run):8.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.iterations)
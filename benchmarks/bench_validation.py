@@ -0,0 +1,74 @@
+"""
+Стоимость валидации схемы создания ссылки на больших пачках (массовое создание, импорт).
+
+Сравниваются прежняя схема (urlparse и re.fullmatch со строковым шаблоном
+в каждом вызове) и `LinkCreate` с общими валидаторами из `src.links.validation`
+(скомпилированный шаблон, кэшированный разбор URL). В пачке `--distinct`
+разных URL, как в типичном импорте с повторяющимися адресами.
+
+Запуск:
+    python -m benchmarks.bench_validation [--items 100000] [--distinct 1000]
+"""
+import argparse
+import re
+import time
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, TypeAdapter, field_validator
+
+from src.links.schemas import LinkCreate
+from src.links.validation import url_error
+
+
+class LegacyLinkCreate(BaseModel):
+    original_url: str
+    custom_alias: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+    @field_validator("original_url")
+    @classmethod
+    def validate_original_url(cls, v):
+        parsed = urlparse(v)
+        if parsed.scheme not in {"http", "https"}:
+            raise ValueError("URL must start with http:// or https://!")
+        if not parsed.netloc:
+            raise ValueError("URL must have a valid domain!")
+        return v
+
+    @field_validator("custom_alias")
+    @classmethod
+    def validate_custom_alias(cls, v):
+        if v is None:
+            return v
+        if not re.fullmatch(r"[A-Za-zА-Яа-я0-9]+", v):
+            raise ValueError("Custom alias must contain only letters and digits!")
+        return v
+
+
+def build_items(items: int, distinct: int) -> list:
+    return [
+        {"original_url": f"https://example{i % distinct}.com/page/{i % distinct}", "custom_alias": f"alias{i}"}
+        for i in range(items)
+    ]
+
+
+def main(items: int, distinct: int):
+    payload = build_items(items, distinct)
+
+    for name, schema in {"legacy": LegacyLinkCreate, "LinkCreate": LinkCreate}.items():
+        url_error.cache_clear()
+        adapter = TypeAdapter(List[schema])
+        started = time.perf_counter()
+        adapter.validate_python(payload)
+        elapsed = time.perf_counter() - started
+        print(f"{name:12} {elapsed * 1000:8.1f} ms per {items} items  ({elapsed / items * 1e6:.2f} us per item)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.items, args.distinct)
@@ -0,0 +1,33 @@
+"""Add click sync batches
+
+Revision ID: 3b9d5e1a7c42
+Revises: f4d08b6e93a2
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d5e1a7c42'
+down_revision: Union[str, None] = 'f4d08b6e93a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'click_sync_batches',
+        sa.Column('batch_id', sa.String(length=32), nullable=False),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('batch_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('click_sync_batches')
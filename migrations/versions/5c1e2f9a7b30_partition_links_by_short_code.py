@@ -0,0 +1,87 @@
+"""Partition links table by short_code hash
+
+Revision ID: 5c1e2f9a7b30
+Revises: 13f657a280f7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2f9a7b30'
+down_revision: Union[str, None] = '13f657a280f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Количество hash-партиций таблицы links
+LINKS_PARTITIONS = 16
+
+LINKS_COLUMNS = "id, short_code, original_url, user_id, created_at, clicks_count, last_clicked_at, expires_at"
+
+
+def links_columns() -> list:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('short_code', sa.String(length=50), nullable=False),
+        sa.Column('original_url', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('clicks_count', sa.Integer(), server_default="0", nullable=True),
+        sa.Column('last_clicked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    ]
+
+
+def rename_old_links():
+    """
+    Переименование текущей таблицы links вместе с индексами,
+    чтобы освободить имена для новой таблицы.
+    """
+    op.execute("ALTER TABLE links RENAME TO links_old")
+    op.execute("ALTER INDEX links_pkey RENAME TO links_old_pkey")
+    op.execute("ALTER INDEX ix_links_short_code RENAME TO ix_links_old_short_code")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rename_old_links()
+
+    # Первичный и уникальный ключи партиционированной таблицы
+    # обязаны включать ключ партиционирования
+    op.create_table(
+        'links',
+        *links_columns(),
+        sa.PrimaryKeyConstraint('id', 'short_code', name='links_pkey'),
+        postgresql_partition_by='HASH (short_code)',
+    )
+    op.create_index(op.f('ix_links_short_code'), 'links', ['short_code'], unique=True)
+
+    for remainder in range(LINKS_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE links_p{remainder} PARTITION OF links "
+            f"FOR VALUES WITH (MODULUS {LINKS_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+    op.execute(f"INSERT INTO links ({LINKS_COLUMNS}) SELECT {LINKS_COLUMNS} FROM links_old")
+    op.drop_table('links_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    rename_old_links()
+
+    op.create_table(
+        'links',
+        *links_columns(),
+        sa.PrimaryKeyConstraint('id', name='links_pkey'),
+    )
+    op.create_index(op.f('ix_links_short_code'), 'links', ['short_code'], unique=True)
+
+    op.execute(f"INSERT INTO links ({LINKS_COLUMNS}) SELECT {LINKS_COLUMNS} FROM links_old")
+    # Партиции удаляются вместе с родительской таблицей
+    op.drop_table('links_old')
@@ -0,0 +1,49 @@
+"""Soft-expire links and add links_archive table
+
+Revision ID: 8e4b7d2c1f05
+Revises: 5c1e2f9a7b30
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b7d2c1f05'
+down_revision: Union[str, None] = '5c1e2f9a7b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонка и индекс родительской таблицы создаются во всех партициях
+    op.add_column('links', sa.Column('is_active', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+    op.create_index('ix_links_inactive', 'links', ['id'], unique=False, postgresql_where=sa.text('NOT is_active'))
+
+    # Без внешнего ключа на users: архив переживает удаление пользователя
+    op.create_table(
+        'links_archive',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('short_code', sa.String(length=50), nullable=False),
+        sa.Column('original_url', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('clicks_count', sa.Integer(), server_default='0', nullable=True),
+        sa.Column('last_clicked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_links_archive_short_code'), 'links_archive', ['short_code'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_links_archive_short_code'), table_name='links_archive')
+    op.drop_table('links_archive')
+    op.drop_index('ix_links_inactive', table_name='links', postgresql_where=sa.text('NOT is_active'))
+    op.drop_column('links', 'is_active')
@@ -0,0 +1,32 @@
+"""Add url reachability status to links
+
+Revision ID: c27a9e4d6b18
+Revises: 8e4b7d2c1f05
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27a9e4d6b18'
+down_revision: Union[str, None] = '8e4b7d2c1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('links', sa.Column('url_status', sa.Integer(), nullable=True))
+    op.add_column('links', sa.Column('url_checked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_links_url_checked_at'), 'links', ['url_checked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_links_url_checked_at'), table_name='links')
+    op.drop_column('links', 'url_checked_at')
+    op.drop_column('links', 'url_status')
@@ -0,0 +1,30 @@
+"""Add redirect policy to links
+
+Revision ID: f4d08b6e93a2
+Revises: c27a9e4d6b18
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4d08b6e93a2'
+down_revision: Union[str, None] = 'c27a9e4d6b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('links', sa.Column('redirect_policy', sa.String(length=20), server_default='tracked', nullable=False))
+    op.add_column('links_archive', sa.Column('redirect_policy', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('links_archive', 'redirect_policy')
+    op.drop_column('links', 'redirect_policy')
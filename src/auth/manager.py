@@ -1,3 +1,4 @@
+from functools import lru_cache
 from uuid import UUID
 from typing import Optional
 
@@ -9,11 +10,20 @@ from fastapi_users.authentication import (
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt
+import jwt
 from src.auth.models import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database import get_async_session
 from src.auth.schemas import UserRead, UserCreate
-from src.config import SECRET_KEY, JWT_LIFETIME_SECONDS
+from src.auth.strategy import RedisTokenStrategy
+from src.cache.redis_client import get_auth_redis_client
+from src.config import (
+    SECRET_KEY,
+    JWT_LIFETIME_SECONDS,
+    AUTH_BACKEND,
+    REDIS_TOKEN_LIFETIME_SECONDS,
+)
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
@@ -42,25 +52,56 @@ async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db
     yield UserManager(user_db)
 
 
-bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
+bearer_transport = BearerTransport(tokenUrl=f"auth/{AUTH_BACKEND}/login")
 
 
 def get_jwt_strategy() -> JWTStrategy[models.UP, models.ID]:
     return JWTStrategy(secret=SECRET_KEY, lifetime_seconds=JWT_LIFETIME_SECONDS)
 
 
+# Стратегия создается один раз: скрипты Redis регистрируются при создании
+@lru_cache(maxsize=None)
+def get_redis_strategy() -> RedisTokenStrategy[models.UP, models.ID]:
+    return RedisTokenStrategy(get_auth_redis_client(), lifetime_seconds=REDIS_TOKEN_LIFETIME_SECONDS)
+
+
+# Бэкенд авторизации выбирается через конфиг
+strategies = {
+    "jwt": get_jwt_strategy,
+    "redis": get_redis_strategy,
+}
+if AUTH_BACKEND not in strategies:
+    raise ValueError(f"Unknown AUTH_BACKEND '{AUTH_BACKEND}', expected one of: {', '.join(strategies)}")
+
 auth_backend = AuthenticationBackend(
-    name="jwt",
+    name=AUTH_BACKEND,
     transport=bearer_transport,
-    get_strategy=get_jwt_strategy,
+    get_strategy=strategies[AUTH_BACKEND],
 )
 
+async def get_token_user_id(token: str) -> Optional[str]:
+    """
+    Идентификатор пользователя по токену без загрузки пользователя из БД.
+    Возвращает None для невалидного токена.
+    """
+    strategy = strategies[AUTH_BACKEND]()
+    if isinstance(strategy, RedisTokenStrategy):
+        return await strategy.peek_user_id(token)
+
+    try:
+        data = decode_jwt(token, strategy.decode_key, strategy.token_audience, algorithms=[strategy.algorithm])
+    except jwt.PyJWTError:
+        return None
+    return data.get("sub")
+
+
 fastapi_users = FastAPIUsers[User, UUID](
     get_user_manager, [auth_backend],
 )
 
 current_active_user = fastapi_users.current_user(active=True)
 optional_user = fastapi_users.current_user(optional=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
 
 auth_router = fastapi_users.get_auth_router(auth_backend)
 register_router = fastapi_users.get_register_router(UserRead, UserCreate,)
\ No newline at end of file
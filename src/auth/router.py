@@ -1,7 +1,28 @@
-from fastapi import APIRouter
-from src.auth.manager import auth_router, register_router
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi_users.authentication import Strategy
+from src.auth.manager import auth_backend, auth_router, register_router, current_active_user
+from src.auth.models import User
+from src.auth.strategy import RedisTokenStrategy
 
 
 router = APIRouter()
-router.include_router(auth_router, prefix="/jwt", tags=["auth"])
-router.include_router(register_router, prefix="", tags=["auth"])
\ No newline at end of file
+router.include_router(auth_router, prefix=f"/{auth_backend.name}", tags=["auth"])
+router.include_router(register_router, prefix="", tags=["auth"])
+
+
+@router.post(f"/{auth_backend.name}/logout-all", tags=["auth"])
+async def logout_all(
+    user: User = Depends(current_active_user),
+    strategy: Strategy = Depends(auth_backend.get_strategy),
+):
+    """
+    Выход пользователя на всех устройствах (отзыв всех токенов).
+    """
+
+    # JWT-токены stateless, отозвать их нельзя
+    if not isinstance(strategy, RedisTokenStrategy):
+        raise HTTPException(status_code=400, detail="Logout from all devices requires the redis auth backend!")
+
+    revoked = await strategy.destroy_all_tokens(user)
+
+    return {"status": "success", "revoked_tokens": revoked}
\ No newline at end of file
@@ -0,0 +1,123 @@
+import secrets
+from typing import Optional
+
+from fastapi_users import exceptions, models
+from fastapi_users.authentication import RedisStrategy
+from fastapi_users.manager import BaseUserManager
+from redis.asyncio import Redis
+
+
+# Скрипт чтения токена со скользящим временем жизни:
+# за один запрос к Redis достаем user_id и продлеваем TTL
+# как самого токена, так и индекса токенов пользователя
+READ_TOKEN_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return false
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', ARGV[2] .. user_id, ARGV[1])
+return user_id
+"""
+
+# Запись нового токена. Заодно из индекса пользователя удаляются токены,
+# которые уже истекли, чтобы индекс не рос бесконечно.
+# TTL индекса выставляется по новому токену, самому долгоживущему из всех.
+WRITE_TOKEN_SCRIPT = """
+for _, token in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if redis.call('EXISTS', ARGV[3] .. token) == 0 then
+        redis.call('SREM', KEYS[2], token)
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Отзыв всех токенов пользователя. Возвращает количество действительно
+# удаленных токенов, истекшие токены из индекса не учитываются.
+DESTROY_ALL_TOKENS_SCRIPT = """
+local revoked = 0
+for _, token in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    revoked = revoked + redis.call('DEL', ARGV[1] .. token)
+end
+redis.call('DEL', KEYS[1])
+return revoked
+"""
+
+
+class RedisTokenStrategy(RedisStrategy[models.UP, models.ID]):
+    """
+    Хранение токенов в Redis со скользящим временем жизни.
+
+    Помимо ключа `{token_prefix}{token} -> user_id` для каждого пользователя
+    ведется множество его токенов `{user_prefix}{user_id}`, что позволяет
+    разлогинить пользователя на всех устройствах без сканирования ключей.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        lifetime_seconds: int,
+        *,
+        key_prefix: str = "auth:token:",
+        user_key_prefix: str = "auth:user_tokens:",
+    ):
+        super().__init__(redis, lifetime_seconds, key_prefix=key_prefix)
+        self.user_key_prefix = user_key_prefix
+        self._read_script = redis.register_script(READ_TOKEN_SCRIPT)
+        self._write_script = redis.register_script(WRITE_TOKEN_SCRIPT)
+        self._destroy_all_script = redis.register_script(DESTROY_ALL_TOKENS_SCRIPT)
+
+    def _token_key(self, token: str) -> str:
+        return f"{self.key_prefix}{token}"
+
+    def _user_key(self, user_id) -> str:
+        return f"{self.user_key_prefix}{user_id}"
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[models.UP, models.ID]
+    ) -> Optional[models.UP]:
+        if token is None:
+            return None
+
+        user_id = await self._read_script(
+            keys=[self._token_key(token)],
+            args=[self.lifetime_seconds, self.user_key_prefix],
+        )
+        if not user_id:
+            return None
+
+        try:
+            parsed_id = user_manager.parse_id(user_id)
+            return await user_manager.get(parsed_id)
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+    async def peek_user_id(self, token: str) -> Optional[str]:
+        """
+        Идентификатор пользователя по токену без продления TTL и обращения к БД.
+        """
+        return await self.redis.get(self._token_key(token))
+
+    async def write_token(self, user: models.UP) -> str:
+        token = secrets.token_urlsafe()
+        await self._write_script(
+            keys=[self._token_key(token), self._user_key(user.id)],
+            args=[str(user.id), self.lifetime_seconds, self.key_prefix, token],
+        )
+        return token
+
+    async def destroy_token(self, token: str, user: models.UP) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._token_key(token))
+            pipe.srem(self._user_key(user.id), token)
+            await pipe.execute()
+
+    async def destroy_all_tokens(self, user: models.UP) -> int:
+        """
+        Отзыв всех токенов пользователя (выход на всех устройствах).
+        Возвращает количество отозванных (еще не истекших) токенов.
+        """
+        return int(await self._destroy_all_script(keys=[self._user_key(user.id)], args=[self.key_prefix]))
@@ -0,0 +1,22 @@
+from typing import List
+
+import httpx
+
+from src.logger_config import logger
+from src.config import CDN_PURGE_URL, CDN_PURGE_TOKEN, CDN_PURGE_TIMEOUT
+
+
+async def purge_cdn(paths: List[str]):
+    """
+    Хук инвалидации CDN: POST на CDN_PURGE_URL со списком путей.
+    Выполняется в фоне после ответа, ошибка не влияет на запрос пользователя.
+    """
+    if not CDN_PURGE_URL or not paths:
+        return
+    headers = {"Authorization": f"Bearer {CDN_PURGE_TOKEN}"} if CDN_PURGE_TOKEN else {}
+    try:
+        async with httpx.AsyncClient(timeout=CDN_PURGE_TIMEOUT) as client:
+            response = await client.post(CDN_PURGE_URL, json={"paths": paths}, headers=headers)
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"CDN purge of {len(paths)} paths has failed: {e!r}")
@@ -0,0 +1,188 @@
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from src.cache import redis_client
+
+
+# Накопленные в Redis переходы: short_code -> количество и время последнего перехода (мс)
+PENDING_CLICKS_KEY = "clicks:pending"
+PENDING_LAST_CLICK_KEY = "clicks:last"
+# Переходы, забранные задачей синхронизации, но еще не записанные в БД
+SYNCING_CLICKS_KEY = "clicks:syncing"
+SYNCING_LAST_CLICK_KEY = "clicks:syncing_last"
+# Идентификатор забранной пачки: по нему БД отличает уже записанные пачки
+SYNCING_BATCH_KEY = "clicks:syncing_batch"
+# Блокировка синхронизации: забирать и записывать переходы может только один процесс
+SYNC_LOCK_KEY = "clicks:sync_lock"
+
+# Учет перехода: KEYS[1] - счетчики, KEYS[2] - время последнего перехода, ARGV[1] - короткий код.
+# Время берется из Redis, чтобы не зависеть от часов воркеров.
+COUNT_CLICK_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+redis.call('HSET', KEYS[2], ARGV[1], now)
+"""
+
+# Редирект за один запрос к Redis: значение кэша по ключу KEYS[3]
+# и учет перехода, если ссылка есть в кэше и не истекла.
+# ARGV[2] - текущее время (unix time), ARGV[3] - формат значения кэша (json или msgpack).
+RESOLVE_AND_COUNT_SCRIPT = """
+local value = redis.call('GET', KEYS[3])
+if not value then
+    return false
+end
+local data
+if ARGV[3] == 'msgpack' then
+    data = cmsgpack.unpack(value)
+else
+    data = cjson.decode(value)
+end
+local expires_at = tonumber(data['expires_at'])
+if expires_at == nil or expires_at > tonumber(ARGV[2]) then
+""" + COUNT_CLICK_SCRIPT + """
+end
+return value
+"""
+
+# Перенос накопленных переходов в ключи синхронизации под новым id пачки ARGV[1].
+# Если предыдущая синхронизация не завершилась, повторно отдаются ее данные и ее id.
+TAKE_PENDING_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 0 and redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[3])
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        redis.call('RENAME', KEYS[2], KEYS[4])
+    end
+    redis.call('SET', KEYS[5], ARGV[1])
+end
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    return {{}, {}, false}
+end
+local batch_id = redis.call('GET', KEYS[5])
+if not batch_id then
+    batch_id = ARGV[1]
+    redis.call('SET', KEYS[5], batch_id)
+end
+return {redis.call('HGETALL', KEYS[3]), redis.call('HGETALL', KEYS[4]), batch_id}
+"""
+
+# Удаление записанной в БД пачки, если ключи синхронизации еще содержат именно ее.
+# KEYS[1] - id пачки, KEYS[2], KEYS[3] - ключи синхронизации, ARGV[1] - id записанной пачки.
+FINISH_SYNC_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+return 1
+"""
+
+# Снятие блокировки, только если она еще принадлежит этому запуску
+RELEASE_SYNC_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+CLICK_KEYS = [PENDING_CLICKS_KEY, PENDING_LAST_CLICK_KEY]
+SYNC_KEYS = [
+    PENDING_CLICKS_KEY, PENDING_LAST_CLICK_KEY, SYNCING_CLICKS_KEY, SYNCING_LAST_CLICK_KEY, SYNCING_BATCH_KEY,
+]
+
+
+@dataclass
+class PendingClicks:
+    clicks: int = 0
+    last_clicked_at: Optional[datetime] = None
+
+
+def from_milliseconds(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+
+
+async def resolve_and_count(short_code: str, cache_key: str, now: datetime) -> Optional[dict]:
+    """
+    Значение кэша редиректа и учет перехода за один запрос к Redis.
+    None, если ссылки нет в кэше. Переход по ссылке, истекшей к моменту now,
+    не учитывается.
+    """
+    script = redis_client.get_script(RESOLVE_AND_COUNT_SCRIPT)
+    value_format = "json" if redis_client.serializer.is_json else "msgpack"
+    cached = await script(keys=[*CLICK_KEYS, cache_key], args=[short_code, now.timestamp(), value_format])
+    return redis_client.serializer.loads(cached) if cached else None
+
+
+async def count_click(short_code: str):
+    """
+    Учет перехода без обращения к кэшу редиректа.
+    """
+    script = redis_client.get_script(COUNT_CLICK_SCRIPT)
+    await script(keys=CLICK_KEYS, args=[short_code])
+
+
+async def get_pending_clicks(short_code: str) -> PendingClicks:
+    """
+    Переходы по ссылке, еще не записанные в БД.
+    """
+    async with redis_client.get_redis_client().pipeline(transaction=False) as pipe:
+        pipe.hget(PENDING_CLICKS_KEY, short_code)
+        pipe.hget(SYNCING_CLICKS_KEY, short_code)
+        pipe.hget(PENDING_LAST_CLICK_KEY, short_code)
+        pipe.hget(SYNCING_LAST_CLICK_KEY, short_code)
+        pending, syncing, pending_last, syncing_last = await pipe.execute()
+
+    last_clicked = [int(value) for value in (pending_last, syncing_last) if value is not None]
+    return PendingClicks(
+        clicks=int(pending or 0) + int(syncing or 0),
+        last_clicked_at=from_milliseconds(max(last_clicked)) if last_clicked else None,
+    )
+
+
+async def take_pending_clicks() -> Tuple[Optional[str], dict]:
+    """
+    Забирает накопленные переходы для записи в БД:
+    id пачки и short_code -> PendingClicks.
+    """
+    script = redis_client.get_script(TAKE_PENDING_SCRIPT)
+    clicks, last_clicks, batch_id = await script(keys=SYNC_KEYS, args=[secrets.token_hex(16)])
+
+    last_by_code = dict(zip(last_clicks[::2], last_clicks[1::2]))
+    pending = {
+        short_code.decode(): PendingClicks(int(count), from_milliseconds(last_by_code.get(short_code)))
+        for short_code, count in zip(clicks[::2], clicks[1::2])
+    }
+    if isinstance(batch_id, bytes):
+        batch_id = batch_id.decode()
+    return batch_id, pending
+
+
+async def acquire_sync_lock(ttl: int) -> Optional[str]:
+    """
+    Блокировка синхронизации переходов на ttl секунд.
+    Возвращает токен запуска или None, если синхронизация уже идет в другом процессе.
+    """
+    token = secrets.token_hex(16)
+    acquired = await redis_client.get_redis_client().set(SYNC_LOCK_KEY, token, nx=True, px=ttl * 1000)
+    return token if acquired else None
+
+
+async def release_sync_lock(token: str) -> bool:
+    """
+    Снятие блокировки. False, если она истекла до конца синхронизации.
+    """
+    script = redis_client.get_script(RELEASE_SYNC_LOCK_SCRIPT)
+    return bool(await script(keys=[SYNC_LOCK_KEY], args=[token]))
+
+
+async def finish_sync(batch_id: str) -> bool:
+    """
+    Удаление пачки переходов, записанной в БД. Выполняется независимо от блокировки:
+    пачка уже записана, и повторная запись в БД все равно будет пропущена.
+    False, если пачку уже удалил другой процесс.
+    """
+    script = redis_client.get_script(FINISH_SYNC_SCRIPT)
+    return bool(await script(keys=[SYNCING_BATCH_KEY, SYNCING_CLICKS_KEY, SYNCING_LAST_CLICK_KEY], args=[batch_id]))
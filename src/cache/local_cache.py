@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from src.config import LOCAL_CACHE_MAX_SIZE, LOCAL_CACHE_TTL
+
+
+class LocalCache:
+    """
+    Кэш внутри процесса (LRU с временем жизни записей).
+    Инвалидация работает только в пределах текущего воркера,
+    поэтому время жизни записей должно быть коротким.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: int = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_SIZE, LOCAL_CACHE_TTL)
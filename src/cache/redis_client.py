@@ -1,27 +1,144 @@
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from datetime import datetime, timezone
+from typing import Optional
 from urllib.parse import urlencode
 import json
+import orjson
 from src.logger_config import logger
+from src.cache.local_cache import local_cache
+from src.monitoring.tracing import TracedRedis
+from src.config import REDIS_HOST, REDIS_PORT, REDIS_AUTH_MAX_CONNECTIONS, CACHE_SERIALIZER, TRACING_ENABLED, SLOW_LOG_ENABLED
 
+try:
+    import msgpack
+except ImportError:  # msgpack - опциональная зависимость
+    msgpack = None
+
+
+def _to_primitive(obj):
+    """
+    Приведение Pydantic-моделей и прочих объектов к сериализуемому виду.
+    """
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+class JsonSerializer:
+    """
+    Стандартный json, оставлен для совместимости.
+    """
+    is_json = True
+    # Байты отличаются от ответа orjson (пробелы), поэтому ETag считается по ответу
+    is_response_bytes = False
+
+    def dumps(self, data) -> bytes:
+        return json.dumps(data, default=_to_primitive).encode()
+
+    def loads(self, raw: bytes):
+        return json.loads(raw)
+
+
+class OrjsonSerializer:
+    """
+    Быстрая сериализация в JSON через orjson.
+    """
+    is_json = True
+    # Байты совпадают с ответом, который сервис строит через orjson
+    is_response_bytes = True
+
+    def dumps(self, data) -> bytes:
+        return orjson.dumps(data, default=_to_primitive)
+
+    def loads(self, raw: bytes):
+        return orjson.loads(raw)
+
+
+class MsgpackSerializer:
+    """
+    Компактная бинарная сериализация через msgpack.
+    """
+    is_json = False
+    is_response_bytes = False
+
+    def __init__(self):
+        if msgpack is None:
+            raise ValueError("CACHE_SERIALIZER=msgpack requires the msgpack package")
+
+    def dumps(self, data) -> bytes:
+        return msgpack.packb(data, default=_to_primitive, use_bin_type=True)
+
+    def loads(self, raw: bytes):
+        return msgpack.unpackb(raw, raw=False)
+
+
+serializers = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+if CACHE_SERIALIZER not in serializers:
+    raise ValueError(f"Unknown CACHE_SERIALIZER '{CACHE_SERIALIZER}', expected one of: {', '.join(serializers)}")
+
+serializer = serializers[CACHE_SERIALIZER]()
+
+# При включенной трассировке каждая команда Redis пишется отдельным спаном,
+# для журнала медленных запросов учитывается время команд
+redis_class = TracedRedis if TRACING_ENABLED or SLOW_LOG_ENABLED else Redis
 
 _redis_client = None
+_auth_redis_client = None
+_scripts = {}
 
 
 def get_redis_client() -> Redis:
     """
     Возвращает Redis-клиент. Инициализирует его один раз (лениво).
+    Клиент бинарный: значения кэша хранятся в виде байт сериализатора.
     """
     global _redis_client
     if _redis_client is None:
-        _redis_client = Redis(
-            host="redis",
-            port=6379,
+        _redis_client = redis_class(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
             password=None,
-            decode_responses=True,
+            decode_responses=False,
         )
     return _redis_client
 
 
+def get_auth_redis_client() -> Redis:
+    """
+    Возвращает Redis-клиент для хранилища токенов авторизации.
+    Использует отдельный ограниченный пул соединений,
+    чтобы всплески кэш-трафика не мешали проверке токенов.
+    """
+    global _auth_redis_client
+    if _auth_redis_client is None:
+        pool = BlockingConnectionPool(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            password=None,
+            max_connections=REDIS_AUTH_MAX_CONNECTIONS,
+            decode_responses=True,
+        )
+        _auth_redis_client = redis_class(connection_pool=pool)
+    return _auth_redis_client
+
+
+def get_script(source: str):
+    """
+    Возвращает Lua-скрипт, зарегистрированный на текущем Redis-клиенте.
+    Скрипт вызывается через EVALSHA, при отсутствии в Redis загружается заново.
+    """
+    client = get_redis_client()
+    script = _scripts.get(source)
+    if script is None or script.registered_client is not client:
+        script = client.register_script(source)
+        _scripts[source] = script
+    return script
+
+
 def build_cache_key(path: str, query_params: dict) -> str:
     """
     Шаблон формирования ключа.
@@ -30,22 +147,69 @@ def build_cache_key(path: str, query_params: dict) -> str:
     return f"{path}?{query_string}"
 
 
+def redirect_cache_value(original_url: str, expires_at: Optional[datetime], policy: Optional[str] = None) -> dict:
+    """
+    Значение кэша редиректа: URL, срок жизни ссылки (unix time) и политика редиректа.
+    """
+    return {
+        "url": original_url,
+        "expires_at": expires_at.timestamp() if expires_at is not None else None,
+        "policy": policy,
+    }
+
+
+def cached_expires_at(value: dict) -> Optional[datetime]:
+    """
+    Срок жизни ссылки из значения кэша редиректа.
+    """
+    if value.get("expires_at") is None:
+        return None
+    return datetime.fromtimestamp(value["expires_at"], tz=timezone.utc)
+
+
 async def cache_set(path: str, query_params: dict, data: dict, expire: int = 300):
     """
     Создание кэша.
     """
     key = build_cache_key(path, query_params)
-    value = json.dumps(data, default=str)
+    value = serializer.dumps(data)
     await get_redis_client().set(key, value, ex=expire)
 
 
+async def cache_set_many(items: list):
+    """
+    Создание набора кэшей одним пайплайном.
+    Элементы - кортежи (path, query_params, data, expire).
+    """
+    async with get_redis_client().pipeline(transaction=False) as pipe:
+        for path, query_params, data, expire in items:
+            pipe.set(build_cache_key(path, query_params), serializer.dumps(data), ex=expire)
+        await pipe.execute()
+
+
 async def cache_get(path: str, query_params: dict):
     """
     Получение кэша.
     """
     key = build_cache_key(path, query_params)
     cached = await get_redis_client().get(key)
-    return json.loads(cached) if cached else None
+    return serializer.loads(cached) if cached else None
+
+
+async def cache_get_json(path: str, query_params: dict) -> Optional[bytes]:
+    """
+    Получение кэша сразу в виде JSON-байт для ответа.
+    Для orjson байты из Redis отдаются как есть, без повторной валидации
+    и сериализации. Остальные сериализаторы приводятся к байтам orjson,
+    чтобы тело ответа и ETag совпадали при попадании в кэш и промахе.
+    """
+    key = build_cache_key(path, query_params)
+    cached = await get_redis_client().get(key)
+    if not cached:
+        return None
+    if not serializer.is_response_bytes:
+        cached = orjson.dumps(serializer.loads(cached))
+    return cached
 
 
 async def cache_delete(path: str, query_params: dict):
@@ -54,4 +218,18 @@ async def cache_delete(path: str, query_params: dict):
     """
     key = build_cache_key(path, query_params)
     logger.info(f"Key = {key}")
-    await get_redis_client().delete(key)
\ No newline at end of file
+    local_cache.delete(key)
+    await get_redis_client().delete(key)
+
+
+async def cache_delete_many(items: list):
+    """
+    Удаление набора кэшей одной командой.
+    Элементы - кортежи (path, query_params).
+    """
+    keys = [build_cache_key(path, query_params) for path, query_params in items]
+    if not keys:
+        return
+    for key in keys:
+        local_cache.delete(key)
+    await get_redis_client().delete(*keys)
\ No newline at end of file
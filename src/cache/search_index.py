@@ -0,0 +1,129 @@
+import hashlib
+from typing import Iterable, List, Optional
+
+from src.cache import redis_client
+from src.config import SEARCH_CACHE_TTL
+
+
+SEARCH_INDEX_PREFIX = "search:"
+# Изменения, пришедшие, пока индекс строится по запросу в БД
+SEARCH_PENDING_PREFIX = "search_pending:"
+# Время жизни построения индекса (в секундах): за это время запрос в БД должен завершиться
+SEARCH_PENDING_TTL = 60
+# Маркер заполненного индекса: отличает "ссылок нет" от "индекс не построен".
+# Короткий код не может быть пустой строкой, поэтому коллизий нет.
+FILLED_MARKER = b""
+
+# Добавление кодов только в уже построенный индекс KEYS[1],
+# иначе неполный индекс выглядел бы как корректный результат поиска.
+# Если индекс строится (есть KEYS[2]), коды дописываются в построение.
+ADD_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('SADD', KEYS[1], unpack(ARGV))
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return redis.call('SADD', KEYS[2], unpack(ARGV))
+end
+return 0
+"""
+
+# Запись индекса KEYS[1] по результату запроса в БД (ARGV[2..]) вместе с кодами,
+# добавленными после начала построения (KEYS[2]). Если построение отменено
+# удалением ссылки или уже завершено другим запросом, индекс не записывается.
+FILL_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[2], '') == 0 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 2, #ARGV, 5000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 4999, #ARGV)))
+end
+redis.call('SUNIONSTORE', KEYS[1], KEYS[1], KEYS[2])
+redis.call('DEL', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def search_index_key(original_url: str) -> str:
+    """
+    Ключ индекса поиска: множество коротких кодов для хэша оригинального URL.
+    """
+    return SEARCH_INDEX_PREFIX + hashlib.sha1(original_url.encode()).hexdigest()
+
+
+def search_pending_key(original_url: str) -> str:
+    return SEARCH_PENDING_PREFIX + hashlib.sha1(original_url.encode()).hexdigest()
+
+
+async def search_index_get(original_url: str) -> Optional[List[str]]:
+    """
+    Короткие коды по оригинальному URL или None, если индекс не построен.
+    """
+    members = await redis_client.get_redis_client().smembers(search_index_key(original_url))
+    if FILLED_MARKER not in members:
+        return None
+    return sorted(member.decode() for member in members if member != FILLED_MARKER)
+
+
+async def search_index_begin_fill(original_url: str):
+    """
+    Начало построения индекса, вызывается до запроса в БД.
+    Ссылки, созданные после запроса, дописываются в построение и не теряются.
+    """
+    key = search_pending_key(original_url)
+    async with redis_client.get_redis_client().pipeline(transaction=True) as pipe:
+        pipe.sadd(key, FILLED_MARKER)
+        pipe.expire(key, SEARCH_PENDING_TTL)
+        await pipe.execute()
+
+
+async def search_index_fill(original_url: str, short_codes: Iterable[str]):
+    """
+    Построение индекса по результату запроса в БД, начатого search_index_begin_fill.
+    """
+    script = redis_client.get_script(FILL_SCRIPT)
+    await script(
+        keys=[search_index_key(original_url), search_pending_key(original_url)],
+        args=[SEARCH_CACHE_TTL, *short_codes],
+    )
+
+
+async def search_index_add(links: Iterable[tuple]):
+    """
+    Добавление ссылок (short_code, original_url) в построенные индексы.
+    """
+    by_url = group_by_url(links)
+    if not by_url:
+        return
+    script = redis_client.get_script(ADD_IF_EXISTS_SCRIPT)
+    async with redis_client.get_redis_client().pipeline(transaction=False) as pipe:
+        for original_url, short_codes in by_url.items():
+            await script(
+                keys=[search_index_key(original_url), search_pending_key(original_url)],
+                args=short_codes,
+                client=pipe,
+            )
+        await pipe.execute()
+
+
+async def search_index_remove(links: Iterable[tuple]):
+    """
+    Удаление ссылок (short_code, original_url) из индексов.
+    Идущее построение индекса отменяется: результат его запроса в БД мог уже устареть.
+    """
+    by_url = group_by_url(links)
+    if not by_url:
+        return
+    async with redis_client.get_redis_client().pipeline(transaction=False) as pipe:
+        for original_url, short_codes in by_url.items():
+            pipe.srem(search_index_key(original_url), *short_codes)
+            pipe.delete(search_pending_key(original_url))
+        await pipe.execute()
+
+
+def group_by_url(links: Iterable[tuple]) -> dict:
+    by_url = {}
+    for short_code, original_url in links:
+        by_url.setdefault(original_url, []).append(short_code)
+    return by_url
@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+from typing import Optional
+from src.config import (
+    REDIRECT_CACHE_TTL,
+    REDIRECT_CACHE_TTL_HOT,
+    REDIRECT_HOT_CLICKS,
+)
+
+
+def cap_ttl(ttl: int, expires_at: Optional[datetime], now: Optional[datetime] = None) -> int:
+    """
+    Ограничение TTL кэша сроком жизни ссылки.
+    Неположительный результат означает, что кэшировать нельзя.
+    """
+    if expires_at is None:
+        return ttl
+    now = now or datetime.now(timezone.utc)
+    return min(ttl, int((expires_at - now).total_seconds()))
+
+
+def redirect_ttl(clicks_count: Optional[int], expires_at: Optional[datetime], now: Optional[datetime] = None) -> int:
+    """
+    TTL кэша редиректа: популярные ссылки хранятся дольше,
+    но никогда не дольше собственного срока жизни.
+    """
+    if (clicks_count or 0) >= REDIRECT_HOT_CLICKS:
+        ttl = REDIRECT_CACHE_TTL_HOT
+    else:
+        ttl = REDIRECT_CACHE_TTL
+    return cap_ttl(ttl, expires_at, now)
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from sqlalchemy import select, or_
+from src.database import async_session_maker
+from src.links.models import ShortLink
+from src.logger_config import logger
+from src.cache.redis_client import build_cache_key, cache_set_many, redirect_cache_value
+from src.cache.local_cache import local_cache
+from src.cache.ttl import redirect_ttl
+from src.config import CACHE_WARMUP_LIMIT, CACHE_WARMUP_ORDER
+
+
+async def warm_up_redirect_cache(limit: int = CACHE_WARMUP_LIMIT, order: str = CACHE_WARMUP_ORDER) -> int:
+    """
+    Прогрев кэша редиректов самыми популярными ссылками.
+    Ссылки загружаются одним запросом и записываются в Redis одним пайплайном.
+    Возвращает количество прогретых ссылок.
+    """
+
+    logger.info("The redirect cache warm-up is running...")
+
+    # Популярность - по количеству переходов или по свежести последнего перехода
+    if order == "recent":
+        order_by = ShortLink.last_clicked_at.desc().nulls_last()
+    else:
+        order_by = ShortLink.clicks_count.desc().nulls_last()
+
+    now = datetime.now(timezone.utc)
+
+    async with async_session_maker() as session:
+        stmt = (
+            select(
+                ShortLink.short_code,
+                ShortLink.original_url,
+                ShortLink.clicks_count,
+                ShortLink.expires_at,
+                ShortLink.redirect_policy,
+            )
+            .where(ShortLink.is_active,
+                   or_(ShortLink.expires_at.is_(None),
+                       ShortLink.expires_at > now))
+            .order_by(order_by)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        rows = result.all()
+
+    items = []
+    for short_code, original_url, clicks_count, expires_at, redirect_policy in rows:
+        ttl = redirect_ttl(clicks_count, expires_at, now)
+        if ttl > 0:
+            value = redirect_cache_value(original_url, expires_at, redirect_policy)
+            items.append((f"/links/{short_code}", {}, value, ttl))
+
+    if items:
+        await cache_set_many(items)
+        for path, query_params, value, ttl in items:
+            local_cache.set(build_cache_key(path, query_params), value, ttl=ttl)
+
+    logger.info(f"Warmed up {len(items)} links")
+    return len(items)
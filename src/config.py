@@ -9,8 +9,121 @@ DB_PASS = os.getenv("DB_PASS")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
+# Пул соединений веб-приложения
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Сериализатор значений кэша: orjson, msgpack или json
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "orjson")
+# Локальный кэш редиректов внутри воркера
+LOCAL_CACHE_MAX_SIZE = int(os.getenv("LOCAL_CACHE_MAX_SIZE", 10000))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", 10))
+# Время жизни кэша (в секундах): редирект обычной и популярной ссылки
+REDIRECT_CACHE_TTL = int(os.getenv("REDIRECT_CACHE_TTL", 60))
+REDIRECT_CACHE_TTL_HOT = int(os.getenv("REDIRECT_CACHE_TTL_HOT", 3600))
+REDIRECT_HOT_CLICKS = int(os.getenv("REDIRECT_HOT_CLICKS", 100))
+# max-age постоянного редиректа (301/308) для браузеров и CDN (в секундах)
+REDIRECT_PERMANENT_MAX_AGE = int(os.getenv("REDIRECT_PERMANENT_MAX_AGE", 86400))
+# Индекс поиска поддерживается инкрементально, поэтому может жить долго
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 3600))
+# Прогрев кэша популярными ссылками при старте: порядок clicks или recent
+CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true"
+CACHE_WARMUP_LIMIT = int(os.getenv("CACHE_WARMUP_LIMIT", 1000))
+CACHE_WARMUP_ORDER = os.getenv("CACHE_WARMUP_ORDER", "clicks")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 JWT_LIFETIME_SECONDS = 3600
 
-LINK_LIFETIME_DAYS = int(os.getenv("LINK_LIFETIME_DAYS", 30))
\ No newline at end of file
+# Хранилище токенов авторизации: jwt (stateless) или redis (с отзывом токенов)
+AUTH_BACKEND = os.getenv("AUTH_BACKEND", "jwt")
+# Время жизни токена в Redis, продлевается при каждом запросе (sliding expiry)
+REDIS_TOKEN_LIFETIME_SECONDS = int(os.getenv("REDIS_TOKEN_LIFETIME_SECONDS", 3600))
+REDIS_AUTH_MAX_CONNECTIONS = int(os.getenv("REDIS_AUTH_MAX_CONNECTIONS", 50))
+
+LINK_LIFETIME_DAYS = int(os.getenv("LINK_LIFETIME_DAYS", 30))
+# Количество партиций links, очищаемых одновременно (каждая занимает соединение)
+CLEANUP_CONCURRENCY = int(os.getenv("CLEANUP_CONCURRENCY", 2))
+# Размер пачки удаления в одной транзакции
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", 5000))
+# Целевая скорость очистки (строк/с), ниже которой в лог пишется предупреждение
+CLEANUP_TARGET_ROWS_PER_SECOND = int(os.getenv("CLEANUP_TARGET_ROWS_PER_SECOND", 2000))
+
+# Ограничение частоты запросов, лимиты в формате "<запросы>/<секунды>"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_SHORTEN_ANONYMOUS = os.getenv("RATE_LIMIT_SHORTEN_ANONYMOUS", "10/60")
+RATE_LIMIT_SHORTEN_USER = os.getenv("RATE_LIMIT_SHORTEN_USER", "60/60")
+RATE_LIMIT_REDIRECT_ANONYMOUS = os.getenv("RATE_LIMIT_REDIRECT_ANONYMOUS", "120/60")
+RATE_LIMIT_REDIRECT_USER = os.getenv("RATE_LIMIT_REDIRECT_USER", "600/60")
+# Доля оставшегося лимита, которую воркер расходует локально без обращения к Redis
+RATE_LIMIT_LOCAL_FRACTION = float(os.getenv("RATE_LIMIT_LOCAL_FRACTION", 0.2))
+
+
+# Размер пачки строк при потоковой выгрузке ссылок
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Размер пачки строк при импорте ссылок
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 10000))
+# Максимальное количество кодов в одном массовом запросе
+BULK_MAX_CODES = int(os.getenv("BULK_MAX_CODES", 10000))
+# Алфавит и длина генерируемых коротких кодов
+SHORT_CODE_ALPHABET = os.getenv("SHORT_CODE_ALPHABET", "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+SHORT_CODE_LENGTH = int(os.getenv("SHORT_CODE_LENGTH", 10))
+# Максимальная длина оригинального URL, более длинные отклоняются до разбора
+MAX_URL_LENGTH = int(os.getenv("MAX_URL_LENGTH", 2048))
+# Зарезервированные слова (пути ручек), которые нельзя использовать как кастомный алиас
+RESERVED_ALIASES = frozenset(
+    alias.strip().lower()
+    for alias in os.getenv("RESERVED_ALIASES", "search,stats,shorten,export,import,bulk").split(",")
+    if alias.strip()
+)
+
+# Фоновая проверка доступности оригинальных URL
+URL_CHECK_ENABLED = os.getenv("URL_CHECK_ENABLED", "true").lower() == "true"
+# Через сколько часов URL проверяется повторно и сколько ссылок берется за запуск
+URL_CHECK_INTERVAL_HOURS = int(os.getenv("URL_CHECK_INTERVAL_HOURS", 24))
+URL_CHECK_BATCH_SIZE = int(os.getenv("URL_CHECK_BATCH_SIZE", 1000))
+# Общее число одновременных запросов, запросов к одному хосту и пауза между ними (в секундах)
+URL_CHECK_CONCURRENCY = int(os.getenv("URL_CHECK_CONCURRENCY", 20))
+URL_CHECK_PER_HOST = int(os.getenv("URL_CHECK_PER_HOST", 2))
+URL_CHECK_HOST_DELAY = float(os.getenv("URL_CHECK_HOST_DELAY", 1.0))
+URL_CHECK_TIMEOUT = float(os.getenv("URL_CHECK_TIMEOUT", 10.0))
+# Максимум редиректов при проверке; каждый переход проверяется на внутренние адреса
+URL_CHECK_MAX_REDIRECTS = int(os.getenv("URL_CHECK_MAX_REDIRECTS", 5))
+# Разрешить проверку URL во внутренних сетях (loopback, частные, link-local адреса)
+URL_CHECK_ALLOW_PRIVATE = os.getenv("URL_CHECK_ALLOW_PRIVATE", "false").lower() == "true"
+
+# Периодические задачи внутри веб-процесса; false - режим web-only без шедулера
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+# Трассировка HTTP-запросов, SQL и Redis (src/monitoring/tracing.py)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Доля трасс, попадающих в выборку (0..1)
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", 0.01))
+# Журнал медленных запросов (src/monitoring/slow_log.py, GET /debug/slow)
+SLOW_LOG_ENABLED = os.getenv("SLOW_LOG_ENABLED", "true").lower() == "true"
+# Пороги записи в журнал: HTTP-запрос целиком и отдельный SQL-запрос (в миллисекундах)
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+# Сколько последних записей хранится в памяти процесса
+SLOW_LOG_BUFFER_SIZE = int(os.getenv("SLOW_LOG_BUFFER_SIZE", 200))
+# Профилирование по запросу: GET /debug/profile и сигнал SIGUSR2 (src/monitoring/profiling.py)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# Максимальная длительность профилирования через эндпоинт (в секундах)
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", 60))
+# Длительность cpu-профиля по сигналу и каталог для файлов профилей
+PROFILING_SIGNAL_SECONDS = float(os.getenv("PROFILING_SIGNAL_SECONDS", 10))
+PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", "/tmp")
+# Пул соединений отдельного процесса-воркера (python -m src.worker)
+WORKER_DB_POOL_SIZE = int(os.getenv("WORKER_DB_POOL_SIZE", 4))
+WORKER_DB_MAX_OVERFLOW = int(os.getenv("WORKER_DB_MAX_OVERFLOW", 0))
+# Сколько секунд воркер ждет завершения запущенных задач при остановке
+WORKER_SHUTDOWN_TIMEOUT_SECONDS = int(os.getenv("WORKER_SHUTDOWN_TIMEOUT_SECONDS", 60))
+# Период записи накопленных в Redis переходов в БД (в секундах)
+CLICKS_SYNC_INTERVAL_SECONDS = int(os.getenv("CLICKS_SYNC_INTERVAL_SECONDS", 30))
+# Время жизни блокировки синхронизации переходов (в секундах), должно превышать длительность одной синхронизации
+CLICKS_SYNC_LOCK_TTL_SECONDS = int(os.getenv("CLICKS_SYNC_LOCK_TTL_SECONDS", 60))
+
+# Хук инвалидации CDN при изменении и удалении ссылок (пустой URL отключает хук)
+CDN_PURGE_URL = os.getenv("CDN_PURGE_URL", "")
+CDN_PURGE_TOKEN = os.getenv("CDN_PURGE_TOKEN", "")
+CDN_PURGE_TIMEOUT = float(os.getenv("CDN_PURGE_TIMEOUT", 5.0))
\ No newline at end of file
@@ -1,18 +1,45 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from src.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from src.config import (
+    DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, DB_POOL_SIZE, DB_MAX_OVERFLOW, TRACING_ENABLED, SLOW_LOG_ENABLED,
+)
 from sqlalchemy.orm import declarative_base
+from src.monitoring.slow_log import install_slow_query_log
+from src.monitoring.tracing import TracedAsyncAdaptedQueuePool, instrument_engine
 
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 Base = declarative_base()
 
+
+def create_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    options = {"pool_size": pool_size, "max_overflow": max_overflow}
+    if TRACING_ENABLED:
+        # Спаны получения соединения из пула, SQL-запросов и фиксации транзакций
+        options["poolclass"] = TracedAsyncAdaptedQueuePool
+    new_engine = create_async_engine(DATABASE_URL, echo=False, **options)
+    if TRACING_ENABLED:
+        instrument_engine(new_engine.sync_engine)
+    if SLOW_LOG_ENABLED:
+        install_slow_query_log(new_engine.sync_engine)
+    return new_engine
+
+
 # Движок и фабрика сессий
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_engine(DB_POOL_SIZE, DB_MAX_OVERFLOW)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+
+def use_engine(new_engine: AsyncEngine):
+    """
+    Переключение фабрики сессий на другой движок (например, с пулом воркера).
+    Модули, импортировавшие async_session_maker, получают сессии нового движка.
+    """
+    async_session_maker.configure(bind=new_engine)
+
+
 # Зависимость для получения сессии внутри эндпоинтов
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
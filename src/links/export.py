@@ -0,0 +1,74 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator
+
+import orjson
+from sqlalchemy import Select
+
+from src.database import async_session_maker
+from src.links.models import ShortLink
+from src.config import EXPORT_BATCH_SIZE
+
+
+EXPORT_COLUMNS = (
+    ShortLink.short_code,
+    ShortLink.original_url,
+    ShortLink.created_at,
+    ShortLink.clicks_count,
+    ShortLink.last_clicked_at,
+    ShortLink.expires_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def format_csv(rows, header: bool = False) -> str:
+    """
+    Форматирование пачки строк в CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    return buffer.getvalue()
+
+
+def format_ndjson(rows) -> bytes:
+    """
+    Форматирование пачки строк в NDJSON (по JSON-объекту на строку).
+    """
+    return b"".join(orjson.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+
+async def stream_links_export(stmt: Select, export_format: str) -> AsyncIterator:
+    """
+    Потоковая выгрузка ссылок через серверный курсор.
+    В памяти одновременно находится не больше одной пачки строк.
+
+    Сессия открывается внутри генератора, так как зависимость
+    `get_async_session` закрывается до начала отправки ответа.
+    """
+
+    if export_format == "csv":
+        yield format_csv([], header=True)
+
+    async with async_session_maker() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield format_csv(rows)
+            else:
+                yield format_ndjson(rows)
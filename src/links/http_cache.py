@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request
+from starlette.responses import RedirectResponse, Response
+
+from src.cache.ttl import cap_ttl
+from src.config import REDIRECT_PERMANENT_MAX_AGE
+
+
+# Политика редиректа ссылки -> HTTP-статус.
+# tracked - каждый переход проходит через сервис и учитывается в статистике,
+# permanent - браузер и CDN могут кэшировать редирект (переходы из кэша не учитываются).
+REDIRECT_POLICIES = {
+    "tracked": 302,
+    "permanent": 301,
+    "permanent_308": 308,
+}
+DEFAULT_REDIRECT_POLICY = "tracked"
+
+
+def redirect_response(
+    url: str,
+    policy: Optional[str],
+    expires_at: Optional[datetime],
+    now: Optional[datetime] = None,
+) -> RedirectResponse:
+    """
+    Редирект с заголовком Cache-Control по политике ссылки.
+    Постоянный редирект кэшируется не дольше срока жизни ссылки.
+    """
+    status_code = REDIRECT_POLICIES.get(policy or DEFAULT_REDIRECT_POLICY, 302)
+    cache_control = "no-store"
+    if status_code != 302:
+        max_age = cap_ttl(REDIRECT_PERMANENT_MAX_AGE, expires_at, now)
+        if max_age > 0:
+            cache_control = f"public, max-age={max_age}"
+        else:
+            status_code = 302
+    return RedirectResponse(url=url, status_code=status_code, headers={"Cache-Control": cache_control})
+
+
+def build_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (список тегов, слабые теги и "*").
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for value in header.split(","):
+        value = value.strip()
+        if value == "*" or value.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def json_response(request: Request, body: bytes) -> Response:
+    """
+    JSON-ответ с ETag: при совпадении с If-None-Match возвращается 304 без тела.
+    Клиент должен перепроверять ответ при каждом запросе (no-cache).
+    """
+    etag = build_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Iterator, Optional
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from src.database import engine
+from src.cache.search_index import search_index_add
+from src.links.schemas import LinkCreate
+from src.links.validation import is_reserved_alias
+from src.logger_config import logger
+from src.utils.shortcode import short_code_generator
+from src.config import IMPORT_BATCH_SIZE
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Сколько примеров конфликтов и ошибок возвращать в отчете
+REPORT_SAMPLES = 100
+# Сколько раз генерировать новый код, если сгенерированный уже занят
+CODE_ATTEMPTS = 3
+
+STAGING_TABLE_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS links_import (
+    id uuid NOT NULL,
+    short_code varchar(50) NOT NULL,
+    original_url text NOT NULL,
+    expires_at timestamptz,
+    redirect_policy varchar(20) NOT NULL,
+    is_custom boolean NOT NULL
+)
+"""
+STAGING_COLUMNS = ["id", "short_code", "original_url", "expires_at", "redirect_policy", "is_custom"]
+
+# Кастомные алиасы из пачки, которые уже заняты
+CONFLICTS_SQL = text("""
+SELECT s.short_code FROM links_import s
+JOIN links l ON l.short_code = s.short_code
+WHERE s.is_custom
+LIMIT :limit
+""")
+
+MERGE_SQL = text("""
+INSERT INTO links (id, short_code, original_url, user_id, expires_at, redirect_policy)
+SELECT id, short_code, original_url, CAST(:user_id AS uuid), expires_at, redirect_policy FROM links_import
+ON CONFLICT (short_code) DO NOTHING
+RETURNING short_code, original_url
+""")
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    imported: int = 0
+    invalid: int = 0
+    # Кастомные алиасы, которые уже заняты или повторяются в файле
+    conflicts: int = 0
+    # Строки, для которых не удалось сгенерировать свободный код
+    collisions: int = 0
+    conflict_samples: list = field(default_factory=list)
+    error_samples: list = field(default_factory=list)
+
+    def add_sample(self, samples: list, value):
+        if len(samples) < REPORT_SAMPLES:
+            samples.append(value)
+
+
+def iter_raw_rows(file: BinaryIO, import_format: str) -> Iterator:
+    """
+    Построчное чтение файла импорта без загрузки его в память целиком.
+    CSV должен содержать заголовок с колонками original_url, custom_alias, expires_at
+    и необязательной redirect_policy.
+    Строки не разбираются до конца: ошибки разбора одной строки обрабатываются
+    в parse_row, чтобы она попала в отчет как невалидная, а не прервала импорт.
+    """
+    if import_format == "csv":
+        # Некорректные байты UTF-8 сохраняются как суррогаты и отклоняются в parse_row
+        reader = csv.DictReader(codecs.iterdecode(file, "utf-8", errors="surrogateescape"))
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield e
+                continue
+            yield row
+    else:
+        for line in file:
+            if line.strip():
+                yield line
+
+
+def parse_row(raw, import_format: str) -> dict:
+    """
+    Словарь полей строки импорта. ValueError, если строку не удалось разобрать.
+    """
+    if isinstance(raw, csv.Error):
+        raise ValueError(f"Malformed CSV row: {raw}")
+    if import_format == "csv":
+        for value in raw.values():
+            if isinstance(value, str):
+                # UnicodeEncodeError (ValueError) для суррогатов из некорректных байт
+                value.encode("utf-8")
+        row = raw
+    else:
+        # orjson.JSONDecodeError - подкласс ValueError, в том числе для некорректного UTF-8
+        row = orjson.loads(raw)
+    if not isinstance(row, dict):
+        raise ValueError("Import row must be a JSON object")
+    return row
+
+
+def iter_import_records(file: BinaryIO, import_format: str, report: ImportReport) -> Iterator[tuple]:
+    """
+    Валидация строк импорта валидаторами `LinkCreate`
+    и преобразование в записи для COPY в staging-таблицу.
+    """
+    # Коды для строк без алиаса генерируются пачками
+    codes = short_code_generator.iter_codes()
+    for line_number, raw in enumerate(iter_raw_rows(file, import_format), start=1):
+        report.processed += 1
+        try:
+            # Пустые значения в CSV означают отсутствие алиаса / срока жизни
+            row = {key: value for key, value in parse_row(raw, import_format).items() if value not in ("", None)}
+            link = LinkCreate.model_validate(row)
+            if link.custom_alias and is_reserved_alias(link.custom_alias):
+                raise ValueError(f"Custom alias '{link.custom_alias}' cannot be used!")
+        except (ValidationError, ValueError, TypeError) as e:
+            report.invalid += 1
+            report.add_sample(report.error_samples, {"line": line_number, "error": str(e)})
+            continue
+
+        link_id = uuid.uuid4()
+        short_code = link.custom_alias or next(codes)
+        yield (
+            link_id, short_code, link.original_url, link.expires_at, link.redirect_policy,
+            link.custom_alias is not None,
+        )
+
+
+def regenerate_codes(records: list) -> list:
+    """
+    Записи с новыми id и сгенерированными кодами вместо занятых.
+    """
+    codes = short_code_generator.generate_many(len(records))
+    return [
+        (uuid.uuid4(), short_code, original_url, expires_at, redirect_policy, is_custom)
+        for short_code, (_, _, original_url, expires_at, redirect_policy, is_custom) in zip(codes, records)
+    ]
+
+
+def split_not_imported(batch: list, imported_codes: set) -> tuple:
+    """
+    Неимпортированные строки пачки: количество конфликтов кастомных алиасов
+    (занятых или повторяющихся в пачке) и записи со сгенерированными кодами,
+    которые оказались заняты.
+    """
+    custom_rows = 0
+    custom_imported = set()
+    collided = []
+    for record in batch:
+        short_code, is_custom = record[1], record[-1]
+        if is_custom:
+            custom_rows += 1
+            if short_code in imported_codes:
+                custom_imported.add(short_code)
+        elif short_code not in imported_codes:
+            collided.append(record)
+    return custom_rows - len(custom_imported), collided
+
+
+def iter_batches(records: Iterator[tuple], size: int) -> Iterator[list]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_links(
+    file: BinaryIO,
+    import_format: str,
+    user_id: Optional[uuid.UUID] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Потоковый импорт ссылок: пачки строк загружаются через COPY
+    во временную staging-таблицу и переносятся в links одним INSERT ... SELECT.
+    Каждая пачка - отдельная транзакция, память не зависит от размера файла.
+    """
+
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{import_format}'")
+
+    report = ImportReport()
+    batches = iter_batches(iter_import_records(file, import_format, report), batch_size)
+
+    async with engine.connect() as conn:
+        # Временная таблица живет в рамках соединения
+        async with conn.begin():
+            await conn.execute(text(STAGING_TABLE_DDL))
+        raw_connection = await conn.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        while True:
+            # Разбор файла и валидация пачки - синхронная работа, она выполняется
+            # в потоке, чтобы не блокировать event loop (и редиректы) на время загрузки
+            batch = await run_in_threadpool(next, batches, None)
+            if batch is None:
+                break
+
+            async with conn.begin():
+                # TRUNCATE заодно открывает транзакцию, в которой выполнится COPY
+                await conn.execute(text("TRUNCATE links_import"))
+                await driver_connection.copy_records_to_table(
+                    "links_import", records=batch, columns=STAGING_COLUMNS,
+                )
+                result = await conn.execute(CONFLICTS_SQL, {"limit": REPORT_SAMPLES})
+                for (short_code,) in result:
+                    report.add_sample(report.conflict_samples, short_code)
+                result = await conn.execute(MERGE_SQL, {"user_id": user_id})
+                imported_links = result.all()
+
+                conflicts, collided = split_not_imported(batch, {code for code, _ in imported_links})
+                # Занятые сгенерированные коды генерируются заново
+                for _ in range(CODE_ATTEMPTS):
+                    if not collided:
+                        break
+                    collided = regenerate_codes(collided)
+                    await conn.execute(text("TRUNCATE links_import"))
+                    await driver_connection.copy_records_to_table(
+                        "links_import", records=collided, columns=STAGING_COLUMNS,
+                    )
+                    result = await conn.execute(MERGE_SQL, {"user_id": user_id})
+                    retried = result.all()
+                    imported_links.extend(retried)
+                    _, collided = split_not_imported(collided, {code for code, _ in retried})
+
+            await search_index_add(imported_links)
+            report.imported += len(imported_links)
+            report.conflicts += conflicts
+            report.collisions += len(collided)
+            if on_progress is not None:
+                on_progress(report)
+
+    return report
+
+
+def log_progress(started_at: float) -> Callable[[ImportReport], None]:
+    """
+    Логирование прогресса импорта.
+    """
+    def callback(report: ImportReport):
+        rate = report.processed / max(time.monotonic() - started_at, 1e-6)
+        logger.info(
+            f"Import progress: processed {report.processed}, imported {report.imported}, "
+            f"conflicts {report.conflicts}, collisions {report.collisions}, invalid {report.invalid} "
+            f"({rate:.0f} rows/s)"
+        )
+    return callback
+
+
+async def main(path: str, import_format: str, user_id: Optional[uuid.UUID], batch_size: int):
+    with open(path, "rb") as file:
+        report = await import_links(
+            file, import_format, user_id, batch_size, on_progress=log_progress(time.monotonic())
+        )
+    logger.info(f"Import is ended: {report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import of links from CSV / NDJSON")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default="csv")
+    parser.add_argument("--user-id", type=uuid.UUID, default=None)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.format, args.user_id, args.batch_size))
@@ -2,7 +2,7 @@ import uuid
 import string
 import secrets
 
-from sqlalchemy import Column, String, ForeignKey, Text, Integer, DateTime
+from sqlalchemy import Column, String, ForeignKey, Text, Integer, DateTime, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from src.database import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -11,13 +11,60 @@ from sqlalchemy.sql import func
 
 class ShortLink(Base):
     __tablename__ = "links"
+    # Hash-партиционирование по short_code: поиск по коду затрагивает одну партицию.
+    # Партиции links_p{N} создаются миграцией.
+    __table_args__ = (
+        # Частичный индекс для задачи архивации: неактивных ссылок мало
+        Index("ix_links_inactive", "id", postgresql_where=text("NOT is_active")),
+        {"postgresql_partition_by": "HASH (short_code)"},
+    )
 
+    # Ключ партиционирования обязан входить в первичный ключ
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    short_code = Column(String(50), unique=True, index=True, nullable=False)
+    short_code = Column(String(50), primary_key=True, unique=True, index=True, nullable=False)
     original_url = Column(Text, nullable=False)
     user_id = Column(ForeignKey("users.id"), nullable=True)
     user = relationship("User")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     clicks_count = Column(Integer, server_default="0")  # Счетчик переходов
     last_clicked_at = Column(DateTime(timezone=True), nullable=True)  # Дата и время последнего перехода
-    expires_at = Column(DateTime(timezone=True), nullable=True)  # Время жизни
\ No newline at end of file
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # Время жизни
+    # Флаг активности: истекшие и неиспользуемые ссылки сначала деактивируются,
+    # затем фоновая задача переносит их в links_archive
+    is_active = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+    # Результат фоновой проверки доступности original_url:
+    # HTTP-статус ответа или 0, если сервер недоступен
+    url_status = Column(Integer, nullable=True)
+    url_checked_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Политика редиректа: tracked (302, no-store) или permanent / permanent_308 (кэшируемый 301 / 308)
+    redirect_policy = Column(String(20), nullable=False, default="tracked", server_default="tracked")
+
+
+class ShortLinkArchive(Base):
+    """
+    Архив деактивированных ссылок: хранит историю и статистику
+    переходов после удаления ссылки из основной таблицы.
+    """
+    __tablename__ = "links_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    short_code = Column(String(50), index=True, nullable=False)
+    original_url = Column(Text, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    clicks_count = Column(Integer, server_default="0")
+    last_clicked_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    redirect_policy = Column(String(20), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())  # Дата и время архивации
+
+
+class ClickSyncBatch(Base):
+    """
+    Пачки переходов, уже записанные из Redis в links.clicks_count.
+    Повторная запись той же пачки (например, после истечения блокировки) пропускается.
+    """
+    __tablename__ = "click_sync_batches"
+
+    batch_id = Column(String(32), primary_key=True)
+    applied_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
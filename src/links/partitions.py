@@ -0,0 +1,35 @@
+from typing import List
+
+from sqlalchemy import Table, column, table, text
+
+from src.database import async_session_maker
+from src.links.models import ShortLink
+
+
+PARTITIONS_SQL = text("""
+SELECT c.relname FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'links'::regclass
+ORDER BY c.relname
+""")
+
+
+async def get_links_partitions() -> List[str]:
+    """
+    Имена партиций таблицы links.
+    Для непартиционированной таблицы возвращается сама таблица.
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(PARTITIONS_SQL)
+        partitions = list(result.scalars().all())
+    return partitions or [ShortLink.__tablename__]
+
+
+def links_partition(name: str) -> Table:
+    """
+    Таблица-партиция links с теми же колонками, что и у модели,
+    для запросов напрямую к одной партиции.
+    """
+    if name == ShortLink.__tablename__:
+        return ShortLink.__table__
+    return table(name, *(column(c.name, c.type) for c in ShortLink.__table__.columns))
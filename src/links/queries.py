@@ -0,0 +1,95 @@
+"""
+Запросы горячих путей (редирект, статистика, создание ссылки).
+
+Запросы строятся один раз при импорте модуля, короткий код передается
+как именованный bound-параметр. Поэтому на каждый вызов не строится
+новое дерево выражений, а ключ кэша компиляции SQLAlchemy вычисляется
+по уже готовому запросу. Выбираются только нужные колонки в виде
+кортежей, без ORM-объектов и identity map - эти пути только читают данные.
+Сравнение с построением запроса на каждый вызов: benchmarks/bench_queries.py.
+"""
+from typing import Optional
+
+from sqlalchemy import Row, bindparam, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.links.models import ShortLink, ShortLinkArchive
+
+
+REDIRECT_TARGET_STMT = select(
+    ShortLink.original_url,
+    ShortLink.expires_at,
+    ShortLink.clicks_count,
+    ShortLink.is_active,
+    ShortLink.redirect_policy,
+).where(ShortLink.short_code == bindparam("short_code"))
+
+LINK_STATS_STMT = select(
+    ShortLink.short_code,
+    ShortLink.original_url,
+    ShortLink.created_at,
+    ShortLink.clicks_count,
+    ShortLink.last_clicked_at,
+    ShortLink.expires_at,
+    ShortLink.redirect_policy,
+    ShortLink.is_active,
+    ShortLink.url_status,
+    ShortLink.url_checked_at,
+).where(ShortLink.short_code == bindparam("short_code"))
+
+ARCHIVED_STATS_STMT = (
+    select(
+        ShortLinkArchive.short_code,
+        ShortLinkArchive.original_url,
+        ShortLinkArchive.created_at,
+        ShortLinkArchive.clicks_count,
+        ShortLinkArchive.last_clicked_at,
+        ShortLinkArchive.expires_at,
+        ShortLinkArchive.redirect_policy,
+        ShortLinkArchive.archived_at,
+    )
+    .where(ShortLinkArchive.short_code == bindparam("short_code"))
+    .order_by(ShortLinkArchive.archived_at.desc())
+    .limit(1)
+)
+
+# Занятость кода проверяет уникальный индекс: при конфликте строка не вставляется
+# и RETURNING ничего не возвращает, без отдельного SELECT и без IntegrityError
+INSERT_LINK_STMT = (
+    insert(ShortLink.__table__)
+    .on_conflict_do_nothing(index_elements=["short_code"])
+    .returning(ShortLink.__table__.c.short_code)
+)
+
+
+async def get_redirect_target(session: AsyncSession, short_code: str) -> Optional[Row]:
+    """
+    Данные для редиректа: (original_url, expires_at, clicks_count, is_active, redirect_policy).
+    """
+    result = await session.execute(REDIRECT_TARGET_STMT, {"short_code": short_code})
+    return result.first()
+
+
+async def get_link_stats(session: AsyncSession, short_code: str) -> Optional[Row]:
+    """
+    Колонки статистики активной или деактивированной ссылки.
+    """
+    result = await session.execute(LINK_STATS_STMT, {"short_code": short_code})
+    return result.first()
+
+
+async def get_archived_stats(session: AsyncSession, short_code: str) -> Optional[Row]:
+    """
+    Колонки статистики из последней архивной записи по короткому коду.
+    """
+    result = await session.execute(ARCHIVED_STATS_STMT, {"short_code": short_code})
+    return result.first()
+
+
+async def insert_link(session: AsyncSession, values: dict) -> bool:
+    """
+    Создание ссылки одним запросом. False, если короткий код уже занят.
+    """
+    result = await session.execute(INSERT_LINK_STMT, values)
+    return result.first() is not None
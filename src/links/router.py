@@ -1,23 +1,63 @@
+import time
 import uuid
+import orjson
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List
+from typing import Optional, List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import RedirectResponse
-from sqlalchemy import select
+from starlette.responses import StreamingResponse
+from sqlalchemy import select, delete, update, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from src.database import get_async_session
 from src.auth.manager import optional_user, current_active_user
 from src.auth.models import User
 from src.links.models import ShortLink
-from src.utils.shortcode import generate_short_code_from_uuid
-from src.links.schemas import LinkCreate, LinkRead, LinkStats, LinkUpdate
-from src.cache.redis_client import cache_get, cache_set, cache_delete
+from src.utils.shortcode import generate_short_code
+from src.links.schemas import (
+    LinkCreate,
+    LinkRead,
+    LinkStats,
+    LinkUpdate,
+    LinkBulkDelete,
+    LinkBulkUpdate,
+    LinkBulkResult,
+)
+from src.links.validation import is_reserved_alias
+from src.links.export import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, stream_links_export
+from src.links.importer import import_links, log_progress
+from src.links.http_cache import json_response, redirect_response
+from src.links.queries import get_redirect_target, get_link_stats, get_archived_stats, insert_link
+from src.cache.redis_client import (
+    build_cache_key,
+    cache_get,
+    cache_get_json,
+    cache_set,
+    cache_delete,
+    cache_delete_many,
+    redirect_cache_value,
+    cached_expires_at,
+)
+from src.cache.local_cache import local_cache
+from src.cache.clicks import PendingClicks, resolve_and_count, count_click, get_pending_clicks
+from src.cache.cdn import purge_cdn
+from src.cache.search_index import (
+    search_index_get,
+    search_index_begin_fill,
+    search_index_fill,
+    search_index_add,
+    search_index_remove,
+)
+from src.cache.ttl import cap_ttl, redirect_ttl
+from src.config import LOCAL_CACHE_TTL
 
 
 router = APIRouter()
 
+# Сколько раз генерировать новый код, если сгенерированный уже занят
+CODE_ATTEMPTS = 3
+
 
 @router.post("/shorten", response_model=LinkRead)
 async def create_short_link(
@@ -29,29 +69,8 @@ async def create_short_link(
     Создание короткой ссылки.
     """
 
-    link_id = uuid.uuid4()
-
-    # Указана кастомная ссылка
-    if link_data.custom_alias:
-        if link_data.custom_alias == 'search':
-            raise HTTPException(status_code=400, detail=f"Custom alias '{link_data.custom_alias}' cannot be used!")
-        # Проверка на уникальность
-        stmt = select(ShortLink).where(ShortLink.short_code == link_data.custom_alias)
-        result = await session.execute(stmt)
-        exiting_alias = result.scalars().first()
-
-        if exiting_alias:
-            raise HTTPException(status_code=400, detail=f"Custom alias '{link_data.custom_alias}' is already in use!")
-        
-        short_code = link_data.custom_alias
-    else:
-        while True:
-            short_code = generate_short_code_from_uuid(link_id)
-            stmt = select(ShortLink).where(ShortLink.short_code == short_code)
-            result = await session.execute(stmt)
-            existing = result.scalars().first()
-            if not existing:
-                break
+    if link_data.custom_alias and is_reserved_alias(link_data.custom_alias):
+        raise HTTPException(status_code=400, detail=f"Custom alias '{link_data.custom_alias}' cannot be used!")
 
     # Если анонимный пользователь, то задаем время жизни ссылки на 1 день
     if not user and not link_data.expires_at:
@@ -59,24 +78,33 @@ async def create_short_link(
 
     # Если пользователь авторизован, записывается user_id,
     # иначе None - ссылка "анонимная"
-    new_link = ShortLink(
-        id=link_id,
-        short_code=short_code,
-        original_url=link_data.original_url,
-        user_id=user.id if user else None,
-        expires_at=link_data.expires_at
-    )
-    session.add(new_link)
+    values = {
+        "id": uuid.uuid4(),
+        "original_url": link_data.original_url,
+        "user_id": user.id if user else None,
+        "expires_at": link_data.expires_at,
+        "redirect_policy": link_data.redirect_policy,
+    }
+
+    # Уникальность кода проверяется самой вставкой (ON CONFLICT DO NOTHING),
+    # поэтому одновременные запросы с одним алиасом не приводят к IntegrityError
+    if link_data.custom_alias:
+        short_code = link_data.custom_alias
+        if not await insert_link(session, {**values, "short_code": short_code}):
+            raise HTTPException(status_code=400, detail=f"Custom alias '{short_code}' is already in use!")
+    else:
+        for _ in range(CODE_ATTEMPTS):
+            short_code = generate_short_code()
+            if await insert_link(session, {**values, "short_code": short_code}):
+                break
+        else:
+            raise HTTPException(status_code=503, detail="Could not generate a unique short code, try again!")
     await session.commit()
-    await session.refresh(new_link)
 
-    # Удаление кэша
-    await cache_delete(f"/links/search", {"original_url": link_data.original_url})
+    # Обновление индекса поиска
+    await search_index_add([(short_code, link_data.original_url)])
 
-    return LinkRead(
-        short_code=new_link.short_code,
-        original_url=new_link.original_url,
-    )
+    return LinkRead(short_code=short_code, original_url=link_data.original_url)
 
 
 @router.get("/search", response_model=List[LinkRead])
@@ -87,25 +115,75 @@ async def search_links_by_original(
 ):
     """
     Поиск коротких ссылок по оригинальному URL.
+    Ответ содержит ETag, при совпадении с If-None-Match возвращается 304.
     """
 
-    # Поиск кэша
-    cached = await cache_get(request.url.path, {"original_url": original_url})
-    if cached:
-        return cached
-    
-    stmt = select(ShortLink).where(ShortLink.original_url == original_url)
-    result = await session.execute(stmt)
-    links = result.scalars().all()
+    # Поиск в индексе Redis, при его отсутствии - в БД с построением индекса
+    short_codes = await search_index_get(original_url)
+    if short_codes is None:
+        await search_index_begin_fill(original_url)
+        stmt = select(ShortLink.short_code).where(ShortLink.original_url == original_url, ShortLink.is_active)
+        result = await session.execute(stmt)
+        short_codes = result.scalars().all()
+        await search_index_fill(original_url, short_codes)
 
-    if not links:
+    if not short_codes:
         raise HTTPException(status_code=404, detail="Original link not found!")
-    
-    # Кэширование
-    response = [LinkRead.model_validate(link) for link in links]
-    await cache_set(request.url.path, {"original_url": original_url}, response)
-    
-    return links
+
+    return json_response(
+        request,
+        orjson.dumps([{"short_code": code, "original_url": original_url} for code in short_codes]),
+    )
+
+
+@router.get("/export")
+async def export_links(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    all_users: bool = Query(False),
+    user: User = Depends(current_active_user),
+):
+    """
+    Потоковая выгрузка ссылок пользователя со статистикой переходов.
+    Администратор может выгрузить ссылки всех пользователей.
+    """
+
+    if all_users and not user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only admins can export links of all users!")
+
+    stmt = select(*EXPORT_COLUMNS)
+    if not all_users:
+        stmt = stmt.where(ShortLink.user_id == user.id)
+
+    return StreamingResponse(
+        stream_links_export(stmt, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=links.{export_format}"},
+    )
+
+
+@router.post("/import")
+async def import_user_links(
+    file: UploadFile,
+    import_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    user: User = Depends(current_active_user),
+):
+    """
+    Массовый импорт ссылок пользователя из CSV / NDJSON файла
+    с колонками original_url, custom_alias, expires_at и необязательной redirect_policy.
+    """
+
+    report = await import_links(file.file, import_format, user.id, on_progress=log_progress(time.monotonic()))
+
+    return {
+        "status": "success",
+        "processed": report.processed,
+        "imported": report.imported,
+        "invalid": report.invalid,
+        "conflicts": report.conflicts,
+        "collisions": report.collisions,
+        "conflict_samples": report.conflict_samples,
+        "error_samples": report.error_samples,
+    }
 
 
 @router.get("/{short_code}")
@@ -118,35 +196,61 @@ async def redirect_by_code(
     Поиск короткой ссылки и редирект. 
     """
 
-    # Поиск кэша
-    cached = await cache_get(request.url.path, {})
+    now = datetime.now(timezone.utc)
+
+    # Поиск кэша: сначала в памяти воркера, затем в Redis.
+    # Переход учитывается в Redis тем же запросом, что и чтение кэша,
+    # и записывается в БД периодической задачей.
+    cache_key = build_cache_key(request.url.path, {})
+    cached = local_cache.get(cache_key)
+    from_local_cache = cached is not None
+    if not from_local_cache:
+        # Скрипт не учитывает переход по истекшей ссылке
+        cached = await resolve_and_count(short_code, cache_key, now)
+        if cached:
+            local_cache.set(cache_key, cached, ttl=cap_ttl(LOCAL_CACHE_TTL, cached_expires_at(cached)))
     if cached:
-        return cached
+        expires_at = cached_expires_at(cached)
+        if expires_at is not None and expires_at <= now:
+            raise HTTPException(status_code=410, detail="Short link has expired!")
+        if from_local_cache:
+            await count_click(short_code)
+        return redirect_response(cached["url"], cached.get("policy"), expires_at, now)
 
-    # Получение объекта по короткой ссылке
-    stmt = select(ShortLink).where(ShortLink.short_code == short_code)
-    result = await session.execute(stmt)
-    link = result.scalars().first()
+    # Получение колонок, нужных для редиректа, по короткой ссылке
+    link = await get_redirect_target(session, short_code)
 
-    # Короткая ссылка не найдена
+    # Короткая ссылка не найдена: архивная ссылка отдает 410, неизвестная - 404
     if not link:
+        if await get_archived_stats(session, short_code):
+            raise HTTPException(status_code=410, detail="Short link has been archived!")
         raise HTTPException(status_code=404, detail="Short link not found!")
-    
-    await cache_set(request.url.path, {}, link.original_url, expire=60)
-    
-    # Обновление данных связи и удаление кэша
-    link.clicks_count += 1
-    link.last_clicked_at = datetime.now(timezone.utc)
-    await session.commit()
-    await cache_delete(f"/links/{short_code}/stats", {})
 
-    return RedirectResponse(url=link.original_url, status_code=302)
+    # Деактивированная шедулером ссылка больше не редиректит
+    if not link.is_active:
+        raise HTTPException(status_code=410, detail="Short link is inactive!")
+
+    # Истекшая ссылка не редиректит, даже если ее еще не деактивировал шедулер
+    if link.expires_at is not None and link.expires_at <= now:
+        raise HTTPException(status_code=410, detail="Short link has expired!")
+
+    # Кэширование с TTL по популярности ссылки, но не дольше срока ее жизни
+    ttl = redirect_ttl(link.clicks_count, link.expires_at, now)
+    if ttl > 0:
+        cached = redirect_cache_value(link.original_url, link.expires_at, link.redirect_policy)
+        await cache_set(request.url.path, {}, cached, expire=ttl)
+        local_cache.set(cache_key, cached, ttl=ttl)
+
+    await count_click(short_code)
+
+    return redirect_response(link.original_url, link.redirect_policy, link.expires_at, now)
 
 
 @router.put("/{short_code}", response_model=LinkRead)
 async def update_link(
     short_code: str,
     link_data: LinkUpdate,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
@@ -165,17 +269,26 @@ async def update_link(
     if link.user_id is None or link.user_id != user.id:
         raise HTTPException(status_code=403, detail="You have no access to this link!")
 
+    if not link.is_active:
+        raise HTTPException(status_code=410, detail="Short link is inactive!")
+
     # Обновление исходного URL
     previous_url = link.original_url
     link.original_url = link_data.original_url
+    # Новый URL будет проверен фоновой задачей заново
+    link.url_status = None
+    link.url_checked_at = None
+    if link_data.redirect_policy is not None:
+        link.redirect_policy = link_data.redirect_policy
     await session.commit()
     await session.refresh(link)
 
     # Удаление кэша
-    await cache_delete(f"/links/search", {"original_url": previous_url})
-    await cache_delete(f"/links/search", {"original_url": link_data.original_url})
+    await search_index_remove([(short_code, previous_url)])
+    await search_index_add([(short_code, link_data.original_url)])
     await cache_delete(f"/links/{short_code}", {})
     await cache_delete(f"/links/{short_code}/stats", {})
+    background_tasks.add_task(purge_cdn, [f"/links/{short_code}"])
 
     return LinkRead.model_validate(link)
 
@@ -183,6 +296,7 @@ async def update_link(
 @router.delete("/{short_code}")
 async def delete_link(
     short_code: str,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
@@ -207,13 +321,111 @@ async def delete_link(
     await session.commit()
 
     # Удаление кэша
-    await cache_delete(f"/links/search", {"original_url": link.original_url})
+    await search_index_remove([(short_code, link.original_url)])
     await cache_delete(f"/links/{short_code}", {})
     await cache_delete(f"/links/{short_code}/stats", {})
+    background_tasks.add_task(purge_cdn, [f"/links/{short_code}"])
 
     return {"status": "success", "message": f"Short link '{short_code}' has been deleted"}
 
 
+def owned_links_filter(short_codes: List[str], user: User):
+    """
+    Условие выборки ссылок пользователя по списку кодов одним параметром-массивом.
+    """
+    return (
+        ShortLink.short_code == any_(literal(short_codes, ARRAY(ShortLink.short_code.type))),
+        ShortLink.user_id == user.id,
+    )
+
+
+def bulk_result(short_codes: List[str], affected: List[str]) -> LinkBulkResult:
+    affected_set = set(affected)
+    skipped = [code for code in dict.fromkeys(short_codes) if code not in affected_set]
+    return LinkBulkResult(affected=affected, skipped=skipped)
+
+
+@router.post("/bulk/delete", response_model=LinkBulkResult)
+async def bulk_delete_links(
+    link_data: LinkBulkDelete,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Массовое удаление ссылок пользователя.
+    Проверка владельца и удаление выполняются одним запросом,
+    ссылки других пользователей и несуществующие коды пропускаются.
+    """
+
+    stmt = (
+        delete(ShortLink)
+        .where(*owned_links_filter(link_data.short_codes, user))
+        .returning(ShortLink.short_code, ShortLink.original_url)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    rows = result.all()
+    await session.commit()
+
+    # Удаление кэша
+    keys = []
+    for short_code, _ in rows:
+        keys.append((f"/links/{short_code}", {}))
+        keys.append((f"/links/{short_code}/stats", {}))
+    await cache_delete_many(keys)
+    await search_index_remove(rows)
+    background_tasks.add_task(purge_cdn, [f"/links/{short_code}" for short_code, _ in rows])
+
+    return bulk_result(link_data.short_codes, [short_code for short_code, _ in rows])
+
+
+@router.post("/bulk/update", response_model=LinkBulkResult)
+async def bulk_update_links(
+    link_data: LinkBulkUpdate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Массовое обновление исходного URL ссылок пользователя одним запросом.
+    """
+
+    values = {"original_url": link_data.original_url, "url_status": None, "url_checked_at": None}
+    if link_data.redirect_policy is not None:
+        values["redirect_policy"] = link_data.redirect_policy
+
+    # Подзапрос нужен, чтобы вернуть прежний URL для инвалидации кэша поиска
+    previous = (
+        select(ShortLink.id, ShortLink.original_url.label("previous_url"))
+        .where(*owned_links_filter(link_data.short_codes, user), ShortLink.is_active)
+        .with_for_update()
+        .subquery()
+    )
+    stmt = (
+        update(ShortLink)
+        .where(ShortLink.id == previous.c.id)
+        .values(**values)
+        .returning(ShortLink.short_code, previous.c.previous_url)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    rows = result.all()
+    await session.commit()
+
+    # Удаление кэша
+    keys = []
+    for short_code, _ in rows:
+        keys.append((f"/links/{short_code}", {}))
+        keys.append((f"/links/{short_code}/stats", {}))
+    await cache_delete_many(keys)
+    await search_index_remove(rows)
+    await search_index_add([(short_code, link_data.original_url) for short_code, _ in rows])
+    background_tasks.add_task(purge_cdn, [f"/links/{short_code}" for short_code, _ in rows])
+
+    return bulk_result(link_data.short_codes, [short_code for short_code, _ in rows])
+
+
 @router.get("/{short_code}/stats", response_model=LinkStats)
 async def get_short_link_stats(
     request: Request,
@@ -222,22 +434,53 @@ async def get_short_link_stats(
 ):
     """
     Получение статистики по ссылке.
+    Переходы, еще не записанные в БД, добавляются из Redis.
+    Ответ содержит ETag, при совпадении с If-None-Match возвращается 304.
     """
 
-    # Поиск кэша
-    cached = await cache_get(request.url.path, {})
-    if cached:
-        return cached
+    pending = await get_pending_clicks(short_code)
+
+    # Поиск кэша: без незаписанных переходов JSON из кэша отдается как есть
+    if not pending.clicks:
+        cached = await cache_get_json(request.url.path, {})
+        if cached:
+            return json_response(request, cached)
+    else:
+        cached = await cache_get(request.url.path, {})
+        if cached:
+            return stats_response(request, with_pending_clicks(LinkStats.model_validate(cached), pending))
     
-    # Находим объект по короткой ссылке
-    stmt = select(ShortLink).where(ShortLink.short_code == short_code)
-    result = await session.execute(stmt)
-    link = result.scalars().first()
+    # Находим колонки статистики по короткой ссылке
+    link = await get_link_stats(session, short_code)
+
+    # Статистика архивной ссылки берется из архива
+    archived = link is None
+    if archived:
+        link = await get_archived_stats(session, short_code)
 
     # Короткая ссылка не найдена
     if not link:
         raise HTTPException(status_code=404, detail="Short link not found!")
     
-    await cache_set(request.url.path, {}, LinkStats.model_validate(link), expire=60)
+    stats = LinkStats.model_validate(link)
+    if archived:
+        stats.is_active = False
+    await cache_set(request.url.path, {}, stats, expire=60)
+
+    return stats_response(request, with_pending_clicks(stats, pending))
+
+
+def with_pending_clicks(stats: LinkStats, pending: PendingClicks) -> LinkStats:
+    """
+    Статистика с учетом переходов, накопленных в Redis.
+    """
+    stats.clicks_count += pending.clicks
+    if pending.last_clicked_at is not None and (
+        stats.last_clicked_at is None or pending.last_clicked_at > stats.last_clicked_at
+    ):
+        stats.last_clicked_at = pending.last_clicked_at
+    return stats
+
 
-    return link
\ No newline at end of file
+def stats_response(request: Request, stats: LinkStats):
+    return json_response(request, orjson.dumps(stats.model_dump(mode="json")))
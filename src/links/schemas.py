@@ -1,42 +1,20 @@
-from pydantic import BaseModel, field_validator, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional
-from urllib.parse import urlparse
-import re
+from typing import Optional, List, Literal
+from src.config import BULK_MAX_CODES
+from src.links.validation import OriginalUrl, CustomAlias
+
+
+# Политики редиректа: tracked - 302 без кэширования, permanent / permanent_308 - кэшируемые 301 / 308
+RedirectPolicy = Literal["tracked", "permanent", "permanent_308"]
 
 
 class LinkCreate(BaseModel):
-    original_url: str
+    original_url: OriginalUrl
     # Необязательные параметры
-    custom_alias: Optional[str] = None
+    custom_alias: Optional[CustomAlias] = None
     expires_at: Optional[datetime] = None
-
-    @field_validator("original_url")
-    @classmethod
-    def validate_original_url(cls, v):
-        """
-        Использование валидатора, а не HttpUrl,
-        чтобы не возникало проблем с кодировкой кириллицы.
-        """
-        parsed = urlparse(v)
-        if parsed.scheme not in {"http", "https"}:
-            raise ValueError("URL must start with http:// or https://!")
-        if not parsed.netloc:
-            raise ValueError("URL must have a valid domain!")
-        return v
-    
-    @field_validator("custom_alias")
-    @classmethod
-    def validate_custom_alias(cls, v):
-        """
-        В кастомный алиас можно вводить только цифры и буквы,
-        чтобы не возникало проблем со спец. символами
-        """
-        if v is None:
-            return v
-        if not re.fullmatch(r"[A-Za-zА-Яа-я0-9]+", v):
-            raise ValueError("Custom alias must contain only letters and digits!")
-        return v
+    redirect_policy: RedirectPolicy = "tracked"
 
 
 class LinkRead(BaseModel):
@@ -47,21 +25,23 @@ class LinkRead(BaseModel):
 
 
 class LinkUpdate(BaseModel):
-    original_url: str
+    original_url: OriginalUrl
+    # Политика редиректа не меняется, если не указана
+    redirect_policy: Optional[RedirectPolicy] = None
+
+
+class LinkBulkDelete(BaseModel):
+    short_codes: List[str] = Field(min_length=1, max_length=BULK_MAX_CODES)
+
+
+class LinkBulkUpdate(LinkUpdate):
+    short_codes: List[str] = Field(min_length=1, max_length=BULK_MAX_CODES)
+
 
-    @field_validator("original_url")
-    @classmethod
-    def validate_original_url(cls, v):
-        """
-        Использование валидатора, а не HttpUrl,
-        чтобы не возникало проблем с кодировкой кириллицы.
-        """
-        parsed = urlparse(v)
-        if parsed.scheme not in {"http", "https"}:
-            raise ValueError("URL must start with http:// or https://!")
-        if not parsed.netloc:
-            raise ValueError("URL must have a valid domain!")
-        return v
+class LinkBulkResult(BaseModel):
+    # Измененные ссылки и ссылки, которые не найдены или принадлежат другому пользователю
+    affected: List[str]
+    skipped: List[str]
 
 
 class LinkStats(BaseModel):
@@ -71,5 +51,12 @@ class LinkStats(BaseModel):
     clicks_count: int
     last_clicked_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
+    redirect_policy: Optional[str] = None
+    # Деактивированная ссылка не редиректит, архивная - уже удалена из основной таблицы
+    is_active: bool = True
+    archived_at: Optional[datetime] = None
+    # Результат фоновой проверки original_url: HTTP-статус или 0 для недоступного сервера
+    url_status: Optional[int] = None
+    url_checked_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,71 @@
+"""
+Общие валидаторы схем ссылок.
+
+Схемы создания и обновления ссылок валидируются на каждом запросе,
+а при массовом импорте - на каждой строке, поэтому шаблоны компилируются
+один раз, а разбор URL кэшируется (в импорте URL часто повторяются).
+"""
+import re
+from functools import lru_cache
+from typing import Annotated, Optional
+from urllib.parse import urlsplit
+
+from pydantic import AfterValidator, Field
+
+from src.config import MAX_URL_LENGTH, RESERVED_ALIASES
+
+
+ALIAS_PATTERN = re.compile(r"[A-Za-zА-Яа-я0-9]+")
+ALLOWED_SCHEMES = frozenset({"http", "https"})
+URL_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def url_error(url: str) -> Optional[str]:
+    """
+    Текст ошибки для некорректного URL или None.
+    Кэшируется результат, а не исключение, так как lru_cache не кэширует исключения.
+    """
+    try:
+        parsed = urlsplit(url)
+    except ValueError:
+        return "URL is malformed!"
+    if parsed.scheme not in ALLOWED_SCHEMES:
+        return "URL must start with http:// or https://!"
+    if not parsed.netloc:
+        return "URL must have a valid domain!"
+    return None
+
+
+def validate_original_url(v: str) -> str:
+    """
+    Использование валидатора, а не HttpUrl,
+    чтобы не возникало проблем с кодировкой кириллицы.
+    """
+    error = url_error(v)
+    if error is not None:
+        raise ValueError(error)
+    return v
+
+
+def validate_custom_alias(v: str) -> str:
+    """
+    В кастомный алиас можно вводить только цифры и буквы,
+    чтобы не возникало проблем со спец. символами
+    """
+    if not ALIAS_PATTERN.fullmatch(v):
+        raise ValueError("Custom alias must contain only letters and digits!")
+    return v
+
+
+def is_reserved_alias(alias: str) -> bool:
+    """
+    Алиас совпадает с зарезервированным словом (путем ручки) без учета регистра.
+    """
+    return alias.lower() in RESERVED_ALIASES
+
+
+# Длина проверяется pydantic до вызова валидатора, поэтому слишком длинный URL
+# отклоняется без разбора
+OriginalUrl = Annotated[str, Field(max_length=MAX_URL_LENGTH), AfterValidator(validate_original_url)]
+CustomAlias = Annotated[str, Field(max_length=50), AfterValidator(validate_custom_alias)]
@@ -1,54 +1,105 @@
+import asyncio
 import uvicorn
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from src.logger_config import logger
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from src.tasks.cleanup_links import delete_expired_links, delete_unused_links
+from src.cache.warmup import warm_up_redirect_cache
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from src.auth.router import router as router_auth
 from src.links.router import router as router_links
+from src.middleware.rate_limit import RateLimitMiddleware
+from src.middleware.slow_requests import SlowRequestMiddleware
+from src.middleware.tracing import TracingMiddleware
+from src.monitoring.router import router as router_debug, profiling_router
+from src.monitoring.profiling import install_signal_handler
+from src.config import (
+    RATE_LIMIT_ENABLED, CACHE_WARMUP_ENABLED, SCHEDULER_ENABLED, TRACING_ENABLED, SLOW_LOG_ENABLED, PROFILING_ENABLED,
+)
 
 
-scheduler = AsyncIOScheduler()  # Глобальный шедулер
+async def warm_up(app: FastAPI):
+    """
+    Прогрев кэша перед тем, как сервис сообщит о готовности.
+    Ошибка прогрева не мешает работе сервиса - кэш заполнится лениво.
+    """
+    try:
+        await warm_up_redirect_cache()
+    except Exception as e:
+        logger.error(f"The cache warm-up has failed: {e}")
+    finally:
+        app.state.ready = True
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    # Добавление задач в шедулер
-    scheduler.add_job(
-        delete_expired_links,
-        trigger="interval",
-        minutes=5,
-        id="cleanup_expired_links",
-        replace_existing=True
-    )
-    scheduler.add_job(
-        delete_unused_links,
-        trigger="interval",
-        hours=12,
-        id="cleanup_unused_links",
-        replace_existing=True
-    )
-    scheduler.start()
-    logger.info("The task scheduler is running")
-    
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Прогрев кэша в фоне, готовность отражается в /ready
+    app.state.ready = False
+    if CACHE_WARMUP_ENABLED:
+        warm_up_task = asyncio.create_task(warm_up(app))
+    else:
+        warm_up_task = None
+        app.state.ready = True
+
+    # Профиль по сигналу SIGUSR2 снимается с потока, в котором работает event loop
+    if PROFILING_ENABLED:
+        install_signal_handler()
+
+    # Шедулер и модули задач загружаются только при включенном шедулере.
+    # В режиме web-only (SCHEDULER_ENABLED=false) процесс только обслуживает запросы.
+    scheduler = None
+    if SCHEDULER_ENABLED:
+        from src.tasks.jobs import create_scheduler
+
+        scheduler = create_scheduler()
+        scheduler.start()
+        logger.info("The task scheduler is running")
+    else:
+        logger.info("The task scheduler is disabled, the process is running in web-only mode")
+
     try:
         yield
     finally:
-        scheduler.shutdown()
-        logger.info("The task scheduler is stopped")
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+        if scheduler is not None:
+            scheduler.shutdown()
+            logger.info("The task scheduler is stopped")
 
 
 app = FastAPI(title="Short Link Service", lifespan=lifespan)
 
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+if SLOW_LOG_ENABLED:
+    app.add_middleware(SlowRequestMiddleware)
+
+# Добавляется последним, чтобы спан запроса включал и остальные middleware
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
 app.include_router(router_auth, prefix="/auth", tags=["auth"])
 app.include_router(router_links, prefix="/links", tags=["links"])
+app.include_router(router_debug, prefix="/debug", tags=["debug"])
+if PROFILING_ENABLED:
+    app.include_router(profiling_router, prefix="/debug", tags=["debug"])
 
 @app.get("/")
 def read_root():
     return {"message": "Hello from Short Links Service!"}
 
 
+@app.get("/ready")
+def readiness():
+    """
+    Проверка готовности сервиса (завершен ли прогрев кэша).
+    """
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+
 if __name__ == "__main__":
     uvicorn.run("src.main:app", reload=True, host="0.0.0.0", log_level="debug")
\ No newline at end of file
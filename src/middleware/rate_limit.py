@@ -0,0 +1,249 @@
+import hashlib
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from src.auth.manager import get_token_user_id
+from src.cache import redis_client
+from src.logger_config import logger
+from src.config import (
+    RATE_LIMIT_SHORTEN_ANONYMOUS,
+    RATE_LIMIT_SHORTEN_USER,
+    RATE_LIMIT_REDIRECT_ANONYMOUS,
+    RATE_LIMIT_REDIRECT_USER,
+    RATE_LIMIT_LOCAL_FRACTION,
+)
+
+
+# Token bucket на стороне Redis. Время берется из Redis, чтобы воркеры
+# с разными часами работали с одним ведром.
+# KEYS[1] - ключ ведра; ARGV: емкость, скорость пополнения (токенов/мс),
+# количество запросов, уже пропущенных воркером локально (списываются безусловно).
+# Возвращает {разрешено, через сколько мс повторить, остаток токенов}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local pending = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - pending
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_after, tostring(tokens)}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    requests: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """
+        Разбор лимита из строки вида "<запросы>/<секунды>".
+        """
+        requests, period = value.split("/")
+        return cls(int(requests), int(period))
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    method: str
+    pattern: re.Pattern
+    anonymous: Limit
+    user: Limit
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.pattern.match(path) is not None
+
+
+@dataclass
+class LocalState:
+    """
+    Состояние клиента внутри воркера: сколько запросов можно пропустить
+    без Redis и сколько уже пропущено с последней синхронизации.
+    """
+    allowance: int = 0
+    pending: int = 0
+    synced_at: float = 0.0
+    blocked_until: float = 0.0
+
+
+RULES = [
+    RateLimitRule(
+        name="shorten",
+        method="POST",
+        pattern=re.compile(r"^/links/shorten$"),
+        anonymous=Limit.parse(RATE_LIMIT_SHORTEN_ANONYMOUS),
+        user=Limit.parse(RATE_LIMIT_SHORTEN_USER),
+    ),
+    RateLimitRule(
+        name="redirect",
+        method="GET",
+        pattern=re.compile(r"^/links/(?!(?:search|export)$)[^/]+$"),
+        anonymous=Limit.parse(RATE_LIMIT_REDIRECT_ANONYMOUS),
+        user=Limit.parse(RATE_LIMIT_REDIRECT_USER),
+    ),
+]
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов: token bucket в Redis
+    с локальной предварительной проверкой внутри воркера.
+    """
+
+    def __init__(
+        self,
+        rules: list,
+        local_fraction: float,
+        max_clients: int = 10000,
+        identity_ttl: int = 60,
+    ):
+        self.rules = rules
+        self.local_fraction = local_fraction
+        self.max_clients = max_clients
+        self.identity_ttl = identity_ttl
+        self._local = OrderedDict()
+        self._identities = OrderedDict()
+
+    def reset(self):
+        self._local.clear()
+        self._identities.clear()
+
+    def find_rule(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def get_identity(self, request: Request) -> tuple:
+        """
+        Идентификатор клиента: id пользователя для валидного bearer-токена,
+        иначе IP-адрес. Результат проверки токена кэшируется в воркере.
+        """
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            token_hash = hashlib.sha256(token.encode()).hexdigest()
+            cached = self._identities.get(token_hash)
+            now = time.monotonic()
+            if cached is not None and now - cached[1] < self.identity_ttl:
+                user_id = cached[0]
+            else:
+                try:
+                    user_id = await get_token_user_id(token)
+                except Exception as e:
+                    logger.warning(f"Rate limit token lookup failed: {e}")
+                    user_id = None
+                if user_id is not None:
+                    self._identities[token_hash] = (user_id, now)
+                    if len(self._identities) > self.max_clients:
+                        self._identities.popitem(last=False)
+            # Невалидный токен не дает пользовательского лимита
+            if user_id is not None:
+                return f"user:{user_id}", True
+
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}", False
+
+    def _get_state(self, key: str) -> LocalState:
+        state = self._local.get(key)
+        if state is None:
+            state = LocalState()
+            self._local[key] = state
+            # Вытеснение самых старых клиентов, чтобы память была ограничена
+            if len(self._local) > self.max_clients:
+                self._local.popitem(last=False)
+        else:
+            self._local.move_to_end(key)
+        return state
+
+    async def hit(self, rule: RateLimitRule, identity: str, is_user: bool) -> Optional[int]:
+        """
+        Учет запроса. Возвращает None, если запрос разрешен,
+        иначе - через сколько секунд можно повторить.
+        """
+        limit = rule.user if is_user else rule.anonymous
+        key = f"ratelimit:{rule.name}:{identity}"
+        state = self._get_state(key)
+        now = time.monotonic()
+
+        # Клиент уже получил отказ - не ходим в Redis до истечения блокировки
+        if state.blocked_until > now:
+            return math.ceil(state.blocked_until - now)
+
+        # Клиент далек от лимита - пропускаем без обращения к Redis
+        if state.pending < state.allowance and now - state.synced_at < limit.period:
+            state.pending += 1
+            return None
+
+        try:
+            script = redis_client.get_script(TOKEN_BUCKET_SCRIPT)
+            allowed, retry_after_ms, tokens = await script(
+                keys=[key],
+                args=[limit.requests, limit.requests / (limit.period * 1000), state.pending],
+            )
+        except Exception as e:
+            # Недоступность Redis не должна ронять сервис
+            logger.warning(f"Rate limit check failed, request allowed: {e}")
+            return None
+
+        state.pending = 0
+        state.synced_at = now
+        if not allowed:
+            state.allowance = 0
+            state.blocked_until = now + retry_after_ms / 1000
+            return max(1, math.ceil(retry_after_ms / 1000))
+
+        state.allowance = int(float(tokens) * self.local_fraction)
+        return None
+
+
+limiter = RateLimiter(RULES, RATE_LIMIT_LOCAL_FRACTION)
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware ограничения частоты запросов к создающим нагрузку на БД ручкам.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        rule = limiter.find_rule(request.method, request.url.path)
+        if rule is None:
+            return await call_next(request)
+
+        identity, is_user = await limiter.get_identity(request)
+        retry_after = await limiter.hit(rule, identity, is_user)
+        if retry_after is not None:
+            logger.info(f"Rate limit '{rule.name}' exceeded by {identity}")
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests!"},
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        return await call_next(request)
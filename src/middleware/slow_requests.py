@@ -0,0 +1,36 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.monitoring.slow_log import finish_request_timings, record_request, start_request_timings
+
+
+class SlowRequestMiddleware:
+    """
+    Замер длительности запроса с разбивкой на SQL, Redis и остальное время.
+    Запросы дольше SLOW_REQUEST_THRESHOLD_MS пишутся в журнал медленных запросов.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = start_request_timings(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            record_request(finish_request_timings(token), duration, status)
@@ -0,0 +1,43 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.monitoring.tracing import tracer
+
+
+class TracingMiddleware:
+    """
+    Корневой спан на каждый HTTP-запрос с именем по шаблону маршрута
+    (например, "GET /links/{short_code}"): спаны Redis и SQL, выполненные
+    при обработке запроса, становятся его дочерними спанами.
+    Реализован как чистое ASGI-middleware: обработчик выполняется в том же
+    контексте, без отдельной задачи BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with tracer.start_trace(f"{method} {scope['path']}", traceparent, **{"http.method": method}) as span:
+            async def send_with_status(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Имя по шаблону маршрута, а не по пути, чтобы не плодить имена на каждый короткий код
+                route = getattr(scope.get("route"), "path_format", None)
+                if route is not None and span.sampled:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,174 @@
+"""
+Профилирование работающего процесса по запросу.
+
+Режимы:
+- cpu - сэмплирующий профайлер: отдельный поток раз в interval секунд снимает
+  стек потока event loop (sys._current_frames) и отдает стеки в формате folded
+  ("func1;func2;func3 <число сэмплов>"), который принимают flamegraph.pl и speedscope.
+  Профилируемый код не замедляется, кроме захвата GIL на время снятия стека;
+- cprofile - детерминированный cProfile в потоке event loop, отчет pstats;
+- memory - снимки tracemalloc в начале и в конце периода, самые большие приросты памяти.
+
+Запускается администратором через GET /debug/profile или сигналом SIGUSR2
+(cpu-профиль на PROFILING_SIGNAL_SECONDS секунд записывается в PROFILING_OUTPUT_DIR).
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+from src.logger_config import logger
+from src.config import PROFILING_SIGNAL_SECONDS, PROFILING_OUTPUT_DIR
+
+
+SAMPLE_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+
+# Одновременно выполняется не больше одного профилирования в процессе
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(thread_id: int, seconds: float, interval: float = SAMPLE_INTERVAL) -> Counter:
+    """
+    Сэмплы стека потока thread_id за seconds секунд: свернутый стек -> число сэмплов.
+    Вызывается из другого потока.
+    """
+    samples = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            break
+        stack = []
+        while frame is not None:
+            stack.append(frame_label(frame))
+            frame = frame.f_back
+        samples[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return samples
+
+
+def format_folded(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def _acquire():
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("Another profile is already running in this process")
+
+
+async def profile_cpu(seconds: float, interval: float = SAMPLE_INTERVAL) -> str:
+    """
+    Сэмплирование потока event loop; loop продолжает обслуживать запросы.
+    """
+    _acquire()
+    try:
+        thread_id = threading.get_ident()
+        samples = await asyncio.to_thread(sample_stacks, thread_id, seconds, interval)
+    finally:
+        _profile_lock.release()
+    return format_folded(samples)
+
+
+async def profile_cprofile(seconds: float, limit: int) -> str:
+    """
+    cProfile всех функций, выполненных в потоке event loop за seconds секунд.
+    """
+    _acquire()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+    finally:
+        _profile_lock.release()
+
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
+
+
+async def profile_memory(seconds: float, limit: int) -> str:
+    """
+    Прирост памяти по строкам кода за seconds секунд (tracemalloc).
+    """
+    _acquire()
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    lines = [f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB", f"Top {limit} allocations growth:"]
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def write_signal_profile(thread_id: int, seconds: float = PROFILING_SIGNAL_SECONDS,
+                         output_dir: str = PROFILING_OUTPUT_DIR) -> Optional[str]:
+    """
+    cpu-профиль потока thread_id в файл. Возвращает путь к файлу
+    или None, если профилирование уже идет.
+    """
+    try:
+        _acquire()
+    except ProfilerBusyError as e:
+        logger.warning(f"The profile is skipped: {e}")
+        return None
+    try:
+        samples = sample_stacks(thread_id, seconds)
+    finally:
+        _profile_lock.release()
+
+    path = os.path.join(output_dir, f"profile-{os.getpid()}-{int(time.time())}.folded")
+    with open(path, "w") as f:
+        f.write(format_folded(samples))
+    logger.info(f"The CPU profile is written to {path}")
+    return path
+
+
+def install_signal_handler(signum: int = signal.SIGUSR2) -> bool:
+    """
+    Профилирование по сигналу: kill -USR2 <pid> снимает cpu-профиль потока,
+    в котором установлен обработчик (основной поток с event loop), в фоновом потоке.
+    """
+    thread_id = threading.get_ident()
+
+    def handle(signum, frame):
+        threading.Thread(target=write_signal_profile, args=(thread_id,), daemon=True).start()
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:
+        # Обработчики сигналов можно установить только из основного потока
+        logger.warning("The profiling signal handler is not installed: not in the main thread")
+        return False
+    logger.info(f"The profiling signal handler is installed: kill -{signal.Signals(signum).name[3:]} {os.getpid()}")
+    return True
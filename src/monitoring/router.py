@@ -0,0 +1,63 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.auth.manager import current_superuser
+from src.auth.models import User
+from src.monitoring.profiling import ProfilerBusyError, profile_cpu, profile_cprofile, profile_memory
+from src.monitoring.slow_log import slow_log
+from src.config import SLOW_REQUEST_THRESHOLD_MS, SLOW_QUERY_THRESHOLD_MS, PROFILING_MAX_SECONDS
+
+
+router = APIRouter()
+# Подключается в src/main.py только при PROFILING_ENABLED=true
+profiling_router = APIRouter()
+
+
+@router.get("/slow")
+async def get_slow_log(limit: int = 100, user: User = Depends(current_superuser)):
+    """
+    Последние медленные запросы и SQL-запросы текущего процесса (новые первыми).
+    Доступно только администраторам.
+    """
+
+    entries = list(slow_log)[::-1][:limit]
+    return {
+        "request_threshold_ms": SLOW_REQUEST_THRESHOLD_MS,
+        "query_threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "entries": entries,
+    }
+
+
+@router.delete("/slow")
+async def clear_slow_log(user: User = Depends(current_superuser)):
+    """
+    Очистка журнала медленных запросов текущего процесса.
+    """
+
+    slow_log.clear()
+    return {"status": "success"}
+
+
+@profiling_router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    mode: Literal["cpu", "cprofile", "memory"] = Query("cpu"),
+    seconds: float = Query(10, gt=0, le=PROFILING_MAX_SECONDS),
+    limit: int = Query(30, gt=0),
+    user: User = Depends(current_superuser),
+):
+    """
+    Профилирование текущего процесса в течение seconds секунд.
+    cpu - стеки в формате folded для flamegraph, cprofile - отчет pstats,
+    memory - самые большие приросты памяти. Доступно только администраторам.
+    """
+
+    try:
+        if mode == "cpu":
+            return await profile_cpu(seconds)
+        if mode == "cprofile":
+            return await profile_cprofile(seconds, limit)
+        return await profile_memory(seconds, limit)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
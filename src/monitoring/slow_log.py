@@ -0,0 +1,163 @@
+"""
+Журнал медленных HTTP-запросов и SQL-запросов.
+
+Middleware SlowRequestMiddleware заводит на каждый запрос счетчики времени
+в contextvar, а обработчики before_cursor_execute / after_cursor_execute
+и Redis-клиент с учетом времени (TracedRedis) добавляют в них время SQL и Redis.
+Запросы и SQL-запросы дольше порогов пишутся в лог и в кольцевой буфер
+последних записей, который отдает GET /debug/slow.
+"""
+import hashlib
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.logger_config import logger
+from src.config import SLOW_REQUEST_THRESHOLD_MS, SLOW_QUERY_THRESHOLD_MS, SLOW_LOG_BUFFER_SIZE
+
+
+MAX_STATEMENT_LENGTH = 500
+# Строковые и числовые литералы заменяются на ?, параметры вида $1 остаются
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+
+# Последние медленные запросы (новые в конце)
+slow_log = deque(maxlen=SLOW_LOG_BUFFER_SIZE)
+
+
+@dataclass
+class RequestTimings:
+    """
+    Время, потраченное запросом на SQL и Redis.
+    """
+    scope: dict = field(default_factory=dict)
+    db_time: float = 0.0
+    db_statements: int = 0
+    redis_time: float = 0.0
+    redis_commands: int = 0
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def statement_fingerprint(statement: str) -> str:
+    """
+    Нормализованный текст SQL-запроса: без литералов и лишних пробелов.
+    """
+    return LITERAL_PATTERN.sub("?", " ".join(statement.split()))[:MAX_STATEMENT_LENGTH]
+
+
+def short_code_hash(short_code: Optional[str]) -> Optional[str]:
+    """
+    Хэш короткого кода: запись в логе можно сопоставить со ссылкой, не раскрывая ее.
+    """
+    if short_code is None:
+        return None
+    return hashlib.sha256(short_code.encode()).hexdigest()[:12]
+
+
+def route_of(scope: dict) -> str:
+    """
+    Шаблон маршрута запроса ("GET /links/{short_code}") или путь, если маршрут не найден.
+    """
+    path = getattr(scope.get("route"), "path_format", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+def start_request_timings(scope: dict):
+    return _request_timings.set(RequestTimings(scope=scope))
+
+
+def finish_request_timings(token) -> RequestTimings:
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings
+
+
+def record_redis_command(duration: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.redis_time += duration
+        timings.redis_commands += 1
+
+
+def record_slow(entry: dict):
+    entry["at"] = datetime.now(timezone.utc).isoformat()
+    slow_log.append(entry)
+
+
+def record_request(timings: RequestTimings, duration: float, status: Optional[int]):
+    """
+    Запись запроса в журнал, если он дольше SLOW_REQUEST_THRESHOLD_MS.
+    """
+    duration_ms = duration * 1000
+    if duration_ms < SLOW_REQUEST_THRESHOLD_MS:
+        return
+    scope = timings.scope
+    db_ms, redis_ms = timings.db_time * 1000, timings.redis_time * 1000
+    entry = {
+        "type": "request",
+        "route": route_of(scope),
+        "short_code_hash": short_code_hash(scope.get("path_params", {}).get("short_code")),
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "db_ms": round(db_ms, 2),
+        "db_statements": timings.db_statements,
+        "redis_ms": round(redis_ms, 2),
+        "redis_commands": timings.redis_commands,
+        "other_ms": round(max(duration_ms - db_ms - redis_ms, 0), 2),
+    }
+    record_slow(entry)
+    logger.warning(
+        f"Slow request {entry['route']} {entry['duration_ms']} ms: status {status}, "
+        f"db {entry['db_ms']} ms / {entry['db_statements']} statements, "
+        f"redis {entry['redis_ms']} ms / {entry['redis_commands']} commands, other {entry['other_ms']} ms, "
+        f"short code hash {entry['short_code_hash']}"
+    )
+
+
+def install_slow_query_log(engine: Engine):
+    """
+    Учет времени SQL-запросов синхронного движка (для асинхронного - engine.sync_engine)
+    и запись запросов дольше SLOW_QUERY_THRESHOLD_MS.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_log_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_log_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.db_time += duration
+            timings.db_statements += 1
+
+        duration_ms = duration * 1000
+        if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+        entry = {
+            "type": "query",
+            "route": route_of(timings.scope) if timings is not None else None,
+            "statement": statement_fingerprint(statement),
+            "executemany": executemany,
+            "duration_ms": round(duration_ms, 2),
+        }
+        record_slow(entry)
+        logger.warning(f"Slow query {entry['duration_ms']} ms ({entry['route']}): {entry['statement']}")
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(context):
+        started = context.connection.info.get("slow_log_started") if context.connection is not None else None
+        if started:
+            started.pop()
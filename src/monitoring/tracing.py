@@ -0,0 +1,266 @@
+"""
+Трассировка запросов: спаны HTTP-запросов, SQL-запросов и команд Redis.
+
+Спаны устроены как в OpenTelemetry: 128-битный trace_id, 64-битный span_id,
+ссылка на родителя и атрибуты; текущий спан хранится в contextvar, поэтому
+спаны SQL и Redis автоматически становятся дочерними для спана запроса.
+Решение о записи (sampling) принимается один раз для корневого спана
+с вероятностью TRACING_SAMPLE_RATIO и наследуется дочерними спанами.
+Входящий заголовок W3C `traceparent` продолжает трассу вызывающего сервиса.
+
+При TRACING_ENABLED=false middleware и обработчики событий не подключаются,
+а Tracer.span возвращает общий пустой спан.
+"""
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import List, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.logger_config import logger
+from src.monitoring.slow_log import record_redis_command, statement_fingerprint
+from src.config import TRACING_ENABLED, TRACING_SAMPLE_RATIO
+
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class NoopSpan:
+    """
+    Спан, который ничего не записывает (трассировка выключена или трасса не в выборке).
+    """
+    sampled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class UnsampledSpan(NoopSpan):
+    """
+    Корневой спан вне выборки: помечает контекст, чтобы дочерние спаны тоже не писались.
+    """
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current_span.reset(self._token)
+        self.tracer.exporter.export(self)
+        return False
+
+    def __repr__(self):
+        return f"Span({self.name!r}, trace_id={self.trace_id}, span_id={self.span_id}, parent_id={self.parent_id})"
+
+
+class LogSpanExporter:
+    """
+    Запись завершенных спанов в лог сервиса.
+    """
+
+    def export(self, span: Span):
+        status = f" error={span.error}" if span.error else ""
+        logger.info(
+            f"Span {span.name} {span.duration * 1000:.2f} ms trace={span.trace_id} "
+            f"span={span.span_id} parent={span.parent_id}{status} {span.attributes}"
+        )
+
+
+class InMemorySpanExporter:
+    """
+    Хранение последних завершенных спанов в памяти (для тестов и отладки).
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        return list(self.spans)
+
+    def clear(self):
+        self.spans.clear()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACING_ENABLED, sample_ratio: float = TRACING_SAMPLE_RATIO, exporter=None):
+        self.enabled = enabled
+        self.sample_ratio = sample_ratio
+        self.exporter = exporter if exporter is not None else LogSpanExporter()
+
+    def span(self, name: str, **attributes):
+        """
+        Дочерний спан текущего спана или новая трасса, если текущего спана нет.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            return self.start_trace(name, **attributes)
+        if not parent.sampled:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, **attributes):
+        """
+        Корневой спан. Если передан валидный traceparent, трасса и решение о выборке
+        берутся из него, иначе трасса попадает в выборку с вероятностью sample_ratio.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        match = TRACEPARENT_PATTERN.match(traceparent) if traceparent else None
+        if match is not None:
+            trace_id, parent_id, flags = match.groups()
+            sampled = int(flags, 16) & 1 == 1
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_ratio
+        if not sampled:
+            return UnsampledSpan()
+        return Span(self, name, trace_id, parent_id, attributes)
+
+
+tracer = Tracer()
+
+
+def current_span():
+    return _current_span.get()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Спаны SQL-запросов и фиксации транзакций синхронного движка
+    (для асинхронного - engine.sync_engine).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement_span(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.span(f"db {statement.split(None, 1)[0].upper()}")
+        # Нормализация текста запроса только для трасс из выборки
+        if span.sampled:
+            span.set_attribute("db.statement", statement_fingerprint(statement))
+            span.set_attribute("db.executemany", executemany)
+        conn.info.setdefault("trace_spans", []).append(span.__enter__())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_statement_span(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def fail_statement_span(context):
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if spans:
+            error = context.original_exception
+            spans.pop().__exit__(type(error), error, None)
+
+    # Для COMMIT и ROLLBACK нет событий "после", поэтому оборачиваются методы диалекта
+    dialect = engine.dialect
+    for method in ("do_commit", "do_rollback"):
+        setattr(dialect, method, _traced_dialect_method(getattr(dialect, method), f"db {method[3:].upper()}"))
+
+
+def _traced_dialect_method(method, name: str):
+    def traced(dbapi_connection):
+        with tracer.span(name):
+            return method(dbapi_connection)
+    return traced
+
+
+class TracedPoolMixin:
+    """
+    Спан получения соединения из пула (ожидание свободного соединения или подключение).
+    """
+
+    def connect(self):
+        with tracer.span("db.pool.checkout"):
+            return super().connect()
+
+
+class TracedAsyncAdaptedQueuePool(TracedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TracedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = [str(args[0]) for args, _ in self.command_stack]
+        started = time.perf_counter()
+        try:
+            with tracer.span("redis PIPELINE", **{"redis.commands": len(commands), "redis.command": commands[0] if commands else ""}):
+                return await super().execute(raise_on_error)
+        finally:
+            record_redis_command(time.perf_counter() - started)
+
+
+class TracedRedis(Redis):
+    """
+    Redis-клиент со спаном на каждую команду (включая EVALSHA скриптов) и на каждый пайплайн.
+    Время команд также учитывается в журнале медленных запросов (src/monitoring/slow_log.py).
+    """
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"redis {args[0]}"):
+                return await super().execute_command(*args, **options)
+        finally:
+            record_redis_command(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> TracedPipeline:
+        return TracedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,288 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, Union
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+from sqlalchemy import String, any_, bindparam, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from src.database import async_session_maker
+from src.links.models import ShortLink
+from src.logger_config import logger
+from src.config import (
+    URL_CHECK_INTERVAL_HOURS,
+    URL_CHECK_BATCH_SIZE,
+    URL_CHECK_CONCURRENCY,
+    URL_CHECK_PER_HOST,
+    URL_CHECK_HOST_DELAY,
+    URL_CHECK_TIMEOUT,
+    URL_CHECK_MAX_REDIRECTS,
+    URL_CHECK_ALLOW_PRIVATE,
+)
+
+
+# Статус недоступного сервера (ошибка соединения, таймаут, некорректный URL)
+UNREACHABLE_STATUS = 0
+# Статус URL, ведущего во внутреннюю сеть (loopback, частные, link-local, зарезервированные адреса).
+# Такие URL не запрашиваются, чтобы через проверку нельзя было опрашивать внутренние сервисы.
+# Адрес проверяется повторно при подключении (PublicAddressBackend), и соединение
+# открывается именно с проверенным адресом, поэтому DNS rebinding между проверкой
+# и подключением не помогает обойти запрет.
+BLOCKED_STATUS = -1
+# Серверы, не поддерживающие HEAD, проверяются через GET без чтения тела
+HEAD_NOT_SUPPORTED = {405, 501}
+USER_AGENT = "ShortLinkService-LinkChecker/1.0"
+
+
+class HostLimiter:
+    """
+    Вежливость по отношению к хостам: не больше per_host одновременных
+    запросов к одному хосту и пауза delay между началами запросов.
+    """
+
+    def __init__(self, per_host: int, delay: float):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores = {}
+        self._next_request_at = {}
+
+    @asynccontextmanager
+    async def acquire(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            # Слот времени резервируется без await, поэтому гонок между задачами нет
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = start_at + self.delay
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            yield
+
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+async def resolve_host(host: str, port: int) -> List[IPAddress]:
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [ipaddress.ip_address(info[4][0]) for info in infos]
+
+
+def is_public_address(address: IPAddress) -> bool:
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+async def is_public_url(url: str) -> bool:
+    """
+    True, если все адреса хоста URL публичные.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname
+    if not host:
+        return False
+    try:
+        addresses = [ipaddress.ip_address(host)]
+    except ValueError:
+        addresses = await resolve_host(host, parts.port or (443 if parts.scheme == "https" else 80))
+    return bool(addresses) and all(is_public_address(address) for address in addresses)
+
+
+class BlockedAddressError(Exception):
+    pass
+
+
+class PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """
+    Сетевой бэкенд httpcore, который подключается только к публичным адресам.
+    Хост резолвится один раз, и TCP-соединение открывается с проверенным IP;
+    заголовок Host и SNI при этом берутся из URL, поэтому TLS проверяет сертификат хоста.
+    """
+
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host: str, port: int, timeout=None, local_address=None, socket_options=None):
+        addresses = await resolve_host(host, port)
+        if not addresses or not all(is_public_address(address) for address in addresses):
+            raise BlockedAddressError(f"{host} resolves to a non-public address")
+
+        error = None
+        for address in dict.fromkeys(addresses):
+            try:
+                return await self._backend.connect_tcp(
+                    str(address), port, timeout=timeout, local_address=local_address, socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+class PublicAddressTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, limits: httpx.Limits):
+        super().__init__(limits=limits)
+        # httpx не принимает сетевой бэкенд, поэтому пул httpcore создается заново с ним
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicAddressBackend(),
+        )
+
+
+class UrlChecker:
+    """
+    Проверка доступности URL с ограничением общего количества
+    одновременных запросов и количества запросов к одному хосту.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        concurrency: int = URL_CHECK_CONCURRENCY,
+        per_host: int = URL_CHECK_PER_HOST,
+        host_delay: float = URL_CHECK_HOST_DELAY,
+        max_redirects: int = URL_CHECK_MAX_REDIRECTS,
+        allow_private: bool = False,
+    ):
+        self.client = client
+        self.max_redirects = max_redirects
+        self.allow_private = allow_private
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._hosts = HostLimiter(per_host, host_delay)
+
+    async def check(self, url: str) -> int:
+        """
+        HTTP-статус ответа по URL (после редиректов), UNREACHABLE_STATUS или BLOCKED_STATUS.
+        """
+        host = urlsplit(url).hostname or ""
+        # Сначала ожидание хоста, чтобы задачи одного хоста не занимали общие слоты
+        async with self._hosts.acquire(host), self._semaphore:
+            try:
+                return await self._follow(url)
+            except BlockedAddressError as e:
+                logger.info(f"URL {url} is skipped on connect: {e}")
+                return BLOCKED_STATUS
+            except (httpx.HTTPError, httpx.InvalidURL, OSError, ValueError) as e:
+                logger.debug(f"URL {url} is unreachable: {e!r}")
+                return UNREACHABLE_STATUS
+
+    async def _follow(self, url: str) -> int:
+        """
+        Запрос URL с ручным переходом по редиректам: адрес каждого перехода
+        проверяется до запроса.
+        """
+        for _ in range(self.max_redirects + 1):
+            if not self.allow_private and not await is_public_url(url):
+                logger.info(f"URL {url} points to a non-public address, skipped")
+                return BLOCKED_STATUS
+
+            response = await self.client.head(url)
+            if response.status_code in HEAD_NOT_SUPPORTED:
+                async with self.client.stream("GET", url) as response:
+                    pass
+            if not response.has_redirect_location:
+                return response.status_code
+            url = str(response.next_request.url)
+        # Слишком много редиректов - статус последнего ответа
+        return response.status_code
+
+    async def check_many(self, urls: Iterable[str]) -> Dict[str, int]:
+        """
+        Параллельная проверка URL, каждый уникальный URL проверяется один раз.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        statuses = await asyncio.gather(*(self.check(url) for url in unique_urls))
+        return dict(zip(unique_urls, statuses))
+
+
+def create_client(allow_private: bool = False) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=URL_CHECK_CONCURRENCY)
+    return httpx.AsyncClient(
+        timeout=URL_CHECK_TIMEOUT,
+        # Редиректы проходятся вручную, чтобы проверить адрес каждого перехода
+        follow_redirects=False,
+        headers={"User-Agent": USER_AGENT},
+        limits=limits,
+        # Соединения открываются только с публичными адресами, проверенными при подключении
+        transport=None if allow_private else PublicAddressTransport(limits),
+    )
+
+
+async def get_links_to_check(limit: int, now: datetime) -> List[tuple]:
+    """
+    Активные ссылки, которые еще не проверялись или проверялись давно.
+    """
+    threshold = now - timedelta(hours=URL_CHECK_INTERVAL_HOURS)
+    stmt = (
+        select(ShortLink.short_code, ShortLink.original_url)
+        .where(
+            ShortLink.is_active,
+            or_(ShortLink.url_checked_at.is_(None), ShortLink.url_checked_at < threshold),
+        )
+        .order_by(ShortLink.url_checked_at.asc().nulls_first())
+        .limit(limit)
+    )
+    async with async_session_maker() as session:
+        result = await session.execute(stmt)
+        return result.all()
+
+
+async def save_url_statuses(links: List[tuple], statuses: Dict[str, int], checked_at: datetime):
+    """
+    Сохранение статусов: один UPDATE на уникальный URL по массиву его кодов.
+    """
+    codes_by_url = {}
+    for short_code, original_url in links:
+        codes_by_url.setdefault(original_url, []).append(short_code)
+
+    links_table = ShortLink.__table__
+    stmt = (
+        update(links_table)
+        .where(links_table.c.short_code == any_(bindparam("codes", type_=ARRAY(String))))
+        .values(url_status=bindparam("status"), url_checked_at=bindparam("checked_at"))
+    )
+    params = [
+        {"codes": codes, "status": statuses[original_url], "checked_at": checked_at}
+        for original_url, codes in codes_by_url.items()
+    ]
+    async with async_session_maker() as session:
+        await session.execute(stmt, params)
+        await session.commit()
+
+
+async def check_link_urls(batch_size: int = URL_CHECK_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Фоновая проверка доступности оригинальных URL ссылок.
+    """
+
+    logger.info("The check of link URLs is running...")
+    links = await get_links_to_check(batch_size, datetime.now(timezone.utc))
+    if not links:
+        logger.info("There are no links to check")
+        return {}
+
+    async with create_client(URL_CHECK_ALLOW_PRIVATE) as client:
+        statuses = await UrlChecker(client, allow_private=URL_CHECK_ALLOW_PRIVATE).check_many(original_url for _, original_url in links)
+    await save_url_statuses(links, statuses, datetime.now(timezone.utc))
+
+    broken = sum(1 for status in statuses.values() if status == UNREACHABLE_STATUS or status >= 400)
+    blocked = sum(1 for status in statuses.values() if status == BLOCKED_STATUS)
+    logger.info(
+        f"Checked {len(statuses)} URLs of {len(links)} links, {broken} are broken or unreachable, "
+        f"{blocked} point to non-public addresses"
+    )
+
+    logger.info("The check is ended!")
+    return statuses
@@ -1,53 +1,230 @@
+import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import delete, or_
+from typing import Awaitable, Callable, List, Optional
+from sqlalchemy import delete, func, insert, or_, select, update
 from src.database import async_session_maker
-from src.links.models import ShortLink
+from src.links.models import ShortLinkArchive
+from src.links.partitions import get_links_partitions, links_partition
 from src.logger_config import logger
-from src.config import LINK_LIFETIME_DAYS
+from src.config import (
+    LINK_LIFETIME_DAYS,
+    CLEANUP_CONCURRENCY,
+    CLEANUP_BATCH_SIZE,
+    CLEANUP_TARGET_ROWS_PER_SECOND,
+)
+from src.cache.redis_client import cache_delete_many
+from src.cache.search_index import search_index_remove
 
 
-async def delete_expired_links():
+# Колонки, переносимые из links в links_archive
+ARCHIVE_COLUMNS = [
+    "id", "short_code", "original_url", "user_id",
+    "created_at", "clicks_count", "last_clicked_at", "expires_at", "redirect_policy",
+]
+
+
+@dataclass
+class CleanupReport:
+    processed: int = 0
+    partitions: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / max(self.elapsed, 1e-6)
+
+
+async def run_in_batches(partition: str, build_statement: Callable, batch_size: int) -> int:
+    """
+    Выполнение запроса над партицией пачками по batch_size строк,
+    каждая пачка - отдельная короткая транзакция.
+    Запрос возвращает (short_code, original_url) обработанных ссылок.
+    """
+
+    links = links_partition(partition)
+    processed = 0
+
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(build_statement(links, batch_size))
+            links_batch = result.fetchall()
+            await session.commit()
+
+        await invalidate_links_cache(links_batch)
+        processed += len(links_batch)
+
+        if len(links_batch) < batch_size:
+            return processed
+
+
+async def invalidate_links_cache(links_batch: List[tuple]):
+    """
+    Удаление деактивированных и архивированных ссылок из кэша и индекса поиска.
+    """
+    if not links_batch:
+        return
+    keys = []
+    for short_code, _ in links_batch:
+        keys.append((f"/links/{short_code}", {}))
+        keys.append((f"/links/{short_code}/stats", {}))
+    await cache_delete_many(keys)
+    await search_index_remove(links_batch)
+
+
+async def run_by_partitions(
+    handler: Callable[[str], Awaitable[int]],
+    partitions: Optional[List[str]] = None,
+    concurrency: int = CLEANUP_CONCURRENCY,
+) -> CleanupReport:
     """
-    Удаление истекших по expires_at ссылок.
+    Параллельная обработка партиций с ограничением
+    количества одновременно занятых соединений.
     """
 
-    logger.info("The cleanup of expired links is running...")
+    started_at = time.monotonic()
+    partitions = partitions or await get_links_partitions()
+    semaphore = asyncio.Semaphore(concurrency)
 
-    async with async_session_maker() as session:
-        stmt = delete(ShortLink).where(
-            ShortLink.expires_at.is_not(None),
-            ShortLink.expires_at < datetime.now(timezone.utc)
-            ).returning(ShortLink.id)
-        
-        result = await session.execute(stmt)
-        rows = await result.fetchall()
-        await session.commit()
+    async def run(partition: str) -> int:
+        async with semaphore:
+            return await handler(partition)
+
+    processed = await asyncio.gather(*(run(partition) for partition in partitions))
+    return CleanupReport(
+        processed=sum(processed),
+        partitions=len(partitions),
+        elapsed=time.monotonic() - started_at,
+    )
+
+
+def log_report(job: str, report: CleanupReport, batch_size: int = CLEANUP_BATCH_SIZE):
+    """
+    Логирование результата очистки и сравнение скорости с целевой.
+    """
+    logger.info(
+        f"The {job}: processed {report.processed} links from {report.partitions} partitions "
+        f"in {report.elapsed:.2f} s ({report.rows_per_second:.0f} rows/s)"
+    )
+    # Скорость имеет смысл сравнивать, только если было что обрабатывать
+    if report.processed >= batch_size and report.rows_per_second < CLEANUP_TARGET_ROWS_PER_SECOND:
+        logger.warning(f"The {job} is slower than the target {CLEANUP_TARGET_ROWS_PER_SECOND} rows/s")
 
-        deleted_links = [row[0] for row in rows]
-        logger.info(f"Deleted {len(deleted_links)} expired links")
+
+def deactivate_statement(condition: Callable) -> Callable:
+    """
+    Пачка активных ссылок по условию помечается неактивной.
+    Обновление флага не раздувает таблицу так, как массовый DELETE.
+    """
+    def build(links, batch_size: int):
+        batch = (
+            select(links.c.id)
+            .where(links.c.is_active, *condition(links))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        return (
+            update(links)
+            .where(links.c.id.in_(batch))
+            .values(is_active=False)
+            .returning(links.c.short_code, links.c.original_url)
+        )
+    return build
+
+
+def archive_statement(links, batch_size: int):
+    """
+    Перенос пачки неактивных ссылок в links_archive одним запросом:
+    DELETE ... RETURNING в CTE и INSERT из него.
+    """
+    batch = (
+        select(links.c.id)
+        # Условие совпадает с предикатом частичного индекса ix_links_inactive
+        .where(~links.c.is_active)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    moved = (
+        delete(links)
+        .where(links.c.id.in_(batch))
+        .returning(*(links.c[name] for name in ARCHIVE_COLUMNS))
+        .cte("moved")
+    )
+    return (
+        insert(ShortLinkArchive)
+        .from_select(
+            [*ARCHIVE_COLUMNS, "archived_at"],
+            select(*(moved.c[name] for name in ARCHIVE_COLUMNS), func.now()),
+        )
+        .returning(ShortLinkArchive.short_code, ShortLinkArchive.original_url)
+    )
+
+
+async def deactivate_expired_links(
+    partitions: Optional[List[str]] = None,
+    concurrency: int = CLEANUP_CONCURRENCY,
+    batch_size: int = CLEANUP_BATCH_SIZE,
+) -> CleanupReport:
+    """
+    Деактивация истекших по expires_at ссылок.
+    """
+
+    logger.info("The deactivation of expired links is running...")
+    now = datetime.now(timezone.utc)
+    statement = deactivate_statement(
+        lambda links: (links.c.expires_at.is_not(None), links.c.expires_at < now)
+    )
+
+    report = await run_by_partitions(
+        lambda partition: run_in_batches(partition, statement, batch_size), partitions, concurrency,
+    )
+    log_report("deactivation of expired links", report, batch_size)
 
     logger.info("The cleanup is ended!")
+    return report
 
 
-async def delete_unused_links():
+async def deactivate_unused_links(
+    partitions: Optional[List[str]] = None,
+    concurrency: int = CLEANUP_CONCURRENCY,
+    batch_size: int = CLEANUP_BATCH_SIZE,
+) -> CleanupReport:
     """
-    Удаление неиспользуемых ссылок.
+    Деактивация неиспользуемых ссылок.
     """
 
-    logger.info("The cleanup of unused links is running...")
+    logger.info("The deactivation of unused links is running...")
     days_tthreshold = datetime.now(timezone.utc) - timedelta(days=LINK_LIFETIME_DAYS)
+    statement = deactivate_statement(
+        lambda links: (or_(links.c.last_clicked_at.is_(None),
+                           links.c.last_clicked_at < days_tthreshold),)
+    )
+
+    report = await run_by_partitions(
+        lambda partition: run_in_batches(partition, statement, batch_size), partitions, concurrency,
+    )
+    log_report("deactivation of unused links", report, batch_size)
+
+    logger.info("The cleanup is ended!")
+    return report
 
-    async with async_session_maker() as session:
-        stmt = delete(ShortLink).where(
-            or_(ShortLink.last_clicked_at.is_(None),
-                ShortLink.last_clicked_at < days_tthreshold)
-            ).returning(ShortLink.id)
-        
-        result = await session.execute(stmt)
-        rows = await result.fetchall()
-        await session.commit()
 
-        deleted_links = [row[0] for row in rows]
-        logger.info(f"Deleted {len(deleted_links)} unused links")
+async def archive_inactive_links(
+    partitions: Optional[List[str]] = None,
+    concurrency: int = CLEANUP_CONCURRENCY,
+    batch_size: int = CLEANUP_BATCH_SIZE,
+) -> CleanupReport:
+    """
+    Перенос неактивных ссылок из основной таблицы в архив.
+    """
+
+    logger.info("The archival of inactive links is running...")
 
-    logger.info("The cleanup is ended!")
\ No newline at end of file
+    report = await run_by_partitions(
+        lambda partition: run_in_batches(partition, archive_statement, batch_size), partitions, concurrency,
+    )
+    log_report("archival of inactive links", report, batch_size)
+
+    logger.info("The cleanup is ended!")
+    return report
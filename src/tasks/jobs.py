@@ -0,0 +1,125 @@
+"""
+Реестр периодических задач сервиса.
+
+Задачи указаны текстовыми ссылками "модуль:функция": модуль задачи
+импортируется только при ее первом запуске, поэтому процесс, в котором
+шедулер отключен, не загружает ни APScheduler, ни модули задач.
+Шедулер запускается внутри веб-приложения (SCHEDULER_ENABLED=true)
+или отдельным процессом: python -m src.worker scheduler.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Dict, List, Optional, Set
+
+from src.logger_config import logger
+from src.monitoring.tracing import tracer
+from src.config import CLICKS_SYNC_INTERVAL_SECONDS, URL_CHECK_ENABLED
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    id: str
+    func: str
+    # Параметры interval-триггера APScheduler (seconds / minutes / hours)
+    interval: dict = field(default_factory=dict)
+    enabled: bool = True
+
+
+@dataclass
+class JobStats:
+    """
+    Длительность запусков задачи в текущем процессе.
+    """
+    runs: int = 0
+    failures: int = 0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_finished_at: Optional[float] = None
+
+    @property
+    def avg_duration(self) -> float:
+        return self.total_duration / self.runs if self.runs else 0.0
+
+
+job_stats: Dict[str, JobStats] = {}
+# Задачи, выполняющиеся в данный момент (для корректной остановки процесса)
+running_jobs: Set[asyncio.Task] = set()
+
+
+def get_scheduled_jobs() -> List[ScheduledJob]:
+    return [
+        ScheduledJob(
+            "sync_click_counters",
+            "src.tasks.sync_clicks:sync_click_counters",
+            {"seconds": CLICKS_SYNC_INTERVAL_SECONDS},
+        ),
+        ScheduledJob("cleanup_expired_links", "src.tasks.cleanup_links:deactivate_expired_links", {"minutes": 5}),
+        ScheduledJob("cleanup_unused_links", "src.tasks.cleanup_links:deactivate_unused_links", {"hours": 12}),
+        ScheduledJob("archive_inactive_links", "src.tasks.cleanup_links:archive_inactive_links", {"hours": 1}),
+        # Проверка доступности URL выполняется вне запросов пользователей
+        ScheduledJob(
+            "check_link_urls",
+            "src.tasks.check_urls:check_link_urls",
+            {"minutes": 30},
+            enabled=URL_CHECK_ENABLED,
+        ),
+    ]
+
+
+def resolve_job(func: str):
+    module, name = func.split(":")
+    return getattr(import_module(module), name)
+
+
+async def run_job(job_id: str, func: str):
+    """
+    Запуск задачи с замером длительности.
+    Ошибка задачи логируется и не останавливает шедулер.
+    """
+    task = asyncio.current_task()
+    running_jobs.add(task)
+    stats = job_stats.setdefault(job_id, JobStats())
+    started = time.perf_counter()
+    try:
+        with tracer.span(f"job {job_id}"):
+            await resolve_job(func)()
+    except Exception as e:
+        stats.failures += 1
+        logger.error(f"The job {job_id} has failed: {e}")
+    finally:
+        duration = time.perf_counter() - started
+        stats.runs += 1
+        stats.last_duration = duration
+        stats.max_duration = max(stats.max_duration, duration)
+        stats.total_duration += duration
+        stats.last_finished_at = time.time()
+        running_jobs.discard(task)
+        logger.info(f"The job {job_id} took {duration:.3f} s (avg {stats.avg_duration:.3f} s, max {stats.max_duration:.3f} s)")
+
+
+async def wait_running_jobs(timeout: float) -> Set[asyncio.Task]:
+    """
+    Ожидание завершения запущенных задач. Возвращает задачи, не завершившиеся за timeout секунд.
+    """
+    if not running_jobs:
+        return set()
+    _, pending = await asyncio.wait(set(running_jobs), timeout=timeout)
+    return pending
+
+
+def create_scheduler():
+    """
+    AsyncIOScheduler со всеми включенными задачами реестра.
+    """
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler()
+    for job in get_scheduled_jobs():
+        if job.enabled:
+            scheduler.add_job(
+                run_job, trigger="interval", args=[job.id, job.func], id=job.id, replace_existing=True, **job.interval,
+            )
+    return scheduler
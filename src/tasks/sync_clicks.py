@@ -0,0 +1,81 @@
+from sqlalchemy import text
+
+from src.database import async_session_maker
+from src.cache.clicks import take_pending_clicks, finish_sync, acquire_sync_lock, release_sync_lock
+from src.cache.redis_client import cache_delete_many
+from src.logger_config import logger
+from src.config import CLICKS_SYNC_LOCK_TTL_SECONDS
+
+
+# Все счетчики записываются одним запросом через unnest массивов.
+# Id пачки вставляется в click_sync_batches в том же запросе: если пачка уже
+# записана (например, процесс упал до удаления ее из Redis), CTE пустой
+# и счетчики не увеличиваются повторно.
+SYNC_CLICKS_SQL = text("""
+WITH batch AS (
+    INSERT INTO click_sync_batches (batch_id) VALUES (:batch_id)
+    ON CONFLICT (batch_id) DO NOTHING
+    RETURNING batch_id
+)
+UPDATE links l
+SET clicks_count = COALESCE(l.clicks_count, 0) + p.clicks,
+    last_clicked_at = GREATEST(l.last_clicked_at, p.last_clicked_at)
+FROM unnest(
+    CAST(:short_codes AS varchar[]),
+    CAST(:clicks AS integer[]),
+    CAST(:last_clicked_at AS timestamptz[])
+) AS p(short_code, clicks, last_clicked_at), batch
+WHERE l.short_code = p.short_code
+""")
+
+# Пачка повторяется, только пока она лежит в Redis, поэтому старые id не нужны
+CLEANUP_BATCHES_SQL = text("""
+DELETE FROM click_sync_batches WHERE applied_at < now() - interval '1 day'
+""")
+
+
+async def sync_click_counters() -> int:
+    """
+    Перенос накопленных в Redis переходов в таблицу links.
+    Блокировка не дает репликам забирать переходы одновременно, а id пачки
+    в click_sync_batches гарантирует, что пачка попадет в БД ровно один раз,
+    даже если блокировка истекла.
+    """
+
+    token = await acquire_sync_lock(CLICKS_SYNC_LOCK_TTL_SECONDS)
+    if token is None:
+        logger.info("Clicks are being synced by another process")
+        return 0
+
+    try:
+        batch_id, pending = await take_pending_clicks()
+        if not pending:
+            return 0
+
+        short_codes = list(pending)
+        async with async_session_maker() as session:
+            await session.execute(CLEANUP_BATCHES_SQL)
+            await session.execute(SYNC_CLICKS_SQL, {
+                "batch_id": batch_id,
+                "short_codes": short_codes,
+                "clicks": [pending[code].clicks for code in short_codes],
+                "last_clicked_at": [pending[code].last_clicked_at for code in short_codes],
+            })
+            await session.commit()
+
+        # Пачка записана - удаляем ее из Redis, даже если блокировка уже истекла
+        await finish_sync(batch_id)
+    finally:
+        lock_held = await release_sync_lock(token)
+
+    if not lock_held:
+        logger.warning(
+            f"The clicks sync lock expired before the sync finished, "
+            f"increase CLICKS_SYNC_LOCK_TTL_SECONDS (now {CLICKS_SYNC_LOCK_TTL_SECONDS})"
+        )
+
+    # Удаляем устаревший кэш статистики
+    await cache_delete_many([(f"/links/{code}/stats", {}) for code in short_codes])
+
+    logger.info(f"Synced clicks of {len(short_codes)} links")
+    return len(short_codes)
@@ -1,31 +1,117 @@
-import uuid
+import secrets
 import string
+from typing import Iterator, List
+
+from src.config import SHORT_CODE_ALPHABET, SHORT_CODE_LENGTH
 
 
 BASE62 = string.digits + string.ascii_letters
 
 
-def encode_base62(num: int) -> str:
+def encode_base62(num: int, alphabet: str = BASE62) -> str:
     """
-    Алгоритм генерации base62-кода.
+    Алгоритм генерации base62-кода (в общем случае - по основанию len(alphabet)).
     """
 
+    if num < 0:
+        raise ValueError("Only non-negative numbers can be encoded")
     if num == 0:
-        return BASE62[0]
-    
-    base62 = []
+        return alphabet[0]
+
+    base = len(alphabet)
+    digits = []
     while num > 0:
-        num, rem = divmod(num, 62)
-        base62.append(BASE62[rem])
+        num, rem = divmod(num, base)
+        digits.append(alphabet[rem])
+
+    return ''.join(reversed(digits))
+
+
+def decode_base62(code: str, alphabet: str = BASE62) -> int:
+    """
+    Обратное преобразование: число по коду из encode_base62.
+    """
+
+    base = len(alphabet)
+    num = 0
+    for char in code:
+        index = alphabet.find(char)
+        if index < 0:
+            raise ValueError(f"Character '{char}' is not in the alphabet")
+        num = num * base + index
+    return num
+
+
+class ShortCodeGenerator:
+    """
+    Пакетная генерация случайных коротких кодов.
+
+    Случайные байты берутся одним вызовом secrets.token_bytes на всю пачку
+    и переводятся в символы алфавита таблицей bytes.translate (на C),
+    без арифметики над большими числами для каждого кода. Байты, не попадающие
+    в целое число повторов алфавита, отбрасываются, поэтому все символы равновероятны.
+    """
+
+    def __init__(self, alphabet: str = SHORT_CODE_ALPHABET, length: int = SHORT_CODE_LENGTH):
+        if len(set(alphabet)) != len(alphabet) or not 2 <= len(alphabet) <= 256:
+            raise ValueError("Alphabet must contain from 2 to 256 unique characters")
+        if not alphabet.isascii():
+            raise ValueError("Alphabet must contain only ASCII characters")
+        if length < 1:
+            raise ValueError("Short code length must be positive")
+
+        self.alphabet = alphabet
+        self.length = length
+        # Байты [0, limit) отображаются в алфавит, остальные отбрасываются
+        self._limit = 256 - 256 % len(alphabet)
+        repeated = (alphabet * (self._limit // len(alphabet))).encode("ascii")
+        self._table = bytes.maketrans(bytes(range(self._limit)), repeated)
+        self._rejected = bytes(range(self._limit, 256))
+
+    def _random_chars(self, count: int) -> bytes:
+        chars = b""
+        while len(chars) < count:
+            missing = count - len(chars)
+            # С запасом на отброшенные байты, чтобы обычно хватало одного вызова
+            raw = secrets.token_bytes(missing * 256 // self._limit + 16)
+            chars += raw.translate(self._table, self._rejected)
+        return chars[:count]
+
+    def generate_many(self, count: int) -> List[str]:
+        """
+        count случайных кодов длины length.
+        """
+        text = self._random_chars(count * self.length).decode("ascii")
+        return [text[i:i + self.length] for i in range(0, len(text), self.length)]
+
+    def generate(self) -> str:
+        return self.generate_many(1)[0]
+
+    def iter_codes(self, batch_size: int = 1024) -> Iterator[str]:
+        """
+        Бесконечный поток кодов, генерируемых пачками по batch_size.
+        """
+        while True:
+            yield from self.generate_many(batch_size)
+
+    def encode(self, num: int) -> str:
+        """
+        Код фиксированной длины для числа (дополняется первым символом алфавита).
+        """
+        code = encode_base62(num, self.alphabet)
+        if len(code) > self.length:
+            raise ValueError(f"Number {num} does not fit into {self.length} characters")
+        return code.rjust(self.length, self.alphabet[0])
+
+    def decode(self, code: str) -> int:
+        return decode_base62(code, self.alphabet)
+
 
-    return ''.join(reversed(base62))
+short_code_generator = ShortCodeGenerator()
 
 
-def generate_short_code_from_uuid(u: uuid.UUID = None, length: int = 10) -> str:
+def generate_short_code() -> str:
     """
-    Генерирация base62-код из UUID.
+    Случайный короткий код с алфавитом и длиной из настроек.
     """
-    
-    u = u or uuid.uuid4()
-    code = encode_base62(u.int)
-    return code[:length]
\ No newline at end of file
+    return short_code_generator.generate()
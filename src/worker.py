@@ -0,0 +1,140 @@
+"""
+Фоновый воркер сервиса, запускаемый отдельным от веб-приложения процессом.
+
+Воркер работает со своим движком и пулом соединений (WORKER_DB_*),
+не занимая соединения пулов веб-процессов.
+
+Запуск:
+    python -m src.worker scheduler
+    python -m src.worker cleanup --job expired --concurrency 4
+    python -m src.worker check-urls --batch-size 5000
+"""
+import argparse
+import asyncio
+import signal
+from typing import List, Optional
+
+from src.database import create_engine, use_engine
+from src.logger_config import logger
+from src.tasks.cleanup_links import deactivate_expired_links, deactivate_unused_links, archive_inactive_links
+from src.tasks.check_urls import check_link_urls
+from src.tasks.jobs import create_scheduler, job_stats, wait_running_jobs
+from src.monitoring.profiling import install_signal_handler
+from src.config import (
+    CLEANUP_CONCURRENCY, CLEANUP_BATCH_SIZE, URL_CHECK_BATCH_SIZE, PROFILING_ENABLED,
+    WORKER_DB_POOL_SIZE, WORKER_DB_MAX_OVERFLOW, WORKER_SHUTDOWN_TIMEOUT_SECONDS,
+)
+
+
+CLEANUP_JOBS = {
+    "expired": deactivate_expired_links,
+    "unused": deactivate_unused_links,
+    "archive": archive_inactive_links,
+}
+
+
+def create_worker_engine(pool_size: int = WORKER_DB_POOL_SIZE, max_overflow: int = WORKER_DB_MAX_OVERFLOW):
+    """
+    Движок воркера, на который переключаются сессии всех задач.
+    """
+    engine = create_engine(pool_size, max_overflow)
+    use_engine(engine)
+    return engine
+
+
+async def run_scheduler(shutdown_timeout: float = WORKER_SHUTDOWN_TIMEOUT_SECONDS):
+    """
+    Периодический запуск задач реестра до получения SIGTERM/SIGINT.
+    При остановке новые запуски не начинаются, а выполняющиеся задачи
+    дорабатывают не дольше shutdown_timeout секунд, после чего отменяются.
+    """
+    engine = create_worker_engine()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    if PROFILING_ENABLED:
+        install_signal_handler()
+
+    scheduler = create_scheduler()
+    scheduler.start()
+    logger.info(f"The scheduler worker is running: jobs {[job.id for job in scheduler.get_jobs()]}")
+    try:
+        await stop.wait()
+        logger.info("The scheduler worker is stopping, waiting for running jobs...")
+        scheduler.pause()
+        pending = await wait_running_jobs(shutdown_timeout)
+        if pending:
+            logger.warning(f"{len(pending)} running jobs did not finish in {shutdown_timeout} s and are cancelled")
+            for task in pending:
+                task.cancel()
+            # Задачи должны освободить соединения до закрытия пула
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        scheduler.shutdown(wait=False)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
+        for job_id, stats in job_stats.items():
+            logger.info(
+                f"The job {job_id}: {stats.runs} runs, {stats.failures} failures, "
+                f"avg {stats.avg_duration:.3f} s, max {stats.max_duration:.3f} s"
+            )
+        await engine.dispose()
+
+
+async def run_cleanup(jobs: List[str], partitions: Optional[List[str]], concurrency: int, batch_size: int):
+    """
+    Однократный запуск задач очистки по партициям таблицы links.
+    """
+    # Каждая одновременно очищаемая партиция занимает соединение из пула
+    engine = create_worker_engine(pool_size=max(WORKER_DB_POOL_SIZE, concurrency))
+    try:
+        for job in jobs:
+            await CLEANUP_JOBS[job](partitions, concurrency, batch_size)
+    finally:
+        await engine.dispose()
+
+
+async def run_url_check(batch_size: int):
+    """
+    Однократная проверка доступности оригинальных URL.
+    """
+    engine = create_worker_engine()
+    try:
+        await check_link_urls(batch_size)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Short Link Service background worker")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("scheduler", help="Run scheduled jobs until SIGTERM/SIGINT")
+
+    cleanup = commands.add_parser("cleanup", help="Deactivate and archive links partition by partition")
+    cleanup.add_argument("--job", choices=[*CLEANUP_JOBS, "all"], default="all")
+    cleanup.add_argument("--partition", action="append", dest="partitions", default=None,
+                         help="Partition to clean up (repeatable), all partitions by default")
+    # Каждая одновременно очищаемая партиция занимает соединение к БД
+    cleanup.add_argument("--concurrency", type=int, default=CLEANUP_CONCURRENCY)
+    cleanup.add_argument("--batch-size", type=int, default=CLEANUP_BATCH_SIZE)
+
+    check_urls = commands.add_parser("check-urls", help="Check reachability of original URLs")
+    check_urls.add_argument("--batch-size", type=int, default=URL_CHECK_BATCH_SIZE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "scheduler":
+        asyncio.run(run_scheduler())
+    elif args.command == "cleanup":
+        jobs = list(CLEANUP_JOBS) if args.job == "all" else [args.job]
+        logger.info(f"The cleanup worker is running: jobs {jobs}, concurrency {args.concurrency}")
+        asyncio.run(run_cleanup(jobs, args.partitions, args.concurrency, args.batch_size))
+    elif args.command == "check-urls":
+        asyncio.run(run_url_check(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from httpx import AsyncClient, ASGITransport
 from src.main import app
 from src.database import get_async_session
 from src.cache.redis_client import cache_get, cache_set, cache_delete
+from src.cache.local_cache import local_cache
+from src.cache.clicks import RESOLVE_AND_COUNT_SCRIPT, COUNT_CLICK_SCRIPT
 
 import src.cache.redis_client
 
@@ -19,8 +21,27 @@ def mock_redis(monkeypatch):
     fake_redis.get = AsyncMock(return_value=None)
     fake_redis.set = AsyncMock()
     fake_redis.delete = AsyncMock()
+    fake_redis.smembers = AsyncMock(return_value=set())
+    # Пайплайн с командами, накапливаемыми до execute
+    fake_pipeline = MagicMock()
+    # По умолчанию ответы пайплайна пустые (например, нет незаписанных переходов)
+    fake_pipeline.execute = AsyncMock(return_value=[None, None, None, None])
+    fake_redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=fake_pipeline)
+    fake_redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    # Lua-скрипты: по умолчанию промах кэша редиректа, остальные (например, rate limiting) разрешают запрос.
+    # Моки скриптов доступны в fake_redis.scripts по исходному тексту.
+    fake_redis.scripts = {
+        RESOLVE_AND_COUNT_SCRIPT: AsyncMock(return_value=None),
+        COUNT_CLICK_SCRIPT: AsyncMock(return_value=None),
+    }
+    fake_redis.register_script = MagicMock(
+        side_effect=lambda source: fake_redis.scripts.setdefault(source, AsyncMock(return_value=[1, 0, b"100"]))
+    )
 
     monkeypatch.setattr(src.cache.redis_client, "get_redis_client", lambda: fake_redis)
+    # Локальный кэш воркера не должен переживать тест
+    local_cache.clear()
+    return fake_redis
 
 
 @pytest.fixture
@@ -45,6 +66,8 @@ def mock_db_session():
     fake_scalars.all.return_value = []
     fake_scalars.first.return_value = None
     fake_execute_result.scalars.return_value = fake_scalars
+    # Колоночные запросы (src/links/queries.py) по умолчанию ничего не находят
+    fake_execute_result.first.return_value = None
     mock.execute = AsyncMock(return_value=fake_execute_result)
 
     return mock
@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.main import app
+from src.auth.manager import current_active_user
+from src.auth.manager import get_redis_strategy
+from src.auth.strategy import DESTROY_ALL_TOKENS_SCRIPT, WRITE_TOKEN_SCRIPT, RedisTokenStrategy
+
+
+@pytest.mark.asyncio
+async def test_logout_all_not_supported_for_jwt(async_client):
+    """
+    Тест выхода на всех устройствах при stateless JWT-бэкенде.
+    """
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1)
+
+    response = await async_client.post("/auth/jwt/logout-all")
+
+    assert response.status_code == 400
+    assert "redis" in response.text.lower()
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
+@pytest.mark.asyncio
+async def test_redis_strategy_destroy_all_tokens():
+    """
+    Тест отзыва всех токенов пользователя по индексу без сканирования ключей.
+    """
+    scripts = {}
+    fake_redis = MagicMock()
+    fake_redis.register_script = MagicMock(side_effect=lambda source: scripts.setdefault(source, AsyncMock()))
+    fake_redis.scan = AsyncMock()
+
+    strategy = RedisTokenStrategy(fake_redis, lifetime_seconds=60)
+    # Из трех токенов в индексе один уже истек: DEL удаляет только два
+    scripts[DESTROY_ALL_TOKENS_SCRIPT].return_value = 2
+    revoked = await strategy.destroy_all_tokens(MagicMock(id="u1"))
+
+    assert revoked == 2
+    assert scripts[DESTROY_ALL_TOKENS_SCRIPT].await_args.kwargs == {
+        "keys": ["auth:user_tokens:u1"],
+        "args": ["auth:token:"],
+    }
+    fake_redis.scan.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_strategy_write_token_prunes_index():
+    """
+    Тест записи токена: один вызов скрипта, который чистит индекс от истекших токенов.
+    """
+    scripts = {}
+    fake_redis = MagicMock()
+    fake_redis.register_script = MagicMock(side_effect=lambda source: scripts.setdefault(source, AsyncMock()))
+
+    strategy = RedisTokenStrategy(fake_redis, lifetime_seconds=60)
+    token = await strategy.write_token(MagicMock(id="u1"))
+
+    assert scripts[WRITE_TOKEN_SCRIPT].await_args.kwargs == {
+        "keys": [f"auth:token:{token}", "auth:user_tokens:u1"],
+        "args": ["u1", 60, "auth:token:", token],
+    }
+
+
+def test_redis_strategy_is_created_once():
+    """
+    Тест стратегии Redis: создается один раз, а не на каждый запрос.
+    """
+    assert get_redis_strategy() is get_redis_strategy()
@@ -0,0 +1,50 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.main import app
+from src.cache.warmup import warm_up_redirect_cache
+from src.cache.local_cache import local_cache
+
+
+@pytest.mark.asyncio
+@patch("src.cache.warmup.async_session_maker")
+async def test_warm_up_redirect_cache(mock_session_maker, mock_redis):
+    """
+    Тест прогрева кэша: один запрос к БД и один пайплайн в Redis.
+    """
+    mock_session = AsyncMock()
+    mock_execute_result = MagicMock()
+    mock_execute_result.all.return_value = [
+        ("abc", "https://a.com", 500, None, "tracked"),
+        ("def", "https://d.com", 3, None, "permanent"),
+    ]
+    mock_session.execute = AsyncMock(return_value=mock_execute_result)
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    mock_redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    warmed = await warm_up_redirect_cache(limit=10)
+
+    assert warmed == 2
+    mock_session.execute.assert_awaited_once()
+    assert pipe.set.call_count == 2
+    pipe.execute.assert_awaited_once()
+    assert local_cache.get("/links/abc?")["url"] == "https://a.com"
+
+
+@pytest.mark.asyncio
+async def test_readiness(async_client):
+    """
+    Тест ручки готовности до и после прогрева кэша.
+    """
+    app.state.ready = False
+    response = await async_client.get("/ready")
+    assert response.status_code == 503
+
+    app.state.ready = True
+    response = await async_client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
@@ -0,0 +1,269 @@
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import ipaddress
+from unittest.mock import AsyncMock, patch
+
+from src.tasks.check_urls import (
+    BLOCKED_STATUS,
+    UNREACHABLE_STATUS,
+    UrlChecker,
+    check_link_urls,
+    create_client,
+    is_public_address,
+    save_url_statuses,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка целевых сайтов: /ok, /missing, /no-head (HEAD не поддерживается), /slow.
+    """
+    requests = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def handle_request(self):
+        cls = type(self)
+        path = self.path.split("?")[0]
+        with cls.lock:
+            cls.requests.append((self.command, self.path))
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if path == "/slow":
+                time.sleep(0.1)
+            if path in ("/ok", "/slow"):
+                status = 200
+            elif path == "/no-head":
+                status = 405 if self.command == "HEAD" else 200
+            else:
+                status = 404
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    do_HEAD = handle_request
+    do_GET = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Локальный HTTP-сервер в отдельном потоке.
+    """
+    StubHandler.requests = []
+    StubHandler.active = 0
+    StubHandler.max_active = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_check_many_statuses(stub_server):
+    """
+    Тест статусов доступного, отсутствующего и не поддерживающего HEAD URL.
+    """
+    async with httpx.AsyncClient() as client:
+        statuses = await UrlChecker(client, host_delay=0, allow_private=True).check_many([
+            f"{stub_server}/ok",
+            f"{stub_server}/missing",
+            f"{stub_server}/no-head",
+        ])
+
+    assert statuses == {
+        f"{stub_server}/ok": 200,
+        f"{stub_server}/missing": 404,
+        f"{stub_server}/no-head": 200,
+    }
+    assert ("GET", "/no-head") in StubHandler.requests
+
+
+@pytest.mark.asyncio
+async def test_check_many_deduplicates_urls(stub_server):
+    """
+    Тест дедупликации: одинаковый URL проверяется один раз.
+    """
+    url = f"{stub_server}/ok"
+
+    async with httpx.AsyncClient() as client:
+        statuses = await UrlChecker(client, host_delay=0, allow_private=True).check_many([url, url, url])
+
+    assert statuses == {url: 200}
+    assert StubHandler.requests == [("HEAD", "/ok")]
+
+
+@pytest.mark.asyncio
+async def test_check_many_per_host_limit(stub_server):
+    """
+    Тест вежливости: к одному хосту не больше per_host одновременных запросов.
+    """
+    urls = [f"{stub_server}/slow?n={n}" for n in range(6)]
+
+    async with httpx.AsyncClient() as client:
+        statuses = await UrlChecker(client, concurrency=10, per_host=2, host_delay=0, allow_private=True).check_many(urls)
+
+    assert set(statuses.values()) == {200}
+    assert StubHandler.max_active <= 2
+
+
+@pytest.mark.asyncio
+async def test_check_unreachable_url():
+    """
+    Тест недоступного сервера.
+    """
+    async with httpx.AsyncClient(timeout=1) as client:
+        # Порт 9 (discard) на localhost заведомо закрыт
+        status = await UrlChecker(client, host_delay=0, allow_private=True).check("http://127.0.0.1:9/")
+
+    assert status == UNREACHABLE_STATUS
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.async_session_maker")
+async def test_save_url_statuses(mock_session_maker):
+    """
+    Тест сохранения статусов: один набор параметров на уникальный URL.
+    """
+    mock_session = AsyncMock()
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+    checked_at = datetime.now(timezone.utc)
+
+    await save_url_statuses(
+        [("a1", "https://a.com"), ("a2", "https://a.com"), ("b1", "https://b.com")],
+        {"https://a.com": 200, "https://b.com": 0},
+        checked_at,
+    )
+
+    params = mock_session.execute.await_args.args[1]
+    assert params == [
+        {"codes": ["a1", "a2"], "status": 200, "checked_at": checked_at},
+        {"codes": ["b1"], "status": 0, "checked_at": checked_at},
+    ]
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_check_blocks_private_address(stub_server):
+    """
+    Тест защиты от запросов во внутреннюю сеть: сервер на 127.0.0.1 не запрашивается.
+    """
+    async with httpx.AsyncClient() as client:
+        status = await UrlChecker(client, host_delay=0).check(f"{stub_server}/ok")
+
+    assert status == BLOCKED_STATUS
+    assert StubHandler.requests == []
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.resolve_host", new_callable=AsyncMock)
+async def test_check_blocks_redirect_to_private_address(mock_resolve, stub_server):
+    """
+    Тест проверки каждого редиректа: публичный URL, перенаправляющий на 127.0.0.1, блокируется.
+    """
+    mock_resolve.return_value = [ipaddress.ip_address("93.184.216.34")]
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(302, headers={"Location": f"{stub_server}/ok"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        status = await UrlChecker(client, host_delay=0).check("http://public.example/")
+
+    assert status == BLOCKED_STATUS
+    assert requested == ["http://public.example/"]
+    assert StubHandler.requests == []
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.resolve_host", new_callable=AsyncMock)
+async def test_check_blocks_dns_rebinding(mock_resolve, stub_server):
+    """
+    Тест DNS rebinding: хост прошел проверку как публичный, но при подключении
+    резолвится в 127.0.0.1 - соединение не открывается.
+    """
+    port = stub_server.rsplit(":", 1)[1]
+    mock_resolve.side_effect = [[ipaddress.ip_address("93.184.216.34")], [ipaddress.ip_address("127.0.0.1")]]
+
+    async with create_client() as client:
+        status = await UrlChecker(client, host_delay=0).check(f"http://rebind.example:{port}/ok")
+
+    assert status == BLOCKED_STATUS
+    assert mock_resolve.await_count == 2
+    assert StubHandler.requests == []
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.is_public_address", return_value=True)
+@patch("src.tasks.check_urls.resolve_host", new_callable=AsyncMock)
+async def test_check_connects_to_resolved_address(mock_resolve, mock_is_public, stub_server):
+    """
+    Тест подключения к проверенному адресу: соединение открывается с IP,
+    полученным бэкендом при проверке адреса (имя хоста не резолвится системой).
+    """
+    port = stub_server.rsplit(":", 1)[1]
+    mock_resolve.return_value = [ipaddress.ip_address("127.0.0.1")]
+
+    async with create_client() as client:
+        status = await UrlChecker(client, host_delay=0).check(f"http://pinned.example:{port}/ok")
+
+    assert status == 200
+    assert StubHandler.requests == [("HEAD", "/ok")]
+
+
+@pytest.mark.parametrize("address, public", [
+    ("93.184.216.34", True),
+    ("127.0.0.1", False),
+    ("10.0.0.5", False),
+    ("169.254.169.254", False),
+    ("::1", False),
+    ("::ffff:127.0.0.1", False),
+])
+def test_is_public_address(address, public):
+    """
+    Тест классификации адресов: loopback, частные и link-local адреса не публичные.
+    """
+    assert is_public_address(ipaddress.ip_address(address)) is public
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.URL_CHECK_ALLOW_PRIVATE", True)
+@patch("src.tasks.check_urls.save_url_statuses", new_callable=AsyncMock)
+@patch("src.tasks.check_urls.get_links_to_check", new_callable=AsyncMock)
+async def test_check_link_urls(mock_get_links, mock_save, stub_server):
+    """
+    Тест задачи проверки: ссылки из БД проверяются и статусы сохраняются.
+    """
+    mock_get_links.return_value = [("a1", f"{stub_server}/ok"), ("a2", f"{stub_server}/missing")]
+
+    statuses = await check_link_urls()
+
+    assert statuses == {f"{stub_server}/ok": 200, f"{stub_server}/missing": 404}
+    mock_save.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.check_urls.save_url_statuses", new_callable=AsyncMock)
+@patch("src.tasks.check_urls.get_links_to_check", new_callable=AsyncMock, return_value=[])
+async def test_check_link_urls_nothing_to_check(mock_get_links, mock_save):
+    """
+    Тест задачи проверки без ссылок для проверки.
+    """
+    assert await check_link_urls() == {}
+    mock_save.assert_not_awaited()
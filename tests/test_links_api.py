@@ -1,8 +1,15 @@
 import pytest
-from unittest.mock import MagicMock
+from datetime import datetime, timezone, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.main import app
 from src.auth.manager import current_active_user
+from src.links.models import ShortLinkArchive
+from src.cache.clicks import RESOLVE_AND_COUNT_SCRIPT, COUNT_CLICK_SCRIPT
+from src.cache.local_cache import local_cache
+from src.cache.redis_client import JsonSerializer, build_cache_key
+from src.cache.search_index import FILL_SCRIPT, search_index_key, search_pending_key
+from src.config import SEARCH_CACHE_TTL
 
 
 @pytest.mark.asyncio
@@ -10,34 +17,69 @@ async def test_create_short_link_success(async_client, mock_db_session):
     """
     Тест успешного создания ссылки.
     """
+    mock_db_session.execute.return_value.first.return_value = ("code",)
+
     response = await async_client.post("/links/shorten", json={"original_url": "https://test.com"})
 
     assert response.status_code == 200
     data = response.json()
     assert data["original_url"] == "https://test.com"
     assert "short_code" in data
+    # Одна вставка без предварительной проверки кода
+    mock_db_session.execute.assert_awaited_once()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_short_link_regenerates_taken_code(async_client, mock_db_session):
+    """
+    Тест повторной генерации, если сгенерированный код уже занят.
+    """
+    mock_db_session.execute.return_value.first.side_effect = [None, ("code",)]
+
+    response = await async_client.post("/links/shorten", json={"original_url": "https://test.com"})
+
+    assert response.status_code == 200
+    assert mock_db_session.execute.await_count == 2
+    first_code = mock_db_session.execute.await_args_list[0].args[1]["short_code"]
+    second_code = mock_db_session.execute.await_args_list[1].args[1]["short_code"]
+    assert response.json()["short_code"] == second_code != first_code
+
+
+@pytest.mark.asyncio
+async def test_create_short_link_no_free_code(async_client, mock_db_session):
+    """
+    Тест ограничения числа попыток генерации кода.
+    """
+    response = await async_client.post("/links/shorten", json={"original_url": "https://test.com"})
+
+    assert response.status_code == 503
+    mock_db_session.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_create_short_link_custom_alias_invalid(async_client, mock_db_session):
+@pytest.mark.parametrize("alias", ["search", "stats", "Export", "bulk"])
+async def test_create_short_link_custom_alias_invalid(async_client, mock_db_session, alias):
     """
-    Тест неудачного создания ссылки - использование ключевого слова `search`.
+    Тест неудачного создания ссылки - использование зарезервированного слова.
     """
     response = await async_client.post("/links/shorten", json={
         "original_url": "https://example.com",
-        "custom_alias": "search"
+        "custom_alias": alias
     })
 
     assert response.status_code == 400
     assert "cannot be used" in response.text.lower()
+    mock_db_session.execute.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_create_short_link_custom_alias_already_exists(async_client, mock_db_session):
     """
-    Тест неудачного создания ссылки - алиас уже используется.
+    Тест неудачного создания ссылки - алиас уже используется:
+    вставка с ON CONFLICT DO NOTHING ничего не вернула.
     """
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = MagicMock()
+    mock_db_session.execute.return_value.first.return_value = None
 
     response = await async_client.post("/links/shorten", json={
         "original_url": "https://example.com",
@@ -53,7 +95,7 @@ async def test_create_link_custom_alias_ok(async_client, mock_db_session):
     """
     Тест удачного создания ссылки по незанятому алиасу.
     """
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+    mock_db_session.execute.return_value.first.return_value = ("alias",)
 
     response = await async_client.post("/links/shorten", json={
         "original_url": "https://example.com",
@@ -70,12 +112,8 @@ async def test_search_links_by_original_success(async_client, mock_db_session):
     """
     Тест поиска ссылок по оригинальному url.
     """
-    # Мок объекта ссылки
-    fake_link = MagicMock(
-        short_code = "abc123",
-        original_url = "https://example.com"
-    )
-    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [fake_link]
+    # В БД запрашиваются только короткие коды
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = ["abc123"]
 
     response = await async_client.get("/links/search", params={"original_url": "https://example.com"})
 
@@ -87,6 +125,78 @@ async def test_search_links_by_original_success(async_client, mock_db_session):
     assert data[0]["original_url"] == "https://example.com"
 
 
+@pytest.mark.asyncio
+async def test_search_links_fill_keeps_concurrent_adds(async_client, mock_db_session, mock_redis):
+    """
+    Тест построения индекса поиска: построение начинается до запроса в БД,
+    а запись индекса объединяет результат запроса с кодами, добавленными за это время.
+    """
+    calls = []
+    pipeline = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipeline.sadd.side_effect = lambda key, *members: calls.append(("begin", key))
+    fill = mock_redis.scripts.setdefault(FILL_SCRIPT, AsyncMock())
+    fill.side_effect = lambda keys, args: calls.append(("fill", keys, args))
+
+    async def execute(*args, **kwargs):
+        calls.append(("db",))
+        return mock_db_session.execute.return_value
+
+    mock_db_session.execute.side_effect = execute
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = ["abc123"]
+
+    response = await async_client.get("/links/search", params={"original_url": "https://example.com"})
+
+    assert response.status_code == 200
+    pending_key = search_pending_key("https://example.com")
+    assert calls[0] == ("begin", pending_key)
+    assert calls[1] == ("db",)
+    assert calls[2] == ("fill", [search_index_key("https://example.com"), pending_key], [SEARCH_CACHE_TTL, "abc123"])
+
+
+@pytest.mark.asyncio
+async def test_search_links_from_index(async_client, mock_db_session, mock_redis):
+    """
+    Тест поиска ссылок по индексу в Redis без обращения к БД.
+    """
+    mock_redis.smembers.return_value = {b"", b"def456", b"abc123"}
+
+    response = await async_client.get("/links/search", params={"original_url": "https://example.com"})
+
+    assert response.status_code == 200
+    assert [item["short_code"] for item in response.json()] == ["abc123", "def456"]
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_links_not_modified(async_client, mock_db_session, mock_redis):
+    """
+    Тест ответа 304 на поиск при совпадении ETag.
+    """
+    mock_redis.smembers.return_value = {b"", b"abc123"}
+    params = {"original_url": "https://example.com"}
+
+    first = await async_client.get("/links/search", params=params)
+    second = await async_client.get("/links/search", params=params, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_links_empty_index(async_client, mock_db_session, mock_redis):
+    """
+    Тест поиска по построенному пустому индексу (ссылок нет) без обращения к БД.
+    """
+    mock_redis.smembers.return_value = {b""}
+
+    response = await async_client.get("/links/search", params={"original_url": "https://example.com"})
+
+    assert response.status_code == 404
+    mock_db_session.execute.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_search_links_by_original_not_found(async_client, mock_db_session):
     """
@@ -98,7 +208,7 @@ async def test_search_links_by_original_not_found(async_client, mock_db_session)
 
 
 @pytest.mark.asyncio
-async def test_redirect_by_code_success(async_client, mock_db_session):
+async def test_redirect_by_code_success(async_client, mock_db_session, mock_redis):
     """
     Тест успешного редиректа.
     """
@@ -106,17 +216,193 @@ async def test_redirect_by_code_success(async_client, mock_db_session):
         short_code="abc123",
         original_url = "https://example.com",
         clicks_count = 0,
-        last_clicked_at = None
+        last_clicked_at = None,
+        expires_at = None,
+        redirect_policy = "tracked",
     )
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = fake_link
+    mock_db_session.execute.return_value.first.return_value = fake_link
 
     response = await async_client.get("links/abc123", follow_redirects=False)
 
     assert response.status_code == 302
     assert response.headers["location"] == "https://example.com"
-    # Проверка обновления данных ссылки
-    assert fake_link.clicks_count == 1
-    assert fake_link.last_clicked_at is not None
+    # Редирект без кэша - один запрос к БД на чтение, переход учитывается в Redis без записи в БД
+    mock_db_session.execute.assert_awaited_once()
+    mock_redis.scripts[COUNT_CLICK_SCRIPT].assert_awaited_once()
+    assert mock_redis.scripts[COUNT_CLICK_SCRIPT].await_args.kwargs["args"] == ["abc123"]
+    mock_db_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redirect_tracked_not_cacheable(async_client, mock_db_session, mock_redis):
+    """
+    Тест отслеживаемого редиректа: 302 без кэширования браузером.
+    """
+    mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].return_value = \
+        b'{"url":"https://cached.com","expires_at":null,"policy":"tracked"}'
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 302
+    assert response.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.asyncio
+async def test_redirect_permanent_cacheable(async_client, mock_db_session, mock_redis):
+    """
+    Тест постоянного редиректа: 301 с max-age не дольше срока жизни ссылки.
+    """
+    fake_link = MagicMock(
+        short_code="abc123",
+        original_url="https://example.com",
+        clicks_count=0,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=100),
+        redirect_policy="permanent",
+    )
+    mock_db_session.execute.return_value.first.return_value = fake_link
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 301
+    cache_control = response.headers["cache-control"]
+    assert cache_control.startswith("public, max-age=")
+    assert 0 < int(cache_control.split("=")[1]) <= 100
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_expired(async_client, mock_db_session, mock_redis):
+    """
+    Тест редиректа по истекшей ссылке, которую еще не удалил шедулер.
+    """
+    fake_link = MagicMock(
+        short_code="abc123",
+        original_url="https://example.com",
+        clicks_count=0,
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    )
+    mock_db_session.execute.return_value.first.return_value = fake_link
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 410
+    # Переход по истекшей ссылке не учитывается
+    mock_redis.scripts[COUNT_CLICK_SCRIPT].assert_not_awaited()
+    mock_redis.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redirect_expired_from_local_cache(async_client, mock_db_session, mock_redis):
+    """
+    Тест редиректа по истекшей ссылке из локального кэша: переход не учитывается.
+    """
+    expired_at = (datetime.now(timezone.utc) - timedelta(seconds=1)).timestamp()
+    local_cache.set(build_cache_key("/links/abc123", {}), {"url": "https://cached.com", "expires_at": expired_at}, ttl=10)
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 410
+    mock_redis.scripts[COUNT_CLICK_SCRIPT].assert_not_awaited()
+    mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redirect_from_cache_passes_current_time(async_client, mock_db_session, mock_redis):
+    """
+    Тест передачи текущего времени в скрипт: истечение проверяется до учета перехода.
+    """
+    before = datetime.now(timezone.utc).timestamp()
+
+    await async_client.get("links/abc123", follow_redirects=False)
+
+    short_code, now, value_format = mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].await_args.kwargs["args"]
+    assert short_code == "abc123"
+    assert now >= before
+    assert value_format == "json"
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_inactive(async_client, mock_db_session, mock_redis):
+    """
+    Тест редиректа по ссылке, деактивированной шедулером.
+    """
+    fake_link = MagicMock(
+        short_code="abc123",
+        original_url="https://example.com",
+        clicks_count=0,
+        expires_at=None,
+        is_active=False,
+    )
+    mock_db_session.execute.return_value.first.return_value = fake_link
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 410
+    assert "inactive" in response.text.lower()
+    assert fake_link.clicks_count == 0
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_archived(async_client, mock_db_session):
+    """
+    Тест редиректа по ссылке, перенесенной в архив.
+    """
+    archived_link = MagicMock(short_code="abc123", original_url="https://example.com")
+    mock_db_session.execute.return_value.first.side_effect = [None, archived_link]
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 410
+    assert "archived" in response.text.lower()
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_cache_ttl_capped(async_client, mock_db_session, mock_redis):
+    """
+    Тест ограничения TTL кэша редиректа сроком жизни ссылки.
+    """
+    fake_link = MagicMock(
+        short_code="abc123",
+        original_url="https://example.com",
+        clicks_count=1000,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=10),
+        redirect_policy="tracked",
+    )
+    mock_db_session.execute.return_value.first.return_value = fake_link
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 302
+    assert mock_redis.set.await_args.kwargs["ex"] <= 10
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_from_cache(async_client, mock_db_session, mock_redis):
+    """
+    Тест редиректа из кэша без обращения к БД:
+    чтение кэша и учет перехода выполняются одним скриптом.
+    """
+    mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].return_value = b'{"url":"https://cached.com","expires_at":null}'
+
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 302
+    assert response.headers["location"] == "https://cached.com"
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redirect_by_code_from_local_cache(async_client, mock_db_session, mock_redis):
+    """
+    Тест редиректа из локального кэша: переход все равно учитывается в Redis.
+    """
+    mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].return_value = b'{"url":"https://cached.com","expires_at":null}'
+
+    await async_client.get("links/abc123", follow_redirects=False)
+    response = await async_client.get("links/abc123", follow_redirects=False)
+
+    assert response.status_code == 302
+    mock_redis.scripts[RESOLVE_AND_COUNT_SCRIPT].assert_awaited_once()
+    mock_redis.scripts[COUNT_CLICK_SCRIPT].assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -124,7 +410,7 @@ async def test_redirect_by_code_not_found(async_client, mock_db_session):
     """
     Тест редиректа, когда короткая ссылка не найдена.
     """
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+    mock_db_session.execute.return_value.first.return_value = None
     response = await async_client.get("links/notfound")
     assert response.status_code == 404
 
@@ -215,6 +501,27 @@ async def test_delete_link_success(async_client, mock_db_session):
     app.dependency_overrides.pop(current_active_user, None)
 
 
+@pytest.mark.asyncio
+@patch("src.cache.cdn.CDN_PURGE_URL", "http://cdn.test/purge")
+@patch("src.cache.cdn.httpx.AsyncClient.post", new_callable=AsyncMock)
+async def test_delete_link_purges_cdn(mock_post, async_client, mock_db_session):
+    """
+    Тест хука инвалидации CDN после удаления ссылки.
+    """
+    mock_post.return_value = MagicMock()
+    fake_link = MagicMock(short_code="test123", original_url="https://example.com", user_id=1)
+    mock_db_session.execute.return_value.scalars.return_value.first.return_value = fake_link
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1)
+
+    response = await async_client.delete("/links/test123")
+
+    assert response.status_code == 200
+    mock_post.assert_awaited_once()
+    assert mock_post.await_args.kwargs["json"] == {"paths": ["/links/test123"]}
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
 @pytest.mark.asyncio
 async def test_delete_link_forbidden(async_client, mock_db_session):
     """
@@ -257,9 +564,10 @@ async def test_get_stats_success(async_client, mock_db_session):
         short_code="abc123",
         original_url="https://example.com",
         clicks_count=42,
-        last_clicked_at=None
+        last_clicked_at=None,
+        redirect_policy="tracked",
     )
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = fake_link
+    mock_db_session.execute.return_value.first.return_value = fake_link
 
     response = await async_client.get("/links/abc123/stats")
 
@@ -275,9 +583,165 @@ async def test_get_stats_not_found(async_client, mock_db_session):
     """
     Тест получения статистики по ссылке, когда она не найдена.
     """
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = None
+    mock_db_session.execute.return_value.first.return_value = None
 
     response = await async_client.get("/links/notfound/stats")
 
     assert response.status_code == 404
     assert "not found" in response.text.lower()
+
+
+@pytest.mark.asyncio
+async def test_get_stats_from_archive(async_client, mock_db_session):
+    """
+    Тест получения статистики по архивной ссылке.
+    """
+    archived_link = ShortLinkArchive(
+        short_code="abc123",
+        original_url="https://example.com",
+        created_at=datetime.now(timezone.utc) - timedelta(days=40),
+        clicks_count=5,
+        archived_at=datetime.now(timezone.utc),
+    )
+    mock_db_session.execute.return_value.first.side_effect = [None, archived_link]
+
+    response = await async_client.get("/links/abc123/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["clicks_count"] == 5
+    assert data["is_active"] is False
+    assert data["archived_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_get_stats_with_pending_clicks(async_client, mock_db_session, mock_redis):
+    """
+    Тест статистики с переходами, еще не записанными из Redis в БД.
+    """
+    mock_redis.get.return_value = b'{"short_code":"abc123","original_url":"https://example.com",' \
+                                  b'"created_at":"2025-01-01T00:00:00Z","clicks_count":7}'
+    pipeline = mock_redis.pipeline.return_value.__aenter__.return_value
+    pipeline.execute.return_value = [b"2", b"1", b"1735700000000", None]
+
+    response = await async_client.get("/links/abc123/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["clicks_count"] == 10
+    assert data["last_clicked_at"].startswith("2025-01-01")
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_stats_not_modified(async_client, mock_db_session, mock_redis):
+    """
+    Тест ответа 304 на статистику из кэша при совпадении ETag.
+    """
+    mock_redis.get.return_value = b'{"short_code":"abc123","original_url":"https://example.com","clicks_count":7}'
+
+    first = await async_client.get("/links/abc123/stats")
+    second = await async_client.get("/links/abc123/stats", headers={"If-None-Match": f'W/{first.headers["etag"]}'})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("src.cache.redis_client.serializer", JsonSerializer())
+async def test_get_stats_etag_with_json_serializer(async_client, mock_db_session, mock_redis):
+    """
+    Тест ETag статистики при CACHE_SERIALIZER=json: ответ из кэша совпадает с ответом из БД.
+    """
+    mock_db_session.execute.return_value.first.return_value = MagicMock(
+        short_code="abc123",
+        original_url="https://example.com",
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        clicks_count=42,
+        last_clicked_at=None,
+        redirect_policy="tracked",
+    )
+
+    miss = await async_client.get("/links/abc123/stats")
+    mock_redis.get.return_value = mock_redis.set.await_args.args[1]
+    hit = await async_client.get("/links/abc123/stats")
+
+    assert b", " in mock_redis.get.return_value
+    assert hit.content == miss.content
+    assert hit.headers["etag"] == miss.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_get_stats_from_cache(async_client, mock_db_session, mock_redis):
+    """
+    Тест получения статистики из кэша без обращения к БД.
+    """
+    mock_redis.get.return_value = b'{"short_code":"abc123","original_url":"https://example.com","clicks_count":7}'
+
+    response = await async_client.get("/links/abc123/stats")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["clicks_count"] == 7
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_links(async_client, mock_db_session, mock_redis):
+    """
+    Тест массового удаления: чужие и несуществующие коды пропускаются,
+    кэш удаляется одной командой.
+    """
+    mock_db_session.execute.return_value.all.return_value = [("abc", "https://a.com")]
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1)
+
+    response = await async_client.post("/links/bulk/delete", json={"short_codes": ["abc", "foreign"]})
+
+    assert response.status_code == 200
+    assert response.json() == {"affected": ["abc"], "skipped": ["foreign"]}
+    mock_db_session.execute.assert_awaited_once()
+    mock_redis.delete.assert_awaited_once()
+    assert "/links/abc?" in mock_redis.delete.await_args.args
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_links(async_client, mock_db_session, mock_redis):
+    """
+    Тест массового обновления исходного URL.
+    """
+    mock_db_session.execute.return_value.all.return_value = [("abc", "https://old.com"), ("def", "https://old.com")]
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1)
+
+    response = await async_client.post("/links/bulk/update", json={
+        "short_codes": ["abc", "def"],
+        "original_url": "https://new.com"
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"affected": ["abc", "def"], "skipped": []}
+    mock_db_session.execute.assert_awaited_once()
+    mock_redis.delete.assert_awaited_once()
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_links_invalid_url(async_client, mock_db_session):
+    """
+    Тест массового обновления с некорректным URL.
+    """
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1)
+
+    response = await async_client.post("/links/bulk/update", json={
+        "short_codes": ["abc"],
+        "original_url": "ftp://new.com"
+    })
+
+    assert response.status_code == 422
+    mock_db_session.execute.assert_not_awaited()
+
+    app.dependency_overrides.pop(current_active_user, None)
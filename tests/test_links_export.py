@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.main import app
+from src.auth.manager import current_active_user
+
+
+def fake_stream_session(batches):
+    """
+    Мок сессии с потоковым результатом, отдающим строки пачками.
+    """
+    async def partitions():
+        for batch in batches:
+            yield batch
+
+    stream_result = MagicMock()
+    stream_result.partitions = partitions
+    session = AsyncMock()
+    session.stream = AsyncMock(return_value=stream_result)
+    return session
+
+
+@pytest.mark.asyncio
+@patch("src.links.export.async_session_maker")
+async def test_export_links_csv(mock_session_maker, async_client):
+    """
+    Тест потоковой выгрузки ссылок пользователя в CSV.
+    """
+    created = datetime(2025, 3, 20, tzinfo=timezone.utc)
+    session = fake_stream_session([
+        [("abc", "https://a.com", created, 3, None, None)],
+        [("def", "https://d.com", created, 0, None, None)],
+    ])
+    mock_session_maker.return_value.__aenter__.return_value = session
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1, is_superuser=False)
+
+    response = await async_client.get("/links/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("short_code,original_url")
+    assert lines[1].startswith("abc,https://a.com,2025-03-20T00:00:00+00:00,3")
+    assert len(lines) == 3
+    session.stream.assert_awaited_once()
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
+@pytest.mark.asyncio
+@patch("src.links.export.async_session_maker")
+async def test_export_links_ndjson(mock_session_maker, async_client):
+    """
+    Тест потоковой выгрузки ссылок пользователя в NDJSON.
+    """
+    created = datetime(2025, 3, 20, tzinfo=timezone.utc)
+    session = fake_stream_session([[("abc", "https://a.com", created, 3, None, None)]])
+    mock_session_maker.return_value.__aenter__.return_value = session
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1, is_superuser=False)
+
+    response = await async_client.get("/links/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.text.count("\n") == 1
+    assert '"short_code":"abc"' in response.text
+
+    app.dependency_overrides.pop(current_active_user, None)
+
+
+@pytest.mark.asyncio
+async def test_export_all_users_forbidden(async_client):
+    """
+    Тест выгрузки ссылок всех пользователей не администратором.
+    """
+    app.dependency_overrides[current_active_user] = lambda: MagicMock(id=1, is_superuser=False)
+
+    response = await async_client.get("/links/export", params={"all_users": "true"})
+
+    assert response.status_code == 403
+
+    app.dependency_overrides.pop(current_active_user, None)
@@ -0,0 +1,119 @@
+import io
+
+from src.links.importer import ImportReport, iter_batches, iter_import_records, split_not_imported
+
+
+def test_import_records_from_csv():
+    """
+    Тест разбора и валидации CSV-файла импорта.
+    """
+    file = io.BytesIO(
+        "original_url,custom_alias,expires_at\n"
+        "https://a.com,wiki,\n"
+        "https://b.com,,2030-01-01T00:00:00+00:00\n"
+        "ftp://bad.com,,\n"
+        "https://c.com,bad alias!,\n"
+        "https://d.com,search,\n"
+        "https://e.com,Stats,\n".encode()
+    )
+    report = ImportReport()
+
+    records = list(iter_import_records(file, "csv", report))
+
+    assert report.processed == 6
+    assert report.invalid == 4
+    assert len(report.error_samples) == 4
+    assert [record[1] for record in records][0] == "wiki"
+    assert records[0][5] is True
+    # Без алиаса код генерируется
+    assert records[1][1] and records[1][5] is False
+    assert records[1][3].year == 2030
+
+
+def test_import_records_from_ndjson():
+    """
+    Тест разбора NDJSON-файла импорта.
+    """
+    file = io.BytesIO(
+        b'{"original_url": "https://a.com", "custom_alias": "a1"}\n'
+        b'\n'
+        b'{"original_url": "https://b.com", "redirect_policy": "permanent"}\n'
+    )
+    report = ImportReport()
+
+    records = list(iter_import_records(file, "ndjson", report))
+
+    assert report.processed == 2
+    assert report.invalid == 0
+    assert records[0][1] == "a1"
+    # Политика редиректа переносится в staging-таблицу
+    assert records[0][4] == "tracked"
+    assert records[1][4] == "permanent"
+
+
+def test_import_records_skip_malformed_ndjson():
+    """
+    Тест некорректных строк NDJSON: битый JSON и строка не-объект считаются невалидными,
+    остальные строки импортируются.
+    """
+    file = io.BytesIO(
+        b'{"original_url": "https://a.com"}\n'
+        b'{"original_url": "https://b.com"\n'
+        b'[1, 2]\n'
+        b'"x"\n'
+        b'{"original_url": "https://c.com"}\n'
+    )
+    report = ImportReport()
+
+    records = list(iter_import_records(file, "ndjson", report))
+
+    assert report.processed == 5
+    assert report.invalid == 3
+    assert [sample["line"] for sample in report.error_samples] == [2, 3, 4]
+    assert [record[2] for record in records] == ["https://a.com", "https://c.com"]
+
+
+def test_import_records_skip_non_utf8_csv():
+    """
+    Тест CSV с некорректными байтами UTF-8: отклоняется только строка с ними.
+    """
+    file = io.BytesIO(
+        b"original_url,custom_alias,expires_at\n"
+        b"https://a.com,,\n"
+        b"https://b.com/\xff\xfe,,\n"
+        b"https://c.com,,\n"
+    )
+    report = ImportReport()
+
+    records = list(iter_import_records(file, "csv", report))
+
+    assert report.processed == 3
+    assert report.invalid == 1
+    assert report.error_samples[0]["line"] == 2
+    assert [record[2] for record in records] == ["https://a.com", "https://c.com"]
+
+
+def test_split_not_imported():
+    """
+    Тест отчета по пачке: конфликты алиасов считаются отдельно от коллизий сгенерированных кодов.
+    """
+    batch = [
+        (1, "taken", "https://a.com", None, "tracked", True),
+        (2, "dup", "https://b.com", None, "tracked", True),
+        (3, "dup", "https://c.com", None, "tracked", True),
+        (4, "gen1", "https://d.com", None, "tracked", False),
+        (5, "gen2", "https://e.com", None, "tracked", False),
+    ]
+
+    conflicts, collided = split_not_imported(batch, {"dup", "gen1"})
+
+    assert conflicts == 2
+    assert collided == [batch[4]]
+
+
+def test_iter_batches():
+    """
+    Тест разбиения потока записей на пачки.
+    """
+    batches = list(iter_batches(iter(range(5)), 2))
+    assert batches == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,115 @@
+import os
+import re
+import signal
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import MagicMock, patch
+
+from src.auth.manager import current_superuser
+from src.config import PROFILING_ENABLED
+from src.main import app
+from src.monitoring import profiling
+from src.monitoring.profiling import install_signal_handler, sample_stacks, write_signal_profile
+from src.monitoring.router import profiling_router
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,))
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+@pytest.fixture
+def profiling_app():
+    test_app = FastAPI()
+    test_app.include_router(profiling_router, prefix="/debug")
+    test_app.dependency_overrides[current_superuser] = lambda: MagicMock(is_superuser=True)
+    return test_app
+
+
+def test_sample_stacks(busy_thread):
+    """
+    Тест сэмплирующего профайлера: стеки другого потока собираются в свернутом виде.
+    """
+    samples = sample_stacks(busy_thread.ident, 0.1, interval=0.001)
+
+    assert sum(samples.values()) > 1
+    assert any(stack.split(";")[-1].startswith("busy_loop") for stack in samples)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, marker", [
+    ("cpu", None),
+    ("cprofile", "function calls"),
+    ("memory", "Traced memory"),
+])
+async def test_profile_endpoint(profiling_app, mode, marker):
+    async with AsyncClient(transport=ASGITransport(app=profiling_app), base_url="http://test") as ac:
+        response = await ac.get("/debug/profile", params={"mode": mode, "seconds": 0.05})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    if marker is None:
+        # Формат folded: "<стек через ;> <число сэмплов>"
+        assert all(re.fullmatch(r".+ \d+", line) for line in response.text.splitlines())
+        assert response.text
+    else:
+        assert marker in response.text
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_busy(profiling_app):
+    """
+    Тест ограничения: второе профилирование в процессе отклоняется.
+    """
+    with profiling._profile_lock:
+        async with AsyncClient(transport=ASGITransport(app=profiling_app), base_url="http://test") as ac:
+            response = await ac.get("/debug/profile", params={"seconds": 0.05})
+
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(PROFILING_ENABLED, reason="the profiling endpoint is enabled in the environment")
+async def test_profile_endpoint_disabled_by_default():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/debug/profile")
+
+    assert response.status_code == 404
+
+
+def test_write_signal_profile(busy_thread, tmp_path):
+    path = write_signal_profile(busy_thread.ident, seconds=0.05, output_dir=str(tmp_path))
+
+    with open(path) as f:
+        assert "busy_loop" in f.read()
+
+
+@patch("src.monitoring.profiling.write_signal_profile")
+def test_signal_handler(mock_write_signal_profile):
+    """
+    Тест обработчика SIGUSR2: профиль основного потока снимается в фоновом потоке.
+    """
+    previous = signal.getsignal(signal.SIGUSR2)
+    try:
+        assert install_signal_handler()
+        os.kill(os.getpid(), signal.SIGUSR2)
+        deadline = time.monotonic() + 2
+        while not mock_write_signal_profile.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+    mock_write_signal_profile.assert_called_once_with(threading.get_ident())
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import src.cache.redis_client
+from src.middleware.rate_limit import TOKEN_BUCKET_SCRIPT, limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter():
+    """
+    Фикстура сброса локального состояния лимитера между тестами.
+    """
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
+def set_bucket_response(monkeypatch, response):
+    """
+    Подмена ответа Lua-скрипта token bucket.
+    """
+    script = AsyncMock(return_value=response)
+    fake_redis = MagicMock()
+    fake_redis.get = AsyncMock(return_value=None)
+    # Остальные скрипты (например, учет переходов) ничего не возвращают
+    fake_redis.register_script = MagicMock(
+        side_effect=lambda source: script if source == TOKEN_BUCKET_SCRIPT else AsyncMock(return_value=None)
+    )
+    monkeypatch.setattr(src.cache.redis_client, "get_redis_client", lambda: fake_redis)
+    return script
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_exceeded(async_client, monkeypatch):
+    """
+    Тест отказа с заголовком Retry-After при исчерпании лимита.
+    """
+    set_bucket_response(monkeypatch, [0, 1500, b"-0.5"])
+
+    response = await async_client.post("/links/shorten", json={"original_url": "https://test.com"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_local_precheck(async_client, monkeypatch):
+    """
+    Тест локального пропуска запросов без обращения к Redis, когда клиент далек от лимита.
+    """
+    script = set_bucket_response(monkeypatch, [1, 0, b"100"])
+
+    for _ in range(5):
+        response = await async_client.get("/links/notfound")
+        assert response.status_code == 404
+
+    # В Redis ушел только первый запрос, остальные учтены локально
+    assert script.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_blocked_client_skips_redis(async_client, monkeypatch):
+    """
+    Тест повторного отказа заблокированному клиенту без обращения к Redis.
+    """
+    script = set_bucket_response(monkeypatch, [0, 30000, b"0"])
+
+    first = await async_client.get("/links/abc")
+    second = await async_client.get("/links/abc")
+
+    assert first.status_code == 429
+    assert second.status_code == 429
+    assert script.await_count == 1
@@ -1,41 +1,276 @@
+import asyncio
+import os
+import signal
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from src.tasks.cleanup_links import delete_expired_links, delete_unused_links
+from src.tasks.cleanup_links import deactivate_expired_links, deactivate_unused_links, archive_inactive_links
+from src.worker import main, run_scheduler
+from src.tasks.jobs import get_scheduled_jobs, create_scheduler, run_job, job_stats, running_jobs
+from src.main import app, lifespan
+from src.config import CLEANUP_BATCH_SIZE
 
 
 @pytest.mark.asyncio
+@patch("src.tasks.cleanup_links.get_links_partitions", AsyncMock(return_value=["links_p0", "links_p1"]))
 @patch("src.tasks.cleanup_links.async_session_maker")
-async def test_delete_expired_links(mock_session_maker):
+async def test_deactivate_expired_links(mock_session_maker):
     """
-    Тест шедулера, удаляющего истекшие по сроку жизни ссылки.
+    Тест шедулера, деактивирующего истекшие по сроку жизни ссылки.
     """
     mock_session = AsyncMock()
     mock_execute_result = MagicMock()
-    mock_execute_result.fetchall = AsyncMock(return_value=[(1,), (2,)])
+    mock_execute_result.fetchall = MagicMock(return_value=[("a1", "https://a.com"), ("a2", "https://a.com")])
     mock_session.execute = AsyncMock(return_value=mock_execute_result)
     mock_session_maker.return_value.__aenter__.return_value = mock_session
 
-    await delete_expired_links()
+    await deactivate_expired_links()
 
-    mock_session.execute.assert_awaited()
-    mock_execute_result.fetchall.assert_awaited()
-    mock_session.commit.assert_awaited()
+    # Деактивация выполняется отдельно в каждой партиции
+    assert mock_session.execute.await_count == 2
+    assert mock_execute_result.fetchall.call_count == 2
+    assert mock_session.commit.await_count == 2
 
 
 @pytest.mark.asyncio
+@patch("src.tasks.cleanup_links.get_links_partitions", AsyncMock(return_value=["links_p0", "links_p1"]))
 @patch("src.tasks.cleanup_links.async_session_maker")
-async def test_delete_unused_links(mock_session_maker):
+async def test_deactivate_unused_links(mock_session_maker):
     """
-    Тест шедулера, удаляющего неиспользуемые ссылки.
+    Тест шедулера, деактивирующего неиспользуемые ссылки.
     """
     mock_session = AsyncMock()
     mock_execute_result = MagicMock()
-    mock_execute_result.fetchall = AsyncMock(return_value=[(10,), (20,)])
+    mock_execute_result.fetchall = MagicMock(return_value=[("b1", "https://b.com"), ("b2", "https://c.com")])
     mock_session.execute = AsyncMock(return_value=mock_execute_result)
     mock_session_maker.return_value.__aenter__.return_value = mock_session
 
-    await delete_unused_links()
+    await deactivate_unused_links()
 
-    mock_session.execute.assert_awaited()
-    mock_execute_result.fetchall.assert_awaited()
-    mock_session.commit.assert_awaited()
+    # Деактивация выполняется отдельно в каждой партиции
+    assert mock_session.execute.await_count == 2
+    assert mock_execute_result.fetchall.call_count == 2
+    assert mock_session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.cleanup_links.async_session_maker")
+async def test_deactivate_expired_links_single_partition(mock_session_maker):
+    """
+    Тест деактивации истекших ссылок в одной указанной партиции.
+    """
+    mock_session = AsyncMock()
+    mock_execute_result = MagicMock()
+    mock_execute_result.fetchall = MagicMock(return_value=[])
+    mock_session.execute = AsyncMock(return_value=mock_execute_result)
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    await deactivate_expired_links(partitions=["links_p3"])
+
+    mock_session.execute.assert_awaited_once()
+    statement = str(mock_session.execute.await_args.args[0])
+    assert statement.startswith("UPDATE links_p3 SET is_active")
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.cleanup_links.cache_delete_many", new_callable=AsyncMock)
+@patch("src.tasks.cleanup_links.search_index_remove", new_callable=AsyncMock)
+@patch("src.tasks.cleanup_links.async_session_maker")
+async def test_deactivate_links_in_batches(mock_session_maker, mock_search_index_remove, mock_cache_delete_many):
+    """
+    Тест пакетной деактивации: пачки повторяются, пока обрабатывается полный batch,
+    кэш деактивированных ссылок удаляется.
+    """
+    mock_session = AsyncMock()
+    full_batch = MagicMock()
+    full_batch.fetchall = MagicMock(return_value=[("c1", "https://c.com"), ("c2", "https://c.com")])
+    last_batch = MagicMock()
+    last_batch.fetchall = MagicMock(return_value=[("c3", "https://c.com")])
+    mock_session.execute = AsyncMock(side_effect=[full_batch, last_batch])
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    report = await deactivate_expired_links(partitions=["links_p0"], batch_size=2)
+
+    assert report.processed == 3
+    assert report.partitions == 1
+    assert report.rows_per_second > 0
+    assert mock_session.commit.await_count == 2
+    assert mock_search_index_remove.await_count == 2
+    keys = mock_cache_delete_many.await_args_list[-1].args[0]
+    assert keys == [("/links/c3", {}), ("/links/c3/stats", {})]
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.cleanup_links.async_session_maker")
+async def test_archive_inactive_links(mock_session_maker):
+    """
+    Тест переноса неактивных ссылок в архив одним запросом на пачку.
+    """
+    mock_session = AsyncMock()
+    mock_execute_result = MagicMock()
+    mock_execute_result.fetchall = MagicMock(return_value=[("d1", "https://d.com")])
+    mock_session.execute = AsyncMock(return_value=mock_execute_result)
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    report = await archive_inactive_links(partitions=["links_p5"])
+
+    assert report.processed == 1
+    statement = str(mock_session.execute.await_args.args[0])
+    assert "DELETE FROM links_p5" in statement
+    assert "INSERT INTO links_archive" in statement
+    assert "NOT links_p5.is_active" in statement
+    mock_session.commit.assert_awaited_once()
+
+
+@patch("src.worker.run_cleanup", new_callable=MagicMock)
+@patch("src.worker.asyncio.run")
+def test_worker_cleanup_command(mock_asyncio_run, mock_run_cleanup):
+    """
+    Тест разбора аргументов отдельного процесса очистки.
+    """
+    main(["cleanup", "--job", "unused", "--partition", "links_p1", "--concurrency", "3"])
+
+    mock_run_cleanup.assert_called_once_with(["unused"], ["links_p1"], 3, CLEANUP_BATCH_SIZE)
+    mock_asyncio_run.assert_called_once()
+
+
+def test_scheduled_jobs_resolve():
+    """
+    Тест реестра задач: все ссылки "модуль:функция" указывают на существующие корутины.
+    """
+    from apscheduler.util import ref_to_obj
+
+    jobs = get_scheduled_jobs()
+    assert len({job.id for job in jobs}) == len(jobs)
+    for job in jobs:
+        assert callable(ref_to_obj(job.func))
+        assert job.interval
+
+
+@patch("src.tasks.jobs.URL_CHECK_ENABLED", False)
+def test_create_scheduler_skips_disabled_jobs():
+    """
+    Тест создания шедулера: отключенная проверка URL не добавляется.
+    """
+    scheduler = create_scheduler()
+
+    job_ids = {job.id for job in scheduler.get_jobs()}
+    assert "sync_click_counters" in job_ids
+    assert "check_link_urls" not in job_ids
+
+
+@pytest.mark.asyncio
+@patch("src.main.CACHE_WARMUP_ENABLED", False)
+@patch("src.main.SCHEDULER_ENABLED", False)
+@patch("src.tasks.jobs.create_scheduler")
+async def test_lifespan_web_only(mock_create_scheduler):
+    """
+    Тест режима web-only: при SCHEDULER_ENABLED=false шедулер не создается.
+    """
+    async with lifespan(app):
+        assert app.state.ready is True
+
+    mock_create_scheduler.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.main.CACHE_WARMUP_ENABLED", False)
+@patch("src.main.SCHEDULER_ENABLED", True)
+@patch("src.tasks.jobs.create_scheduler")
+async def test_lifespan_starts_scheduler(mock_create_scheduler):
+    """
+    Тест запуска и остановки шедулера вместе с приложением.
+    """
+    async with lifespan(app):
+        mock_create_scheduler.return_value.start.assert_called_once()
+
+    mock_create_scheduler.return_value.shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.jobs.resolve_job")
+async def test_run_job_records_duration(mock_resolve_job):
+    """
+    Тест метрик задачи: длительность и ошибки запусков накапливаются, ошибка не пробрасывается.
+    """
+    job_stats.pop("test_job", None)
+    mock_resolve_job.return_value = AsyncMock(side_effect=[None, RuntimeError("boom")])
+
+    await run_job("test_job", "module:func")
+    await run_job("test_job", "module:func")
+
+    stats = job_stats.pop("test_job")
+    assert stats.runs == 2
+    assert stats.failures == 1
+    assert stats.max_duration >= stats.last_duration >= 0
+    assert not running_jobs
+
+
+@pytest.mark.asyncio
+@patch("src.worker.create_scheduler")
+@patch("src.worker.create_worker_engine")
+async def test_worker_scheduler_graceful_shutdown(mock_create_engine, mock_create_scheduler):
+    """
+    Тест остановки воркера по SIGTERM: новые запуски приостанавливаются,
+    выполняющаяся задача дорабатывает, затем закрывается пул воркера.
+    """
+    mock_create_engine.return_value.dispose = AsyncMock()
+    job_finished = asyncio.Event()
+
+    async def slow_job():
+        await asyncio.sleep(0.05)
+        job_finished.set()
+
+    with patch("src.tasks.jobs.resolve_job", return_value=slow_job):
+        worker = asyncio.create_task(run_scheduler(shutdown_timeout=5))
+        await asyncio.sleep(0)
+        job = asyncio.create_task(run_job("slow_job", "module:func"))
+        await asyncio.sleep(0)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(worker, timeout=5)
+        # Воркер завершился только после задачи
+        assert job_finished.is_set()
+    await job
+    job_stats.pop("slow_job", None)
+
+    scheduler = mock_create_scheduler.return_value
+    scheduler.start.assert_called_once()
+    scheduler.pause.assert_called_once()
+    scheduler.shutdown.assert_called_once_with(wait=False)
+    mock_create_engine.return_value.dispose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.worker.create_scheduler")
+@patch("src.worker.create_worker_engine")
+async def test_worker_scheduler_cancels_hanging_jobs(mock_create_engine, mock_create_scheduler):
+    """
+    Тест остановки воркера с зависшей задачей: по таймауту задача отменяется
+    и завершается до закрытия пула воркера.
+    """
+    job_cancelled = asyncio.Event()
+
+    async def dispose():
+        # Пул закрывается, когда задача уже отменена
+        assert job_cancelled.is_set()
+
+    mock_create_engine.return_value.dispose = AsyncMock(side_effect=dispose)
+
+    async def hanging_job():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            job_cancelled.set()
+            raise
+
+    with patch("src.tasks.jobs.resolve_job", return_value=hanging_job):
+        worker = asyncio.create_task(run_scheduler(shutdown_timeout=0.05))
+        await asyncio.sleep(0)
+        job = asyncio.create_task(run_job("hanging_job", "module:func"))
+        await asyncio.sleep(0)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(worker, timeout=5)
+    job_stats.pop("hanging_job", None)
+
+    assert job.cancelled()
+    assert not running_jobs
+    mock_create_engine.return_value.dispose.assert_awaited_once()
@@ -0,0 +1,54 @@
+import pytest
+
+from src.utils.shortcode import BASE62, ShortCodeGenerator, decode_base62, encode_base62
+
+
+def test_encode_decode_base62():
+    """
+    Тест обратимости кодирования: decode восстанавливает исходное число.
+    """
+    for num in (0, 1, 61, 62, 2 ** 64, 2 ** 128 - 1):
+        assert decode_base62(encode_base62(num)) == num
+
+
+def test_decode_unknown_character():
+    """
+    Тест декодирования кода с символом не из алфавита.
+    """
+    with pytest.raises(ValueError):
+        decode_base62("abc-1")
+
+
+def test_generate_many():
+    """
+    Тест пакетной генерации: длина, алфавит и уникальность кодов.
+    """
+    codes = ShortCodeGenerator(BASE62, 10).generate_many(1000)
+
+    assert len(codes) == 1000
+    assert all(len(code) == 10 and set(code) <= set(BASE62) for code in codes)
+    assert len(set(codes)) == 1000
+
+
+def test_generate_custom_alphabet():
+    """
+    Тест генерации с настраиваемым алфавитом и длиной.
+    """
+    generator = ShortCodeGenerator("abc", 6)
+
+    codes = generator.generate_many(200)
+
+    assert all(len(code) == 6 and set(code) <= set("abc") for code in codes)
+    # Все символы алфавита используются
+    assert set("".join(codes)) == set("abc")
+    assert generator.decode(generator.encode(42)) == 42
+    assert len(generator.encode(42)) == 6
+
+
+@pytest.mark.parametrize("alphabet, length", [("aa", 10), ("a", 10), ("абв", 10), (BASE62, 0)])
+def test_invalid_generator_settings(alphabet, length):
+    """
+    Тест отказа при неуникальном, слишком коротком или не-ASCII алфавите и неположительной длине.
+    """
+    with pytest.raises(ValueError):
+        ShortCodeGenerator(alphabet, length)
@@ -0,0 +1,132 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from redis.asyncio import Redis
+from sqlalchemy import create_engine, text
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.auth.manager import current_superuser
+from src.main import app
+from src.middleware.slow_requests import SlowRequestMiddleware
+from src.monitoring.slow_log import (
+    finish_request_timings,
+    install_slow_query_log,
+    short_code_hash,
+    slow_log,
+    start_request_timings,
+    statement_fingerprint,
+)
+from src.monitoring.tracing import TracedRedis
+
+
+@pytest.fixture(autouse=True)
+def clear_slow_log():
+    slow_log.clear()
+    yield
+    slow_log.clear()
+
+
+def test_statement_fingerprint():
+    statement = "SELECT *\n  FROM links_p0 WHERE short_code = 'abc' AND clicks_count > 10 AND id = $1"
+
+    assert statement_fingerprint(statement) == "SELECT * FROM links_p0 WHERE short_code = ? AND clicks_count > ? AND id = $1"
+
+
+@patch("src.monitoring.slow_log.SLOW_QUERY_THRESHOLD_MS", 0)
+def test_slow_query_recorded():
+    """
+    Тест журнала SQL-запросов: время запроса учитывается в счетчиках запроса,
+    запрос дольше порога попадает в буфер с нормализованным текстом.
+    """
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine)
+
+    token = start_request_timings({"method": "GET", "path": "/links/search"})
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1 WHERE 'a' = 'a'"))
+    timings = finish_request_timings(token)
+
+    assert timings.db_statements == 1
+    assert timings.db_time > 0
+    (entry,) = slow_log
+    assert entry["type"] == "query"
+    assert entry["statement"] == "SELECT ? WHERE ? = ?"
+    assert entry["route"] == "GET /links/search"
+
+
+def test_fast_query_not_recorded():
+    engine = create_engine("sqlite://")
+    install_slow_query_log(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert not slow_log
+
+
+@pytest.mark.asyncio
+async def test_redis_time_counted():
+    """
+    Тест учета времени команд Redis в счетчиках запроса.
+    """
+    token = start_request_timings({})
+    with patch.object(Redis, "execute_command", AsyncMock(return_value=b"1")):
+        await TracedRedis().get("key")
+    timings = finish_request_timings(token)
+
+    assert timings.redis_commands == 1
+
+
+@pytest.mark.asyncio
+@patch("src.monitoring.slow_log.SLOW_REQUEST_THRESHOLD_MS", 0)
+async def test_slow_request_recorded():
+    """
+    Тест журнала HTTP-запросов: маршрут, хэш короткого кода, статус и разбивка времени.
+    """
+    test_app = FastAPI()
+    test_app.add_middleware(SlowRequestMiddleware)
+
+    @test_app.get("/links/{short_code}")
+    async def handler(short_code: str):
+        return {"short_code": short_code}
+
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as ac:
+        response = await ac.get("/links/abc123")
+
+    assert response.status_code == 200
+    (entry,) = slow_log
+    assert entry["type"] == "request"
+    assert entry["route"] == "GET /links/{short_code}"
+    assert entry["short_code_hash"] == short_code_hash("abc123")
+    assert "abc123" not in str(entry)
+    assert entry["status"] == 200
+    assert entry["db_statements"] == 0
+    assert entry["other_ms"] <= entry["duration_ms"]
+
+
+@pytest.mark.asyncio
+async def test_debug_slow_log_requires_superuser():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/debug/slow")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_debug_slow_log():
+    """
+    Тест отдачи журнала администратору: новые записи первыми.
+    """
+    slow_log.extend([{"type": "query", "duration_ms": 150}, {"type": "request", "duration_ms": 700}])
+    app.dependency_overrides[current_superuser] = lambda: MagicMock(is_superuser=True)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/debug/slow", params={"limit": 1})
+            cleared = await ac.delete("/debug/slow")
+    finally:
+        app.dependency_overrides.pop(current_superuser, None)
+
+    assert response.status_code == 200
+    assert response.json()["entries"] == [{"type": "request", "duration_ms": 700}]
+    assert cleared.status_code == 200
+    assert not slow_log
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from src.cache.clicks import (
+    TAKE_PENDING_SCRIPT,
+    FINISH_SYNC_SCRIPT,
+    RELEASE_SYNC_LOCK_SCRIPT,
+    SYNC_LOCK_KEY,
+    SYNCING_BATCH_KEY,
+    SYNCING_CLICKS_KEY,
+    SYNCING_LAST_CLICK_KEY,
+)
+from src.tasks.sync_clicks import sync_click_counters
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.sync_clicks.async_session_maker")
+async def test_sync_click_counters(mock_session_maker, mock_redis):
+    """
+    Тест записи накопленных в Redis переходов в БД одним запросом.
+    """
+    mock_redis.scripts[TAKE_PENDING_SCRIPT] = AsyncMock(return_value=[
+        [b"abc", b"3", b"xyz", b"1"],
+        [b"abc", b"1735700000000"],
+        b"batch1",
+    ])
+    mock_redis.scripts[FINISH_SYNC_SCRIPT] = AsyncMock(return_value=1)
+    mock_session = AsyncMock()
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    synced = await sync_click_counters()
+
+    assert synced == 2
+    params = mock_session.execute.await_args.args[1]
+    assert params["batch_id"] == "batch1"
+    assert params["short_codes"] == ["abc", "xyz"]
+    assert params["clicks"] == [3, 1]
+    assert params["last_clicked_at"] == [datetime.fromtimestamp(1735700000, tz=timezone.utc), None]
+    mock_session.commit.assert_awaited_once()
+    # Записанные переходы и кэш статистики удаляются, блокировка снимается
+    assert mock_redis.scripts[FINISH_SYNC_SCRIPT].await_args.kwargs == {
+        "keys": [SYNCING_BATCH_KEY, SYNCING_CLICKS_KEY, SYNCING_LAST_CLICK_KEY],
+        "args": ["batch1"],
+    }
+    mock_redis.scripts[RELEASE_SYNC_LOCK_SCRIPT].assert_awaited_once()
+    mock_redis.delete.assert_any_await("/links/abc/stats?", "/links/xyz/stats?")
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.sync_clicks.async_session_maker")
+async def test_sync_click_counters_nothing_pending(mock_session_maker, mock_redis):
+    """
+    Тест синхронизации без накопленных переходов.
+    """
+    mock_redis.scripts[TAKE_PENDING_SCRIPT] = AsyncMock(return_value=[[], [], None])
+
+    assert await sync_click_counters() == 0
+    mock_session_maker.assert_not_called()
+    mock_redis.delete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.sync_clicks.async_session_maker")
+async def test_sync_click_counters_overlapping(mock_session_maker, mock_redis):
+    """
+    Тест одновременной синхронизации в двух процессах:
+    пока первая не завершилась, вторая не записывает те же переходы повторно.
+    """
+    locks = {}
+
+    async def set_nx(key, value, nx=False, px=None):
+        if nx and key in locks:
+            return None
+        locks[key] = value
+        return True
+
+    mock_redis.set = AsyncMock(side_effect=set_nx)
+    mock_redis.scripts[TAKE_PENDING_SCRIPT] = AsyncMock(return_value=[[b"abc", b"3"], [], b"batch1"])
+    mock_redis.scripts[FINISH_SYNC_SCRIPT] = AsyncMock(return_value=1)
+    mock_redis.scripts[RELEASE_SYNC_LOCK_SCRIPT] = AsyncMock(side_effect=lambda keys, args: locks.pop(keys[0]))
+
+    # Первая синхронизация останавливается между запросами к БД и удалением переходов из Redis
+    update_started = asyncio.Event()
+    release_update = asyncio.Event()
+
+    async def slow_execute(*args, **kwargs):
+        update_started.set()
+        await release_update.wait()
+
+    mock_session = AsyncMock()
+    mock_session.execute = AsyncMock(side_effect=slow_execute)
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    first = asyncio.create_task(sync_click_counters())
+    await update_started.wait()
+    second = await sync_click_counters()
+    release_update.set()
+
+    assert await first == 1
+    assert second == 0
+    # Очистка старых пачек и UPDATE выполняются только первой синхронизацией
+    assert mock_session.execute.await_count == 2
+    mock_redis.scripts[TAKE_PENDING_SCRIPT].assert_awaited_once()
+    assert SYNC_LOCK_KEY not in locks
+
+
+@pytest.mark.asyncio
+@patch("src.tasks.sync_clicks.async_session_maker")
+async def test_sync_click_counters_lock_expired(mock_session_maker, mock_redis):
+    """
+    Тест истекшей блокировки: записанная пачка все равно удаляется из Redis,
+    иначе следующая синхронизация записала бы те же переходы повторно.
+    """
+    mock_redis.scripts[TAKE_PENDING_SCRIPT] = AsyncMock(return_value=[[b"abc", b"3"], [], b"batch1"])
+    mock_redis.scripts[FINISH_SYNC_SCRIPT] = AsyncMock(return_value=1)
+    mock_redis.scripts[RELEASE_SYNC_LOCK_SCRIPT] = AsyncMock(return_value=0)
+    mock_session = AsyncMock()
+    mock_session_maker.return_value.__aenter__.return_value = mock_session
+
+    with patch("src.tasks.sync_clicks.logger") as mock_logger:
+        assert await sync_click_counters() == 1
+
+    mock_session.commit.assert_awaited_once()
+    assert mock_redis.scripts[FINISH_SYNC_SCRIPT].await_args.kwargs["args"] == ["batch1"]
+    mock_logger.warning.assert_called_once()
@@ -0,0 +1,158 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from unittest.mock import AsyncMock, patch
+
+from src.middleware.tracing import TracingMiddleware
+from src.monitoring.tracing import (
+    InMemorySpanExporter,
+    NOOP_SPAN,
+    TracedPoolMixin,
+    TracedRedis,
+    instrument_engine,
+    tracer,
+)
+
+
+@pytest.fixture
+def exporter():
+    """
+    Включенная трассировка с полной выборкой и записью спанов в память.
+    """
+    memory_exporter = InMemorySpanExporter()
+    with patch.object(tracer, "enabled", True), patch.object(tracer, "sample_ratio", 1.0), \
+            patch.object(tracer, "exporter", memory_exporter):
+        yield memory_exporter
+
+
+def test_disabled_tracer_returns_noop_span():
+    """
+    Тест выключенной трассировки: спаны не создаются.
+    """
+    with patch.object(tracer, "enabled", False):
+        assert tracer.span("anything") is NOOP_SPAN
+        assert tracer.start_trace("GET /") is NOOP_SPAN
+
+
+def test_child_spans_share_trace(exporter):
+    """
+    Тест вложенных спанов: дочерний спан ссылается на родителя и пишется раньше него.
+    """
+    with tracer.span("root") as root:
+        with tracer.span("child", key="value"):
+            pass
+
+    child, finished_root = exporter.get_finished_spans()
+    assert finished_root is root
+    assert child.name == "child"
+    assert child.trace_id == root.trace_id
+    assert child.parent_id == root.span_id
+    assert child.attributes == {"key": "value"}
+    assert root.parent_id is None
+    assert child.duration >= 0
+
+
+def test_unsampled_trace_skips_children(exporter):
+    """
+    Тест выборки: трасса вне выборки не пишет ни корневой, ни дочерние спаны.
+    """
+    with patch.object(tracer, "sample_ratio", 0.0):
+        with tracer.span("root"):
+            with tracer.span("child"):
+                pass
+
+    assert exporter.get_finished_spans() == []
+
+
+def test_traceparent_continues_trace(exporter):
+    """
+    Тест входящего traceparent: trace_id и решение о выборке берутся из заголовка.
+    """
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    with patch.object(tracer, "sample_ratio", 0.0):
+        with tracer.start_trace("GET /", f"00-{trace_id}-00f067aa0ba902b7-01"):
+            pass
+        with tracer.start_trace("GET /", f"00-{trace_id}-00f067aa0ba902b7-00"):
+            pass
+
+    (span,) = exporter.get_finished_spans()
+    assert span.trace_id == trace_id
+    assert span.parent_id == "00f067aa0ba902b7"
+
+
+def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+
+    assert exporter.get_finished_spans()[0].error == "ValueError"
+
+
+def test_sql_spans(exporter):
+    """
+    Тест спанов SQL: получение соединения из пула, запрос и фиксация транзакции.
+    """
+    pool_class = type("TracedQueuePool", (TracedPoolMixin, QueuePool), {})
+    engine = create_engine("sqlite://", poolclass=pool_class)
+    instrument_engine(engine)
+
+    with tracer.span("request") as root:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1 WHERE 2 > 1"))
+            connection.commit()
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert {"db.pool.checkout", "db SELECT", "db COMMIT", "request"} <= set(spans)
+    assert spans["db SELECT"].attributes["db.statement"] == "SELECT ? WHERE ? > ?"
+    assert all(span.trace_id == root.trace_id for span in spans.values())
+    assert spans["db SELECT"].parent_id == root.span_id
+
+
+@pytest.mark.asyncio
+async def test_redis_spans(exporter):
+    """
+    Тест спанов Redis: отдельный спан на команду и на пайплайн.
+    """
+    client = TracedRedis()
+    with patch.object(Redis, "execute_command", AsyncMock(return_value=b"value")), \
+            patch.object(Pipeline, "execute", AsyncMock(return_value=[True, True])):
+        with tracer.span("request") as root:
+            assert await client.get("key") == b"value"
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set("a", 1)
+                pipe.set("b", 2)
+                await pipe.execute()
+
+    get_span, pipeline_span, _ = exporter.get_finished_spans()
+    assert get_span.name == "redis GET"
+    assert get_span.parent_id == root.span_id
+    assert pipeline_span.name == "redis PIPELINE"
+    assert pipeline_span.attributes == {"redis.commands": 2, "redis.command": "SET"}
+
+
+@pytest.mark.asyncio
+async def test_tracing_middleware(exporter):
+    """
+    Тест спана HTTP-запроса: имя по шаблону маршрута и спаны обработчика внутри него.
+    """
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/links/{short_code}")
+    async def handler(short_code: str):
+        with tracer.span("lookup"):
+            return {"short_code": short_code}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/links/abc123")
+
+    assert response.status_code == 200
+    lookup, request = exporter.get_finished_spans()
+    assert request.name == "GET /links/{short_code}"
+    assert request.attributes["http.status_code"] == 200
+    assert request.attributes["http.route"] == "/links/{short_code}"
+    assert lookup.parent_id == request.span_id
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+
+from src.config import MAX_URL_LENGTH
+from src.links.schemas import LinkCreate, LinkUpdate
+from src.links.validation import url_error
+
+
+@pytest.mark.parametrize("url, error", [
+    ("https://example.com/path?q=1", None),
+    ("https://ru.wikipedia.org/wiki/Заглавная_страница", None),
+    ("ftp://example.com", "URL must start with http:// or https://!"),
+    ("https://", "URL must have a valid domain!"),
+    ("http://[::1", "URL is malformed!"),
+])
+def test_url_error(url, error):
+    """
+    Тест проверки схемы, домена и разбора URL.
+    """
+    assert url_error(url) == error
+
+
+def test_url_parse_is_cached():
+    """
+    Тест кэширования разбора повторяющихся URL.
+    """
+    url_error.cache_clear()
+
+    for _ in range(3):
+        url_error("https://cached.example.com")
+
+    assert url_error.cache_info().hits == 2
+
+
+@pytest.mark.parametrize("schema", [LinkCreate, LinkUpdate])
+def test_too_long_url_rejected(schema):
+    """
+    Тест отказа для URL длиннее MAX_URL_LENGTH: разбор URL не выполняется.
+    """
+    url_error.cache_clear()
+    url = "https://example.com/" + "a" * MAX_URL_LENGTH
+
+    with pytest.raises(ValidationError, match="at most"):
+        schema(original_url=url)
+    assert url_error.cache_info().misses == 0
+
+
+@pytest.mark.parametrize("alias, valid", [("wiki", True), ("Вики2", True), ("bad alias!", False), ("a" * 51, False)])
+def test_custom_alias(alias, valid):
+    """
+    Тест шаблона и длины кастомного алиаса.
+    """
+    if valid:
+        assert LinkCreate(original_url="https://a.com", custom_alias=alias).custom_alias == alias
+    else:
+        with pytest.raises(ValidationError):
+            LinkCreate(original_url="https://a.com", custom_alias=alias)